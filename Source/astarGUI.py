@@ -1,242 +1,271 @@
 import tkinter as tk
-import heapq
-import time
 import threading
-import tracemalloc
 from tkinter.scrolledtext import ScrolledText
-
-def aStarSearch(graph, start, goal, heuristic_values, visualize_step):
-    open_nodes = []
-    heapq.heappush(open_nodes, (0, start))
-
-    actual_costs = {start: 0}
-    function_values = {start: heuristic_values.get(start, 0)}
-    parent_records = {}
-    visited_nodes = set()
-
-    traversed_path = []
-    nodes_expanded = 0
-    max_frontier_size = 0
-    visit_count = {start: 1}
-
-    while open_nodes:
-        max_frontier_size = max(max_frontier_size, len(open_nodes))
-        current = heapq.heappop(open_nodes)[1]
-
-        if current in visited_nodes:
-            continue
-
-        visited_nodes.add(current)
-        traversed_path.append(current)
-        nodes_expanded += 1
-
-        if current == goal:
-            path = []
-            while current in parent_records:
-                path.append(current)
-                current = parent_records[current]
-            path.append(start)
-            path.reverse()
-            total_cost = actual_costs[goal]
-            return path, traversed_path, total_cost, nodes_expanded, max_frontier_size, visit_count
-
-        visualize_step(current, visited=True)
-
-        for neighbor_node, cost in graph[current].items():
-            accumulative_cost = actual_costs[current] + cost
-
-            if neighbor_node not in actual_costs or accumulative_cost < actual_costs[neighbor_node]:
-                if neighbor_node not in visited_nodes:
-                    parent_records[neighbor_node] = current
-                    actual_costs[neighbor_node] = accumulative_cost
-                    function_values[neighbor_node] = accumulative_cost + heuristic_values.get(neighbor_node, 0)
-                    heapq.heappush(open_nodes, (function_values[neighbor_node], neighbor_node))
-
-                    visit_count[neighbor_node] = visit_count.get(neighbor_node, 0) + 1
-                    
-                    visualize_step(current, neighbor_node)
-
-        time.sleep(0.5)
-
-    return None, traversed_path, float('inf'), nodes_expanded, max_frontier_size, visit_count
-
-root = tk.Tk()
-root.title("AStar Search | City Graph")
-
-graph_label_astar = tk.Label(root, text="AStar Search", font=("Helvetica", 18, "bold"))
-graph_label_astar.pack(pady=20)
-
-canvas = tk.Canvas(root, width=800, height=500, bg="white")
-canvas.pack(side=tk.LEFT)
-
-coordinates = {
-    "Dallas": (200, 400),
-    "Los Angeles": (100, 200),
-    "San Francisco": (100, 100),
-    "Chicago": (400, 50),
-    "New York": (400, 200),
-    "Boston": (600, 100),
-    "Miami": (600, 300)
-}
-
-heuristics = {
-    'Miami': 2000,
-    'New York': 800,
-    'Boston': 900,
-    'Dallas': 1200,
-    'San Francisco': 2200,
-    'Los Angeles': 2400,
-    'Chicago': 0
-}
-
-graph = {city: {} for city in coordinates}
-connections = [
-    ("Dallas", "Los Angeles", 1700),
-    ("Los Angeles", "San Francisco", 500),
-    ("San Francisco", "Chicago", 2200),
-    ("Chicago", "New York", 800),
-    ("New York", "Boston", 250),
-    ("New York", "Miami", 1000),
-    ("New York", "Dallas", 1500),
-    ("New York", "Los Angeles", 3000),
-    ("Dallas", "Miami", 1200),
-]
-
-lines = []
-line_objects = {}
-for city1, city2, distance in connections:
-    x1, y1 = coordinates[city1]
-    x2, y2 = coordinates[city2]
-    line = canvas.create_line(x1, y1, x2, y2, fill="blue")
-    lines.append((line, city1, city2))
-    line_objects[(city1, city2)] = line
-    line_objects[(city2, city1)] = line
-    graph[city1][city2] = distance
-    graph[city2][city1] = distance
-    mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
-
-    bbox = canvas.create_text(mid_x, mid_y - 10, text=str(distance), fill="black")
-    x0, y0, x1, y1 = canvas.bbox(bbox)
-    canvas.create_rectangle(x0-2, y0-2, x1+2, y1+2, fill="pink", outline="")
-    canvas.lift(bbox)
-
-node_objects = {}
-dropdown_vars = {}
-for city, (x, y) in coordinates.items():
-    rect = canvas.create_rectangle(x-50, y-30, x+50, y+30, fill="white", outline="white")
-    node_objects[city] = rect
-    canvas.create_rectangle(x-48, y-28, x+48, y+28, outline="black", fill="white")
-    canvas.create_text(x, y-10, text=city, fill="black")
-
-    var = tk.StringVar(root)
-    var.set(" ")
-    dropdown_vars[city] = var
-    dropdown = tk.OptionMenu(canvas, var, " ", "Start", "End")
-    dropdown.config(width=5, height=1, font=('Helvetica', 8))
-    canvas.create_window(x, y + 12, window=dropdown)
-
-def visualize_step(current, neighbor=None, visited=False):
-    if visited:
-        canvas.itemconfig(node_objects[current], fill="lightgreen")
-    if neighbor:
-        canvas.itemconfig(line_objects[(current, neighbor)], fill="yellow")
-    root.update_idletasks()
-
-def find_path_astar():
-    start_city = None
-    end_city = None
-    
-    for city, var in dropdown_vars.items():
-        if var.get() == "Start":
-            start_city = city
-        elif var.get() == "End":
-            end_city = city
-    
-    if start_city is not None and end_city is not None:
-    
-        start_time = time.time()
-        tracemalloc.start()
-
-        def run_algorithm():
-            
-            path, traversed_path, total_cost, nodes_expanded, max_frontier_size, visit_count = aStarSearch(
-                graph, start_city, end_city, heuristics, visualize_step
-            )
-
-            end_time = time.time()
-            current, peak = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-
-            if path is None:
-                result_text = "No path found.\n"
-            else:
-                path_str = " -> ".join(path)
-                traversed_path_str = " -> ".join(traversed_path)
-                result_text = (
-                    f"Final Path: {path_str}\n\n"
-                    f"Traversed Path: {traversed_path_str}\n\n"
-                    f"Total Cost: {total_cost}\n\n"
-                    f"Time: {end_time - start_time:.2f} seconds\n\n"
-                    f"Nodes Expanded: {nodes_expanded}\n\n"
-                    f"Max Frontier Size: {max_frontier_size}\n\n"    
-                    f"Memory Usage: Current={current / 1024}KB, Peak={peak / 1024}KB\n\n"
-                    f"Visit Count: {visit_count}\n"
-                )
-            result_text_widget.delete(1.0, tk.END)
-            result_text_widget.insert(tk.END, result_text)
-
-            if path:
-                for line, city1, city2 in lines:
-                    if (city1, city2) in zip(path, path[1:]) or (city2, city1) in zip(path, path[1:]):
-                        canvas.itemconfig(line, fill="red", width=3)
-                    else:
-                        canvas.itemconfig(line, fill="blue", width=1)
-        
-        threading.Thread(target=run_algorithm).start()
-
-def reset():
-    for line, city1, city2 in lines:
-        canvas.itemconfig(line, fill="blue", width=1)
-    for city, rect in node_objects.items():
-        canvas.itemconfig(rect, fill="white")
-        dropdown_vars[city].set(" ")
-    result_text_widget.delete(1.0, tk.END)
-
-def back_to_menu():
-    root.destroy()
-
-frame = tk.Frame(root)
-frame.pack(side=tk.RIGHT, padx=20, pady=20)
-
-heading_label = tk.Label(frame, text="Heuristic Values", font=('Helvetica', 14, 'bold'))
-heading_label.pack()
-
-label_text = """
-Chicago                     0
-Miami                        2000
-New York                  800
-Boston                      900
-Dallas                       1200
-San Francisco         2200
-Los Angeles            2400
-"""
-distance_label = tk.Label(frame, text=label_text, justify=tk.LEFT, font=('Helvetica', 12))
-distance_label.pack()
-
-button_frame = tk.Frame(frame)
-button_frame.pack(pady=10)
-
-find_button = tk.Button(button_frame, text="Find Path", command=find_path_astar)
-find_button.pack(side=tk.LEFT, padx=10)
-
-reset_button = tk.Button(button_frame, text="Reset", command=reset)
-reset_button.pack(side=tk.LEFT, padx=10)
-
-back_button = tk.Button(button_frame, text="Back to Menu", command=lambda: back_to_menu())
-back_button.pack(side=tk.LEFT, padx=10)
-
-result_text_widget = ScrolledText(frame, width=80, height=10, wrap=tk.WORD, bg="white")
-result_text_widget.pack(pady=10)
-
-
-root.mainloop()
\ No newline at end of file
+from citymap import CityMap
+from engine import (CANCELLED, EXPAND, PATH, RELAX, CancellationToken, SearchMetrics, SearchTrace, a_star_search,
+                    anytime_a_star, bidirectional_a_star)
+from gui import CanvasUpdateQueue, MapView, ReplayControls, TraceReplayer
+
+# Time budget for anytime searches, which keep improving the first path
+# (and its bound) until it is optimal or this many seconds have passed
+ANYTIME_DEADLINE = 0.1
+
+# Searches give up after this long
+MAX_SEARCH_SECONDS = 30
+
+# Heuristics to pick from: landmark distances, or the distance between the
+# city positions scaled below the road distances
+HEURISTICS = ("Landmarks", "Euclidean", "Manhattan")
+
+
+# A* search window. root is the window to build it in: a Toplevel when
+# opened from the launcher, or the Tk root when this file is run directly.
+# city_map holds the graph and engine state shared with the other windows.
+class AStarWindow:
+    def __init__(self, root, city_map):
+        self.root = root
+        self.city_map = city_map
+        self.engine_graph = city_map.engine_graph
+        self.landmarks = city_map.landmarks
+        root.title("AStar Search | City Graph")
+        root.protocol("WM_DELETE_WINDOW", self.back_to_menu)
+
+        graph_label_astar = tk.Label(root, text="AStar Search", font=("Helvetica", 18, "bold"))
+        graph_label_astar.pack(pady=20)
+
+        self.canvas = tk.Canvas(root, width=800, height=500, bg="white")
+        self.canvas.pack(side=tk.LEFT)
+
+        # Only the part of the map on screen is drawn; scroll to zoom, right-drag to pan.
+        # A city's dropdown exists once the city has been shown up close.
+        self.view = MapView(self.canvas, city_map.coordinates, city_map.roads)
+        self.dropdown_vars = self.view.dropdown_vars
+
+        # Path of the last search, highlighted once its replay finishes
+        self.final_path = []
+
+        # Token of the running search; starting another one, Reset or Back
+        # to Menu cancels it
+        self.search_token = None
+
+        # Canvas changes are queued and applied by the Tk thread once per frame
+        self.updates = CanvasUpdateQueue(root, self.canvas, apply=self.view.apply)
+        self.replayer = TraceReplayer(root, self.visualize_step, self.highlight_final_path)
+
+        frame = tk.Frame(root)
+        frame.pack(side=tk.RIGHT, padx=20, pady=20)
+
+        heuristic_frame = tk.Frame(frame)
+        heuristic_frame.pack(pady=5)
+        tk.Label(heuristic_frame, text="Heuristic").pack(side=tk.LEFT)
+        self.heuristic_var = tk.StringVar(root, value=HEURISTICS[0])
+        heuristic_menu = tk.OptionMenu(heuristic_frame, self.heuristic_var, *HEURISTICS,
+                                       command=lambda choice: self.show_heuristic_table(self.table_city))
+        heuristic_menu.pack(side=tk.LEFT, padx=5)
+
+        self.heading_label = tk.Label(frame, text="Heuristic Values (to Chicago)", font=('Helvetica', 14, 'bold'))
+        self.heading_label.pack()
+        self.table_city = "Chicago"
+
+        label_text = self.heuristic_table("Chicago")
+        self.distance_label = tk.Label(frame, text=label_text, justify=tk.LEFT, font=('Helvetica', 12))
+        self.distance_label.pack()
+
+        button_frame = tk.Frame(frame)
+        button_frame.pack(pady=10)
+
+        self.bidirectional_var = tk.BooleanVar(root, value=False)
+        bidirectional_check = tk.Checkbutton(button_frame, text="Bidirectional", variable=self.bidirectional_var)
+        bidirectional_check.pack(side=tk.LEFT, padx=10)
+
+        # Weight on the heuristic: 1 is plain A*, higher trades path cost (at most
+        # that factor) for speed. Anytime starts at this weight and lowers it.
+        weight_frame = tk.Frame(frame)
+        weight_frame.pack(pady=5)
+        tk.Label(weight_frame, text="Heuristic Weight").pack(side=tk.LEFT)
+        self.weight_var = tk.StringVar(root, value="1.0")
+        weight_spinbox = tk.Spinbox(weight_frame, from_=1.0, to=5.0, increment=0.5, width=5,
+                                    textvariable=self.weight_var, state="readonly")
+        weight_spinbox.pack(side=tk.LEFT, padx=5)
+        self.anytime_var = tk.BooleanVar(root, value=False)
+        anytime_check = tk.Checkbutton(weight_frame, text="Anytime", variable=self.anytime_var)
+        anytime_check.pack(side=tk.LEFT, padx=10)
+
+        find_button = tk.Button(button_frame, text="Find Path", command=self.find_path_astar)
+        find_button.pack(side=tk.LEFT, padx=10)
+
+        reset_button = tk.Button(button_frame, text="Reset", command=self.reset)
+        reset_button.pack(side=tk.LEFT, padx=10)
+
+        back_button = tk.Button(button_frame, text="Back to Menu", command=self.back_to_menu)
+        back_button.pack(side=tk.LEFT, padx=10)
+
+        replay_controls = ReplayControls(frame, self.replayer)
+        replay_controls.pack(pady=5)
+
+        self.result_text_widget = ScrolledText(frame, width=80, height=10, wrap=tk.WORD, bg="white")
+        self.result_text_widget.pack(pady=10)
+
+    def heuristics(self):
+        # Landmarks, or the GeometricHeuristic picked in the menu
+        choice = self.heuristic_var.get()
+        if choice == "Landmarks":
+            return self.landmarks
+        return self.city_map.geometric(choice.lower())
+
+    def heuristic_table(self, end_city):
+        engine_graph = self.engine_graph
+        h = self.heuristics().heuristic(engine_graph.id_of(end_city))
+        if not callable(h):
+            h = h.__getitem__
+        rows = sorted(((h(engine_graph.id_of(city)), city) for city in self.city_map.coordinates))
+        return "\n" + "\n".join(f"{city:<22}{value:g}" for value, city in rows) + "\n"
+
+    def show_heuristic_table(self, end_city):
+        self.table_city = end_city
+        self.heading_label.config(text=f"Heuristic Values (to {end_city})")
+        self.distance_label.config(text=self.heuristic_table(end_city))
+
+    def visualize_step(self, kind, node, neighbor):
+        names = self.engine_graph.names
+        if kind == EXPAND:
+            self.updates.configure(("node", names[node]), fill="lightgreen")
+        elif kind == RELAX:
+            self.updates.configure(("edge", names[node], names[neighbor]), fill="yellow")
+        elif kind == PATH:
+            self.updates.configure(("edge", names[node], names[neighbor]), fill="red", width=3)
+
+    def highlight_final_path(self):
+        path = self.final_path
+        if path:
+            # Apply the last replay frame first so it can't paint over the result
+            self.updates.flush()
+            self.view.clear_edge_styles()
+            for city1, city2 in zip(path, path[1:]):
+                self.view.style_edge(city1, city2, fill="red", width=3)
+
+    # Stop the running search and its replay so neither paints over what comes next
+    def cancel_search(self):
+        if self.search_token is not None:
+            self.search_token.cancel()
+        self.replayer.stop()
+        self.updates.clear()
+
+    # Runs on the Tk thread once a search worker has finished
+    def show_result(self, result_text, path, trace, token):
+        # A newer search has started since this one finished
+        if token is not self.search_token:
+            return
+        self.result_text_widget.delete(1.0, tk.END)
+        self.result_text_widget.insert(tk.END, result_text)
+
+        # The search is already done; now animate what it did
+        self.final_path[:] = path or []
+        self.replayer.start(trace)
+
+    def find_path_astar(self):
+        start_city = None
+        end_city = None
+
+        for city, var in self.dropdown_vars.items():
+            if var.get() == "Start":
+                start_city = city
+            elif var.get() == "End":
+                end_city = city
+
+        if start_city is not None and end_city is not None:
+            self.cancel_search()
+            token = self.search_token = CancellationToken(deadline=MAX_SEARCH_SECONDS)
+            engine_graph = self.engine_graph
+            bidirectional = self.bidirectional_var.get()
+            anytime = self.anytime_var.get()
+            weight = float(self.weight_var.get())
+            heuristics = self.heuristics()
+            heuristic = heuristics.heuristic(engine_graph.id_of(end_city))
+            reverse_heuristic = heuristics.reverse_heuristic(engine_graph.id_of(start_city))
+            self.show_heuristic_table(end_city)
+
+            def run_algorithm():
+                # Times only the search itself; memory is sampled every expansion
+                metrics = SearchMetrics(memory_sample_every=1)
+                solutions = []
+                if bidirectional:
+                    result = bidirectional_a_star(
+                        engine_graph, engine_graph.id_of(start_city), engine_graph.id_of(end_city),
+                        heuristic, reverse_heuristic, SearchTrace(), metrics=metrics, cancel=token
+                    )
+                elif anytime:
+                    result = anytime_a_star(
+                        engine_graph, engine_graph.id_of(start_city), engine_graph.id_of(end_city),
+                        heuristic, initial_weight=weight, deadline=ANYTIME_DEADLINE, trace=SearchTrace(),
+                        metrics=metrics, on_solution=solutions.append, cancel=token
+                    )
+                else:
+                    result = a_star_search(
+                        engine_graph, engine_graph.id_of(start_city), engine_graph.id_of(end_city),
+                        heuristic, SearchTrace(), metrics=metrics, weight=weight, cancel=token
+                    )
+                if result.stopped == CANCELLED:
+                    return
+                path = result.path_names if result.found else None
+                traversed_path = result.traversed_names
+                total_cost = result.total_cost
+                nodes_expanded = result.nodes_expanded
+                if result.expanded_per_direction:
+                    forward, backward = result.expanded_per_direction
+                    nodes_expanded = f"{nodes_expanded} (forward {forward}, backward {backward})"
+                max_frontier_size = result.max_frontier_size
+                visit_count = result.visit_count_names
+
+                if path is None and result.stopped:
+                    result_text = (
+                        f"Search stopped ({result.stopped}) after {nodes_expanded} nodes expanded; no path yet.\n\n"
+                        f"Time: {metrics.elapsed_seconds:.6f} seconds\n\n"
+                        f"Frontier Operations: {metrics.pushes} pushes, {metrics.pops} pops "
+                        f"({metrics.stale_pops} stale), {metrics.relaxations} relaxations\n"
+                    )
+                elif path is None:
+                    result_text = "No path found.\n"
+                else:
+                    path_str = " -> ".join(path)
+                    traversed_path_str = " -> ".join(traversed_path)
+                    result_text = (
+                        f"Final Path: {path_str}\n\n"
+                        f"Traversed Path: {traversed_path_str}\n\n"
+                        f"Total Cost: {total_cost} (bound: at most {result.bound:.3g}x optimal)\n\n"
+                        f"Time: {metrics.elapsed_seconds:.6f} seconds\n\n"
+                        f"Nodes Expanded: {nodes_expanded}\n\n"
+                        f"Max Frontier Size: {max_frontier_size}\n\n"
+                        f"Frontier Operations: {metrics.pushes} pushes, {metrics.pops} pops "
+                        f"({metrics.stale_pops} stale), {metrics.relaxations} relaxations\n\n"
+                        f"Memory Usage: Peak={metrics.peak_memory_bytes / 1024:.1f}KB (sampled)\n\n"
+                        f"Visit Count: {visit_count}\n"
+                    )
+                    if len(solutions) > 1:
+                        improvements = ", ".join(f"{solution.total_cost} (<= {solution.bound:.3g}x)"
+                                                 for solution in solutions)
+                        result_text += f"\nAnytime Solutions: {improvements}\n"
+                # Never touch Tk from this worker thread
+                self.updates.call(self.show_result, result_text, path, result.trace, token)
+
+            threading.Thread(target=run_algorithm, daemon=True).start()
+
+    def reset(self):
+        self.cancel_search()
+        self.view.clear_styles()
+        for var in self.dropdown_vars.values():
+            var.set(" ")
+        self.result_text_widget.delete(1.0, tk.END)
+
+    def back_to_menu(self):
+        # Stop everything that would otherwise keep running on the Tk timer
+        self.cancel_search()
+        self.updates.stop()
+        self.view.close()
+        self.root.destroy()
+
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    AStarWindow(root, CityMap())
+    root.mainloop()
@@ -0,0 +1,3 @@
+# Benchmarks for the search engine. Run them from the Source folder, e.g.
+#   python -m benchmarks.frontiers
+#   python -m benchmarks.suite --sizes 1000 10000 100000 --output results.json
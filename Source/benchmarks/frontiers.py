@@ -0,0 +1,51 @@
+import argparse
+import random
+import time
+
+from engine import FRONTIERS, Landmarks, a_star_search, uniform_cost_search
+
+from .graphs import grid_graph
+
+
+def run(graph, queries, search, frontier):
+    expanded = 0
+    max_frontier = 0
+    started = time.perf_counter()
+    for start, goal in queries:
+        result = search(graph, start, goal, frontier=frontier)
+        expanded += result.nodes_expanded
+        max_frontier = max(max_frontier, result.max_frontier_size)
+    return time.perf_counter() - started, expanded, max_frontier
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare frontier backends")
+    parser.add_argument("--side", type=int, default=100, help="grid side length")
+    parser.add_argument("--max-weight", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    graph = grid_graph(args.side, args.max_weight, args.seed)
+    rng = random.Random(args.seed)
+    queries = [(rng.randrange(graph.num_nodes), rng.randrange(graph.num_nodes)) for _ in range(args.queries)]
+    print(f"{graph.num_nodes} nodes, {graph.num_edges} edges, {len(queries)} queries")
+    print(f"{'search':<6} {'frontier':<10} {'seconds':>9} {'expanded':>10} {'max frontier':>13}")
+
+    # A* gets ALT landmark heuristics. Its f values aren't guaranteed to be
+    # monotone integers, so the bucket and radix queues only run UCS
+    landmarks = Landmarks.build(graph)
+
+    def astar(graph, start, goal, frontier):
+        return a_star_search(graph, start, goal, landmarks.heuristic(goal), frontier=frontier)
+
+    for label, search in (("ucs", uniform_cost_search), ("astar", astar)):
+        for name in FRONTIERS:
+            if label == "astar" and name in ("bucket", "radix"):
+                continue
+            seconds, expanded, max_frontier = run(graph, queries, search, name)
+            print(f"{label:<6} {name:<10} {seconds:>9.3f} {expanded:>10} {max_frontier:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import math
+import random
+
+from engine import CSRGraph
+
+
+# Seeded synthetic graphs for the benchmarks. The same (size, seed) always
+# gives the same graph, so numbers can be compared between releases.
+# Every edge is added in both directions, like the roads on the GUI maps.
+
+
+def _undirected(edges, source, target, weight):
+    edges.append((source, target, weight))
+    edges.append((target, source, weight))
+
+
+# Square grid with random integer "mileage" weights on every edge
+def grid_graph(side, max_weight, seed):
+    rng = random.Random(seed)
+    names = [f"{row},{col}" for row in range(side) for col in range(side)]
+    coordinates = {name: (float(i % side), float(i // side)) for i, name in enumerate(names)}
+    edges = []
+    for row in range(side):
+        for col in range(side):
+            node = row * side + col
+            for neighbor in ((node + 1) if col + 1 < side else None, (node + side) if row + 1 < side else None):
+                if neighbor is not None:
+                    _undirected(edges, node, neighbor, rng.randint(1, max_weight))
+    return CSRGraph.from_edges(names, edges, coordinates)
+
+
+# Points scattered over the unit square, each joined to the points within
+# a radius picked for about `degree` neighbours. Weights are the Euclidean
+# distances, so the straight-line distance is an exact lower bound.
+def geometric_graph(n, degree, seed):
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for _ in range(n)]
+    radius = math.sqrt(degree / (math.pi * n))
+
+    # Bucket points into radius sized cells so each point only checks the
+    # 3x3 block of cells around it
+    cells = {}
+    for node, (x, y) in enumerate(points):
+        cells.setdefault((int(x / radius), int(y / radius)), []).append(node)
+
+    edges = []
+    for node, (x, y) in enumerate(points):
+        cx = int(x / radius)
+        cy = int(y / radius)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other in cells.get((cx + dx, cy + dy), ()):
+                    if other <= node:
+                        continue
+                    distance = math.hypot(x - points[other][0], y - points[other][1])
+                    if distance <= radius:
+                        _undirected(edges, node, other, distance)
+
+    names = [str(node) for node in range(n)]
+    coordinates = dict(zip(names, points))
+    return CSRGraph.from_edges(names, edges, coordinates)
+
+
+# Barabasi-Albert preferential attachment: every new node links to `links`
+# existing nodes picked in proportion to their degree, which gives a few
+# heavily connected hubs like an airline network
+def scale_free_graph(n, links, max_weight, seed):
+    rng = random.Random(seed)
+    links = max(1, min(links, n - 1))
+    edges = []
+    # Every edge end appears once here, so a uniform pick is degree weighted
+    ends = []
+    for node in range(1, links + 1):
+        _undirected(edges, 0, node, rng.randint(1, max_weight))
+        ends.extend((0, node))
+    for node in range(links + 1, n):
+        chosen = set()
+        while len(chosen) < links:
+            chosen.add(rng.choice(ends))
+        for other in chosen:
+            _undirected(edges, node, other, rng.randint(1, max_weight))
+            ends.extend((node, other))
+    names = [str(node) for node in range(n)]
+    return CSRGraph.from_edges(names, edges)
+
+
+GENERATORS = {
+    "grid": lambda n, seed: grid_graph(max(2, int(math.sqrt(n))), 100, seed),
+    "geometric": lambda n, seed: geometric_graph(n, 8, seed),
+    "scale_free": lambda n, seed: scale_free_graph(n, 2, 100, seed),
+}
+
+
+# Fixed origin/destination pairs for a graph
+def query_pairs(graph, count, seed):
+    rng = random.Random(seed)
+    return [(rng.randrange(graph.num_nodes), rng.randrange(graph.num_nodes)) for _ in range(count)]
@@ -0,0 +1,157 @@
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from engine import (ContractionHierarchy, Landmarks, ShortestPathTreeCache, UniformCostSearch, a_star_search,
+                    bidirectional_a_star, bidirectional_search, uniform_cost_search)
+
+from .graphs import GENERATORS, query_pairs
+
+DEFAULT_SIZES = (1000, 10000)
+# Contraction takes minutes in pure Python past this many nodes
+DEFAULT_CH_MAX_NODES = 20000
+
+
+# Each engine is set up once per graph (that time is reported as
+# preprocess_seconds) and returns a query function query(start, goal).
+def _ucs(graph):
+    return lambda start, goal: uniform_cost_search(graph, start, goal)
+
+
+def _ucs_cached(graph):
+    return UniformCostSearch(graph, ShortestPathTreeCache(graph)).search
+
+
+def _astar(graph):
+    landmarks = Landmarks.build(graph)
+    return lambda start, goal: a_star_search(graph, start, goal, landmarks.heuristic(goal))
+
+
+def _bidirectional(graph):
+    return lambda start, goal: bidirectional_search(graph, start, goal)
+
+
+def _bidirectional_astar(graph):
+    landmarks = Landmarks.build(graph)
+    graph.reversed()
+    return lambda start, goal: bidirectional_a_star(graph, start, goal, landmarks.heuristic(goal),
+                                                    landmarks.reverse_heuristic(start))
+
+
+def _contraction(graph):
+    return ContractionHierarchy.build(graph).query
+
+
+ENGINES = {
+    "ucs": _ucs,
+    "ucs_cached": _ucs_cached,
+    "astar": _astar,
+    "bidirectional": _bidirectional,
+    "bidirectional_astar": _bidirectional_astar,
+    "contraction": _contraction,
+}
+
+
+# Nearest-rank percentile of an already sorted list
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(len(values) * fraction))
+    return values[rank - 1]
+
+
+def run_engine(graph, queries, setup, measure_memory=True):
+    started = time.perf_counter()
+    query = setup(graph)
+    preprocess_seconds = time.perf_counter() - started
+
+    latencies = []
+    expanded = []
+    found = 0
+    for start, goal in queries:
+        started = time.perf_counter()
+        result = query(start, goal)
+        latencies.append(time.perf_counter() - started)
+        expanded.append(result.nodes_expanded)
+        found += result.found
+    latencies.sort()
+
+    # Memory is measured in a second pass so tracemalloc's overhead does not
+    # show up in the latencies. The cached engine starts over with a new
+    # cache, otherwise every query would be a hit.
+    peak_memory = None
+    if measure_memory:
+        query = setup(graph)
+        peak_memory = 0
+        tracemalloc.start()
+        for start, goal in queries:
+            tracemalloc.reset_peak()
+            query(start, goal)
+            peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        "queries": len(queries),
+        "found": found,
+        "preprocess_seconds": preprocess_seconds,
+        "median_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_expanded": statistics.fmean(expanded) if expanded else 0.0,
+        "max_expanded": max(expanded, default=0),
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the search engines on seeded synthetic graphs")
+    parser.add_argument("--families", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES),
+                        help="approximate node counts, e.g. 1000 10000 100000 1000000")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--ch-max-nodes", type=int, default=DEFAULT_CH_MAX_NODES,
+                        help="skip contraction hierarchies on bigger graphs")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", default="benchmark-results.json")
+    args = parser.parse_args()
+
+    results = []
+    for family in args.families:
+        for size in args.sizes:
+            started = time.perf_counter()
+            graph = GENERATORS[family](size, args.seed)
+            build_seconds = time.perf_counter() - started
+            queries = query_pairs(graph, args.queries, args.seed)
+            print(f"{family} {graph.num_nodes} nodes, {graph.num_edges} edges ({build_seconds:.1f}s to build)")
+
+            for engine in args.engines:
+                if engine == "contraction" and graph.num_nodes > args.ch_max_nodes:
+                    print(f"  {engine:<20} skipped (more than {args.ch_max_nodes} nodes)")
+                    continue
+                row = run_engine(graph, queries, ENGINES[engine], not args.no_memory)
+                row.update(family=family, size=size, nodes=graph.num_nodes, edges=graph.num_edges, engine=engine)
+                results.append(row)
+                print(f"  {engine:<20} median {row['median_ms']:9.3f} ms  p99 {row['p99_ms']:9.3f} ms  "
+                      f"expanded {row['mean_expanded']:10.1f}")
+
+    report = {
+        "seed": args.seed,
+        "queries": args.queries,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+        file.write("\n")
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
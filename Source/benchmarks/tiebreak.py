@@ -0,0 +1,58 @@
+import argparse
+import time
+
+from engine import Landmarks, a_star_search, uniform_cost_search
+
+from .graphs import grid_graph, query_pairs
+
+TIE_BREAKS = (None, "fifo", "lifo", "g")
+
+
+def run(graph, queries, search, tie_break):
+    expanded = 0
+    started = time.perf_counter()
+    for start, goal in queries:
+        expanded += search(start, goal, tie_break).nodes_expanded
+    return time.perf_counter() - started, expanded
+
+
+def manhattan(graph, goal):
+    # Exact on a unit grid with no obstacles, so every node on a shortest
+    # path has the same f: the worst case for ties
+    xs = graph.xs
+    ys = graph.ys
+    return [abs(xs[node] - xs[goal]) + abs(ys[node] - ys[goal]) for node in range(graph.num_nodes)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare frontier tie-breaking rules")
+    parser.add_argument("--side", type=int, default=100, help="grid side length")
+    parser.add_argument("--max-weight", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # A grid with random weights has few ties; a unit-weight grid is almost
+    # nothing but plateaus
+    weighted = grid_graph(args.side, args.max_weight, args.seed)
+    unit = grid_graph(args.side, 1, args.seed)
+    landmarks = Landmarks.build(weighted)
+    cases = [
+        ("weighted", "ucs", weighted, lambda s, t, tb: uniform_cost_search(weighted, s, t, tie_break=tb)),
+        ("weighted", "astar", weighted,
+         lambda s, t, tb: a_star_search(weighted, s, t, landmarks.heuristic(t), tie_break=tb)),
+        ("unit", "ucs", unit, lambda s, t, tb: uniform_cost_search(unit, s, t, tie_break=tb)),
+        ("unit", "astar", unit, lambda s, t, tb: a_star_search(unit, s, t, manhattan(unit, t), tie_break=tb)),
+    ]
+
+    print(f"{args.side}x{args.side} grids, {args.queries} queries")
+    print(f"{'graph':<9} {'search':<6} {'tie break':<10} {'seconds':>9} {'expanded':>10}")
+    for graph_label, label, graph, search in cases:
+        queries = query_pairs(graph, args.queries, args.seed)
+        for tie_break in TIE_BREAKS:
+            seconds, expanded = run(graph, queries, search, tie_break)
+            print(f"{graph_label:<9} {label:<6} {tie_break or 'none':<10} {seconds:>9.3f} {expanded:>10}")
+
+
+if __name__ == "__main__":
+    main()
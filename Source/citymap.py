@@ -0,0 +1,63 @@
+import threading
+
+from engine import CSRGraph, GeometricHeuristic, Landmarks
+
+# Positions of the cities on the canvas
+COORDINATES = {
+    "Dallas": (200, 400),
+    "Los Angeles": (100, 200),
+    "San Francisco": (100, 100),
+    "Chicago": (400, 50),
+    "New York": (400, 200),
+    "Boston": (600, 100),
+    "Miami": (600, 300)
+}
+
+# Roads between cities with their distances; every road goes both ways
+ROADS = [
+    ("Dallas", "Los Angeles", 1700),
+    ("Los Angeles", "San Francisco", 500),
+    ("San Francisco", "Chicago", 2200),
+    ("Chicago", "New York", 800),
+    ("New York", "Boston", 250),
+    ("New York", "Miami", 1000),
+    ("New York", "Dallas", 1500),
+    ("New York", "Los Angeles", 3000),
+    ("Dallas", "Miami", 1200),
+]
+
+
+# The map and the search engine state the A* and UCS windows share. The
+# launcher makes one and hands it to every window it opens, so the graph is
+# built once and the landmarks are reused by the next window instead of
+# being computed again.
+class CityMap:
+    def __init__(self, coordinates=COORDINATES, roads=ROADS):
+        self.coordinates = coordinates
+        self.roads = roads
+        self.graph = {city: {} for city in coordinates}
+        for city1, city2, distance in roads:
+            self.graph[city1][city2] = distance
+            self.graph[city2][city1] = distance
+
+        # Compact copy of the graph that the search engine runs on
+        self.engine_graph = CSRGraph.from_dict(self.graph, coordinates)
+        self._landmarks = None
+        self._geometric = {}
+        self.lock = threading.Lock()
+
+    @property
+    def landmarks(self):
+        # Landmark (ALT) heuristics for A*, built when the first A* window opens
+        with self.lock:
+            if self._landmarks is None:
+                self._landmarks = Landmarks.build(self.engine_graph, count=4)
+            return self._landmarks
+
+    def geometric(self, metric):
+        # Heuristic from the city positions ("euclidean" or "manhattan"),
+        # scaled to stay below the road distances; built on first use
+        with self.lock:
+            if metric not in self._geometric:
+                self._geometric[metric] = GeometricHeuristic(self.engine_graph, metric)
+            return self._geometric[metric]
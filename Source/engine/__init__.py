@@ -0,0 +1,20 @@
+# Headless route search engine. Nothing in this package imports tkinter,
+# so it can be used from batch jobs and servers without a display.
+from .batch import BatchAnswer, BatchRunner, SharedGraph
+from .bidirectional import bidirectional_a_star, bidirectional_search
+from .cancel import BUDGET, CANCELLED, DEADLINE, CancellationToken
+from .contraction import ContractionHierarchy, contraction_hierarchy_search
+from .frontier import (FRONTIERS, TIE_BREAKS, BucketQueue, IndexedHeap, LazyHeap, PairingHeap, RadixHeap,
+                       make_frontier, make_tie_break_key)
+from .geometry import GeometricHeuristic
+from .graph import CSRGraph
+from .importer import import_csv, import_dimacs, import_graph
+from .incremental import IncrementalSearch
+from .landmarks import Landmarks
+from .metrics import MetricsCollector, SearchMetrics
+from .search import (DETAIL_COST, DETAIL_FULL, DETAIL_PATH, MultiTargetResult, SearchResult, UniformCostSearch,
+                     a_star_search, anytime_a_star, multi_target_search, shortest_path_costs, uniform_cost_search)
+from .spt_cache import ShortestPathTree, ShortestPathTreeCache
+from .storage import NameTable, load_graph, save_graph
+from .trace import EXPAND, PATH, RELAX, SearchTrace
+from .workspace import SearchWorkspace
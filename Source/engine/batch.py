@@ -0,0 +1,192 @@
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+from .bidirectional import bidirectional_search
+from .graph import CSRGraph, typecode_of
+from .metrics import SearchMetrics
+from .search import DETAIL_COST, DETAIL_PATH, uniform_cost_search
+from .spt_cache import ShortestPathTreeCache
+
+# Queries handed to a worker at a time; bigger chunks mean less IPC
+DEFAULT_CHUNK_SIZE = 256
+
+ALGORITHMS = {
+    "ucs": uniform_cost_search,
+    "bidirectional": bidirectional_search,
+}
+
+
+# The CSR arrays of a graph copied once into shared memory blocks. Workers
+# attach to the blocks by name, so the graph is never pickled and every
+# process reads the same physical pages.
+class SharedGraph:
+    def __init__(self, graph, include_reverse=False):
+        self.blocks = []
+        self.layout = {}
+        arrays = {"offsets": graph.offsets, "targets": graph.targets, "weights": graph.weights}
+        if include_reverse:
+            reverse = graph.reversed()
+            arrays.update(reverse_offsets=reverse.offsets, reverse_targets=reverse.targets,
+                          reverse_weights=reverse.weights)
+        for key, values in arrays.items():
+            data = memoryview(values).cast("B")
+            block = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+            block.buf[:len(data)] = data
+            self.blocks.append(block)
+            self.layout[key] = (block.name, typecode_of(values), len(values))
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def _attach(layout):
+    blocks = []
+    arrays = {}
+    for key, (name, typecode, length) in layout.items():
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        # The block can be longer than the array (an empty one still gets a
+        # byte), so cut it to size before casting
+        arrays[key] = block.buf[:length * array(typecode).itemsize].cast(typecode)
+    graph = CSRGraph(None, arrays["offsets"], arrays["targets"], arrays["weights"])
+    if "reverse_offsets" in arrays:
+        reverse = CSRGraph(None, arrays["reverse_offsets"], arrays["reverse_targets"], arrays["reverse_weights"])
+        reverse._reverse = graph
+        graph._reverse = reverse
+    return blocks, graph
+
+
+# Per-process state set up once by the pool initializer
+_worker = {}
+
+
+def _init_worker(layout, algorithm, frontier, with_paths, metrics, cache_trees):
+    blocks, graph = _attach(layout)
+    # Queries only ever need the cost and maybe the path, so UCS is told not
+    # to record the expansion order and visit counts at all
+    options = {"detail": DETAIL_PATH if with_paths else DETAIL_COST} if algorithm == "ucs" else {}
+    find = ALGORITHMS[algorithm]
+    if cache_trees:
+        # Each worker keeps the search trees of the origins it has seen
+        cache = ShortestPathTreeCache(graph, frontier=frontier)
+
+        def search(start, goal, metrics):
+            return cache.search(start, goal, metrics=metrics, **options)
+    else:
+        def search(start, goal, metrics):
+            return find(graph, start, goal, frontier=frontier, metrics=metrics, **options)
+    _worker.update(blocks=blocks, search=search, with_paths=with_paths, metrics=metrics)
+
+
+def _run_chunk(chunk):
+    search = _worker["search"]
+    with_paths = _worker["with_paths"]
+    # Counters are summed over the chunk so only one small object goes back
+    totals = SearchMetrics() if _worker["metrics"] else None
+    started = time.perf_counter()
+    answers = []
+    for index, start, goal in chunk:
+        metrics = SearchMetrics() if totals is not None else None
+        result = search(start, goal, metrics)
+        if metrics is not None:
+            totals.add(metrics)
+        path = result.path if with_paths and result.found else None
+        answers.append((index, start, goal, result.total_cost, path, result.nodes_expanded))
+    return os.getpid(), time.perf_counter() - started, answers, totals
+
+
+# Answer of one batch query; path is a list of node ids or None
+class BatchAnswer:
+    __slots__ = ("index", "start", "goal", "total_cost", "path", "nodes_expanded")
+
+    def __init__(self, index, start, goal, total_cost, path, nodes_expanded):
+        self.index = index
+        self.start = start
+        self.goal = goal
+        self.total_cost = total_cost
+        self.path = path
+        self.nodes_expanded = nodes_expanded
+
+
+# Runs many origin/destination queries across a process pool.
+#
+#   with BatchRunner(graph, workers=8) as runner:
+#       for answer in runner.run(pairs):
+#           ...
+#       print(runner.worker_stats())
+#
+# Search counters are off by default; with metrics=True they are summed
+# over all queries into runner.metrics.
+#
+# With cache_trees=True (UCS only) every worker keeps a ShortestPathTreeCache,
+# so a query from an origin the worker has already searched from reuses that
+# search tree. It pays off for many queries from few origins; list them
+# grouped by origin so they land in the same chunks.
+class BatchRunner:
+    def __init__(self, graph, workers=None, algorithm="ucs", frontier="auto", with_paths=True,
+                 chunk_size=DEFAULT_CHUNK_SIZE, metrics=False, cache_trees=False):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {algorithm}")
+        if cache_trees and algorithm != "ucs":
+            raise ValueError("cache_trees only works with the ucs algorithm")
+        self.chunk_size = chunk_size
+        self.shared = SharedGraph(graph, include_reverse=algorithm == "bidirectional")
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.shared.layout, algorithm, frontier, with_paths, metrics, cache_trees),
+        )
+        self.stats = {}
+        self.metrics = SearchMetrics() if metrics else None
+
+    def run(self, queries, ordered=True):
+        # queries: iterable of (start, goal) node id pairs. Answers stream
+        # back in query order, or as soon as they are ready if ordered=False.
+        futures = []
+        chunk = []
+        for index, (start, goal) in enumerate(queries):
+            chunk.append((index, start, goal))
+            if len(chunk) == self.chunk_size:
+                futures.append(self.executor.submit(_run_chunk, chunk))
+                chunk = []
+        if chunk:
+            futures.append(self.executor.submit(_run_chunk, chunk))
+
+        for future in (futures if ordered else as_completed(futures)):
+            pid, seconds, answers, totals = future.result()
+            self._record(pid, seconds, len(answers))
+            if totals is not None:
+                self.metrics.add(totals)
+            for answer in answers:
+                yield BatchAnswer(*answer)
+
+    def _record(self, pid, seconds, count):
+        queries, busy = self.stats.get(pid, (0, 0.0))
+        self.stats[pid] = (queries + count, busy + seconds)
+
+    def worker_stats(self):
+        # {pid: {"queries", "seconds", "queries_per_second"}} for each worker
+        return {
+            pid: {
+                "queries": queries,
+                "seconds": busy,
+                "queries_per_second": queries / busy if busy else 0.0,
+            }
+            for pid, (queries, busy) in self.stats.items()
+        }
+
+    def close(self):
+        self.executor.shutdown()
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,136 @@
+from .frontier import make_frontier
+from .search import SearchResult, _heuristic_function
+
+FORWARD = 0
+BACKWARD = 1
+
+
+# Searches from start and goal at the same time and stops once the two
+# frontiers prove that no better meeting point can exist.
+#
+# potential is the forward potential p(v). Forward keys are g(v) + p(v) and
+# backward keys are g(v) - p(v); because the two potentials sum to zero,
+# the search can stop as soon as top_forward + top_backward >= best cost.
+# With p = 0 this is plain bidirectional Dijkstra.
+def _bidirectional(graph, start, goal, potential, monotone_integer_keys, trace, frontier, metrics, cancel):
+    if metrics is not None:
+        metrics.start()
+    sample_every = metrics.memory_sample_every if metrics is not None else 0
+    graphs = (graph, graph.reversed())
+    signs = (1, -1)
+    costs = ({start: 0}, {goal: 0})
+    parents = ({start: None}, {goal: None})
+    settled = (set(), set())
+    queues = (make_frontier(frontier, graph, monotone_integer_keys),
+              make_frontier(frontier, graph, monotone_integer_keys))
+    queues[FORWARD].push(start, potential(start))
+    queues[BACKWARD].push(goal, -potential(goal))
+
+    traversed = []
+    expanded = [0, 0]
+    max_frontier_size = 0
+    visit_count = {start: 1}
+    visit_count[goal] = visit_count.get(goal, 0) + 1
+    relaxations = 0
+
+    best_cost = float('inf')
+    meeting_node = start if start == goal else None
+    if start == goal:
+        best_cost = 0
+
+    stopped = None
+    while queues[FORWARD] and queues[BACKWARD]:
+        if cancel is not None:
+            stopped = cancel.stop_reason(len(traversed))
+            if stopped:
+                # The best meeting point so far is not proven, so report none
+                best_cost = float('inf')
+                meeting_node = None
+                break
+        max_frontier_size = max(max_frontier_size, len(queues[FORWARD]) + len(queues[BACKWARD]))
+        if queues[FORWARD].peek()[0] + queues[BACKWARD].peek()[0] >= best_cost:
+            break
+
+        # Grow the smaller frontier; this keeps the two balls about even
+        side = FORWARD if len(queues[FORWARD]) <= len(queues[BACKWARD]) else BACKWARD
+        sign = signs[side]
+        search_graph = graphs[side]
+        cost = costs[side]
+        other_cost = costs[1 - side]
+        parent = parents[side]
+        done = settled[side]
+
+        current = queues[side].pop()[1]
+        done.add(current)
+        traversed.append(current)
+        expanded[side] += 1
+        if sample_every and not len(traversed) % sample_every:
+            metrics.sample_memory(costs + parents + settled + (traversed, visit_count),
+                                  len(queues[FORWARD]) + len(queues[BACKWARD]))
+        if trace is not None:
+            trace.expand(current)
+
+        offsets = search_graph.offsets
+        targets = search_graph.targets
+        weights = search_graph.weights
+        current_cost = cost[current]
+        for slot in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[slot]
+            if neighbor in done:
+                continue
+            new_cost = current_cost + weights[slot]
+            if neighbor not in cost or new_cost < cost[neighbor]:
+                cost[neighbor] = new_cost
+                parent[neighbor] = current
+                queues[side].push(neighbor, new_cost + sign * potential(neighbor))
+                relaxations += 1
+                visit_count[neighbor] = visit_count.get(neighbor, 0) + 1
+                if trace is not None:
+                    trace.relax(current, neighbor)
+
+                # A path through this edge joins the two searches
+                if neighbor in other_cost and new_cost + other_cost[neighbor] < best_cost:
+                    best_cost = new_cost + other_cost[neighbor]
+                    meeting_node = neighbor
+
+    path = None
+    if meeting_node is not None:
+        path = []
+        node = meeting_node
+        while node is not None:
+            path.append(node)
+            node = parents[FORWARD][node]
+        path.reverse()
+        node = parents[BACKWARD][meeting_node]
+        while node is not None:
+            path.append(node)
+            node = parents[BACKWARD][node]
+        if trace is not None:
+            trace.path(path)
+
+    if metrics is not None:
+        metrics.stop(relaxations + 2, sum(expanded), queues[FORWARD].stale_pops + queues[BACKWARD].stale_pops,
+                     relaxations)
+    return SearchResult(graph, path, best_cost, traversed, sum(expanded), max_frontier_size,
+                        visit_count, trace, tuple(expanded), stopped=stopped)
+
+
+# Bidirectional Dijkstra: uniform cost search from both ends
+def bidirectional_search(graph, start, goal, trace=None, frontier="auto", metrics=None, cancel=None):
+    return _bidirectional(graph, start, goal, lambda node: 0, True, trace, frontier, metrics, cancel)
+
+
+# Bidirectional A* with consistent average potentials.
+# heuristic estimates the distance to goal and reverse_heuristic the
+# distance to start (either can be None). The forward potential is
+# (h_goal(v) - h_start(v)) / 2 and the backward one is its negation, which
+# stays consistent whenever both heuristics are.
+def bidirectional_a_star(graph, start, goal, heuristic=None, reverse_heuristic=None, trace=None, frontier="auto",
+                         metrics=None, cancel=None):
+    to_goal = _heuristic_function(heuristic)
+    to_start = _heuristic_function(reverse_heuristic)
+
+    def potential(node):
+        return (to_goal(node) - to_start(node)) / 2
+
+    return _bidirectional(graph, start, goal, potential, False, trace, frontier, metrics, cancel)
@@ -0,0 +1,40 @@
+from time import perf_counter
+
+# Reasons a search stopped early, as stored in SearchResult.stopped
+CANCELLED = "cancelled"
+DEADLINE = "deadline"
+BUDGET = "budget"
+
+# The clock is only read every this many expansions; cancel() and the
+# expansion budget are checked on every one
+CHECK_CLOCK_EVERY = 64
+
+
+# Lets another thread stop a running search. Pass one to a search as
+# cancel=...; the search checks it once per expansion and, when told to
+# stop, returns straight away with no path and the counts so far.
+#
+# deadline is in seconds from when the token is created and covers every
+# search the token is given to, and max_expansions caps the expansions of
+# each of those searches on its own. The token keeps no per-search state,
+# so one token can be shared by searches running one after another or at
+# the same time; each search keeps the reason it stopped for itself.
+class CancellationToken:
+    def __init__(self, deadline=None, max_expansions=None):
+        self.deadline = None if deadline is None else perf_counter() + deadline
+        self.max_expansions = max_expansions
+        self.cancelled = False
+
+    def cancel(self):
+        # Safe to call from any thread
+        self.cancelled = True
+
+    def stop_reason(self, expanded):
+        # Why a search that has expanded this many nodes must stop, or None
+        if self.cancelled:
+            return CANCELLED
+        if self.max_expansions is not None and expanded >= self.max_expansions:
+            return BUDGET
+        if self.deadline is not None and not expanded % CHECK_CLOCK_EVERY and perf_counter() >= self.deadline:
+            return DEADLINE
+        return None
@@ -0,0 +1,243 @@
+import heapq
+
+from .graph import CSRGraph
+from .search import SearchResult
+
+# How many nodes a witness search may settle before giving up. Giving up
+# only means an extra shortcut is added, never a wrong answer.
+WITNESS_SETTLE_LIMIT = 64
+
+
+# Contraction Hierarchies for a static CSRGraph.
+#
+# Preprocessing contracts nodes one at a time, cheapest first by edge
+# difference (shortcuts added minus edges removed, plus the number of
+# already contracted neighbours). When node v is contracted, every
+# u -> v -> x that is not beaten by a witness path avoiding v becomes a
+# shortcut u -> x. Queries then only walk "upward" to higher ranked nodes
+# from both ends, which settles a tiny part of the graph.
+class ContractionHierarchy:
+    def __init__(self, graph, rank, upward, downward, middle):
+        self.graph = graph
+        self.rank = rank
+        # upward: edges u -> x with rank[u] < rank[x]
+        # downward: edges u -> x with rank[u] > rank[x], stored reversed (x -> u)
+        self.upward = upward
+        self.downward = downward
+        # (u, x) -> contracted node a shortcut skips over
+        self.middle = middle
+
+    @classmethod
+    def build(cls, graph, witness_limit=WITNESS_SETTLE_LIMIT, progress=None):
+        n = graph.num_nodes
+        out_edges = [{} for _ in range(n)]
+        in_edges = [{} for _ in range(n)]
+        for node in range(n):
+            for target, weight in graph.neighbors(node):
+                if target == node:
+                    continue
+                # Parallel edges: only the cheapest one matters
+                if target not in out_edges[node] or weight < out_edges[node][target]:
+                    out_edges[node][target] = weight
+                    in_edges[target][node] = weight
+
+        middle = {}
+        contracted = [False] * n
+        deleted_neighbors = [0] * n
+        rank = [0] * n
+
+        def witness_distance(source, target, excluded, limit):
+            # Dijkstra from source in the remaining graph without excluded,
+            # stopping at target, at limit cost or after witness_limit nodes
+            dist = {source: 0}
+            heap = [(0, source)]
+            settled = 0
+            while heap:
+                d, node = heapq.heappop(heap)
+                if node == target:
+                    return d
+                if d > limit or settled >= witness_limit:
+                    break
+                if d > dist[node]:
+                    continue
+                settled += 1
+                for next_node, weight in out_edges[node].items():
+                    if next_node == excluded or contracted[next_node]:
+                        continue
+                    new_dist = d + weight
+                    if new_dist < dist.get(next_node, new_dist + 1):
+                        dist[next_node] = new_dist
+                        heapq.heappush(heap, (new_dist, next_node))
+            return dist.get(target, float('inf'))
+
+        def shortcuts_for(node):
+            shortcuts = []
+            sources = [u for u in in_edges[node] if not contracted[u]]
+            targets = [x for x in out_edges[node] if not contracted[x]]
+            if not sources or not targets:
+                return shortcuts
+            max_out = max(out_edges[node][x] for x in targets)
+            for u in sources:
+                to_node = in_edges[node][u]
+                limit = to_node + max_out
+                for x in targets:
+                    if x == u:
+                        continue
+                    via = to_node + out_edges[node][x]
+                    if witness_distance(u, x, node, min(limit, via)) > via:
+                        shortcuts.append((u, x, via))
+            return shortcuts
+
+        def priority(node):
+            removed = sum(1 for u in in_edges[node] if not contracted[u])
+            removed += sum(1 for x in out_edges[node] if not contracted[x])
+            return len(shortcuts_for(node)) - removed + deleted_neighbors[node]
+
+        queue = [(priority(node), node) for node in range(n)]
+        heapq.heapify(queue)
+        order = 0
+        while queue:
+            _, node = heapq.heappop(queue)
+            if contracted[node]:
+                continue
+            # Lazy update: re-check the priority and put it back if another
+            # node has become cheaper in the meantime
+            current = priority(node)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, node))
+                continue
+
+            for u, x, weight in shortcuts_for(node):
+                if x not in out_edges[u] or weight < out_edges[u][x]:
+                    out_edges[u][x] = weight
+                    in_edges[x][u] = weight
+                    middle[(u, x)] = node
+
+            contracted[node] = True
+            rank[node] = order
+            order += 1
+            for neighbor in set(in_edges[node]) | set(out_edges[node]):
+                if not contracted[neighbor]:
+                    deleted_neighbors[neighbor] += 1
+            if progress:
+                progress(order, n)
+
+        # Original edges plus shortcuts, split by rank direction
+        upward_edges = []
+        downward_edges = []
+        for node in range(n):
+            for target, weight in out_edges[node].items():
+                if rank[node] < rank[target]:
+                    upward_edges.append((node, target, weight))
+                else:
+                    downward_edges.append((target, node, weight))
+        upward = CSRGraph.from_edges(graph.names, upward_edges)
+        downward = CSRGraph.from_edges(graph.names, downward_edges)
+        return cls(graph, rank, upward, downward, middle)
+
+    @property
+    def num_shortcuts(self):
+        return len(self.middle)
+
+    def _unpack(self, u, x, path):
+        # Appends the original nodes after u on the edge u -> x
+        stack = [(u, x)]
+        while stack:
+            a, b = stack.pop()
+            m = self.middle.get((a, b))
+            if m is None:
+                path.append(b)
+            else:
+                stack.append((m, b))
+                stack.append((a, m))
+
+    def query(self, start, goal, trace=None, metrics=None):
+        if metrics is not None:
+            metrics.start()
+        sample_every = metrics.memory_sample_every if metrics is not None else 0
+        graphs = (self.upward, self.downward)
+        costs = ({start: 0}, {goal: 0})
+        parents = ({start: None}, {goal: None})
+        heaps = ([(0, start)], [(0, goal)])
+        settled = (set(), set())
+        expanded = [0, 0]
+        traversed = []
+        max_frontier_size = 0
+        best_cost = float('inf')
+        meeting_node = None
+        pushes = 2
+        pops = 0
+        stale_pops = 0
+
+        side = 0
+        while heaps[0] or heaps[1]:
+            max_frontier_size = max(max_frontier_size, len(heaps[0]) + len(heaps[1]))
+            # Alternate directions; a direction is finished once its smallest
+            # key can no longer improve the best meeting cost
+            if not heaps[side] or heaps[side][0][0] >= best_cost:
+                if not heaps[1 - side] or heaps[1 - side][0][0] >= best_cost:
+                    break
+                side = 1 - side
+            heap = heaps[side]
+            cost = costs[side]
+            d, node = heapq.heappop(heap)
+            pops += 1
+            if node in settled[side]:
+                stale_pops += 1
+                continue
+            settled[side].add(node)
+            expanded[side] += 1
+            traversed.append(node)
+            if sample_every and not len(traversed) % sample_every:
+                metrics.sample_memory(costs + parents + settled + heaps + (traversed,))
+            if trace is not None:
+                trace.expand(node)
+
+            other = costs[1 - side]
+            if node in other and d + other[node] < best_cost:
+                best_cost = d + other[node]
+                meeting_node = node
+
+            search_graph = graphs[side]
+            offsets = search_graph.offsets
+            targets = search_graph.targets
+            weights = search_graph.weights
+            for slot in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[slot]
+                new_cost = d + weights[slot]
+                if neighbor not in cost or new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    parents[side][neighbor] = node
+                    heapq.heappush(heap, (new_cost, neighbor))
+                    pushes += 1
+            side = 1 - side
+
+        path = None
+        if meeting_node is not None:
+            # Hierarchy path: start ... meeting_node ... goal, with shortcuts
+            up = []
+            node = meeting_node
+            while node is not None:
+                up.append(node)
+                node = parents[0][node]
+            up.reverse()
+            node = parents[1][meeting_node]
+            while node is not None:
+                up.append(node)
+                node = parents[1][node]
+
+            path = [start]
+            for u, x in zip(up, up[1:]):
+                self._unpack(u, x, path)
+            if trace is not None:
+                trace.path(path)
+
+        if metrics is not None:
+            metrics.stop(pushes, pops, stale_pops, pushes - 2)
+        return SearchResult(self.graph, path, best_cost, traversed, sum(expanded), max_frontier_size,
+                            {}, trace, tuple(expanded))
+
+
+# Same call shape as the other searches; ch comes from ContractionHierarchy.build
+def contraction_hierarchy_search(ch, start, goal, trace=None, metrics=None):
+    return ch.query(start, goal, trace, metrics)
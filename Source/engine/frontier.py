@@ -0,0 +1,450 @@
+import heapq
+import itertools
+
+INFINITY = float('inf')
+
+# Priority queues for the search frontier. They all share one interface:
+#
+#   push(node, key)  insert node, or lower its key if it is already queued
+#                    with a larger one (decrease-key)
+#   pop()            remove and return (key, node) with the smallest key
+#   peek()           return (key, node) with the smallest key without removing it
+#                    (for the monotone queues later keys must not go below it)
+#   len(frontier)    number of distinct nodes currently queued
+#   node in frontier
+#
+# Each backend also counts stale_pops: entries it had to throw away because
+# a better copy of the same node was pushed later. Only the lazy heap has any.
+
+
+# Plain heapq with duplicate entries instead of decrease-key. This is what
+# the original searches did; kept as a baseline for benchmarks.
+class LazyHeap:
+    def __init__(self, num_nodes=0, max_weight=None):
+        self.heap = []
+        self.best = {}
+        self.stale_pops = 0
+
+    def push(self, node, key):
+        best = self.best.get(node)
+        if best is None or key < best:
+            self.best[node] = key
+            heapq.heappush(self.heap, (key, node))
+
+    def pop(self):
+        heap = self.heap
+        best = self.best
+        while True:
+            key, node = heapq.heappop(heap)
+            if best.get(node) == key:
+                del best[node]
+                return key, node
+            self.stale_pops += 1
+
+    def peek(self):
+        heap = self.heap
+        best = self.best
+        while best.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+            self.stale_pops += 1
+        return heap[0]
+
+    def __len__(self):
+        return len(self.best)
+
+    def __contains__(self, node):
+        return node in self.best
+
+
+# Binary heap that knows where every node sits, so decrease-key moves the
+# existing entry up instead of adding a duplicate.
+class IndexedHeap:
+    def __init__(self, num_nodes=0, max_weight=None):
+        self.nodes = []
+        self.keys = []
+        self.position = {}
+        self.stale_pops = 0
+
+    def push(self, node, key):
+        i = self.position.get(node)
+        if i is None:
+            i = len(self.nodes)
+            self.nodes.append(node)
+            self.keys.append(key)
+            self.position[node] = i
+        elif key < self.keys[i]:
+            self.keys[i] = key
+        else:
+            return
+        self._sift_up(i)
+
+    def pop(self):
+        nodes = self.nodes
+        keys = self.keys
+        node = nodes[0]
+        key = keys[0]
+        del self.position[node]
+        last_node = nodes.pop()
+        last_key = keys.pop()
+        if nodes:
+            nodes[0] = last_node
+            keys[0] = last_key
+            self.position[last_node] = 0
+            self._sift_down(0)
+        return key, node
+
+    def peek(self):
+        return self.keys[0], self.nodes[0]
+
+    def key_of(self, node):
+        i = self.position.get(node)
+        return None if i is None else self.keys[i]
+
+    def remove(self, node):
+        i = self.position.pop(node, None)
+        if i is None:
+            return
+        nodes = self.nodes
+        keys = self.keys
+        last_node = nodes.pop()
+        last_key = keys.pop()
+        if i < len(nodes):
+            nodes[i] = last_node
+            keys[i] = last_key
+            self.position[last_node] = i
+            self._sift_up(i)
+            self._sift_down(self.position[last_node])
+
+    def _sift_up(self, i):
+        nodes = self.nodes
+        keys = self.keys
+        position = self.position
+        node = nodes[i]
+        key = keys[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if not key < keys[parent]:
+                break
+            nodes[i] = nodes[parent]
+            keys[i] = keys[parent]
+            position[nodes[i]] = i
+            i = parent
+        nodes[i] = node
+        keys[i] = key
+        position[node] = i
+
+    def _sift_down(self, i):
+        nodes = self.nodes
+        keys = self.keys
+        position = self.position
+        size = len(nodes)
+        node = nodes[i]
+        key = keys[i]
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and keys[child + 1] < keys[child]:
+                child += 1
+            if not keys[child] < key:
+                break
+            nodes[i] = nodes[child]
+            keys[i] = keys[child]
+            position[nodes[i]] = i
+            i = child
+        nodes[i] = node
+        keys[i] = key
+        position[node] = i
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node):
+        return node in self.position
+
+
+class _PairingNode:
+    __slots__ = ("key", "node", "child", "sibling", "prev")
+
+    def __init__(self, key, node):
+        self.key = key
+        self.node = node
+        self.child = None
+        self.sibling = None
+        self.prev = None
+
+
+# Pairing heap: O(1) insert and decrease-key, amortised O(log n) pop
+class PairingHeap:
+    def __init__(self, num_nodes=0, max_weight=None):
+        self.root = None
+        self.handles = {}
+        self.stale_pops = 0
+
+    def _meld(self, a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        if b.key < a.key:
+            a, b = b, a
+        # b becomes the first child of a
+        b.prev = a
+        b.sibling = a.child
+        if a.child is not None:
+            a.child.prev = b
+        a.child = b
+        a.sibling = None
+        a.prev = None
+        return a
+
+    def push(self, node, key):
+        handle = self.handles.get(node)
+        if handle is None:
+            handle = _PairingNode(key, node)
+            self.handles[node] = handle
+            self.root = self._meld(self.root, handle)
+            return
+        if not key < handle.key:
+            return
+        handle.key = key
+        if handle is self.root:
+            return
+        # Cut the subtree out of its parent's child list and meld it back in
+        if handle.prev.child is handle:
+            handle.prev.child = handle.sibling
+        else:
+            handle.prev.sibling = handle.sibling
+        if handle.sibling is not None:
+            handle.sibling.prev = handle.prev
+        handle.sibling = None
+        handle.prev = None
+        self.root = self._meld(self.root, handle)
+
+    def pop(self):
+        root = self.root
+        del self.handles[root.node]
+
+        # Two-pass pairing of the root's children
+        pairs = []
+        child = root.child
+        while child is not None:
+            first = child
+            second = child.sibling
+            child = second.sibling if second is not None else None
+            first.sibling = first.prev = None
+            if second is not None:
+                second.sibling = second.prev = None
+            pairs.append(self._meld(first, second))
+        merged = None
+        for tree in reversed(pairs):
+            merged = self._meld(tree, merged)
+        self.root = merged
+        return root.key, root.node
+
+    def peek(self):
+        return self.root.key, self.root.node
+
+    def __len__(self):
+        return len(self.handles)
+
+    def __contains__(self, node):
+        return node in self.handles
+
+
+# Dial's bucket queue for integer keys. Keys must never go below the last
+# popped key or above it by more than max_weight, which is always true for
+# uniform cost search over non-negative integer weights.
+class BucketQueue:
+    def __init__(self, num_nodes=0, max_weight=1):
+        self.width = int(max_weight) + 1
+        self.buckets = [{} for _ in range(self.width)]
+        self.keys = {}
+        self.cursor = 0
+        self.stale_pops = 0
+
+    def push(self, node, key):
+        old = self.keys.get(node)
+        if old is not None:
+            if not key < old:
+                return
+            del self.buckets[old % self.width][node]
+        elif not self.keys and key >= self.cursor + self.width:
+            # Empty queue: let the window jump ahead to the new key
+            self.cursor = key
+        if key < self.cursor or key >= self.cursor + self.width:
+            raise ValueError("BucketQueue keys must stay within max_weight of the last popped key")
+        self.keys[node] = key
+        self.buckets[key % self.width][node] = key
+
+    def _first_bucket(self):
+        # Every key in the window maps to its own bucket, so all entries of
+        # the first non-empty bucket share the smallest key
+        buckets = self.buckets
+        width = self.width
+        cursor = self.cursor
+        bucket = buckets[cursor % width]
+        while not bucket:
+            cursor += 1
+            bucket = buckets[cursor % width]
+        self.cursor = cursor
+        return bucket
+
+    def pop(self):
+        node, key = self._first_bucket().popitem()
+        del self.keys[node]
+        return key, node
+
+    def peek(self):
+        node, key = next(iter(self._first_bucket().items()))
+        return key, node
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, node):
+        return node in self.keys
+
+
+# Radix heap for monotone integer keys. Bucket i holds keys whose highest
+# differing bit from the last popped key is bit i - 1, so each key moves
+# down at most log(C) times.
+class RadixHeap:
+    def __init__(self, num_nodes=0, max_weight=None):
+        self.buckets = [{} for _ in range(65)]
+        self.keys = {}
+        self.bucket_of = {}
+        self.last = 0
+        self.stale_pops = 0
+
+    def push(self, node, key):
+        old = self.keys.get(node)
+        if old is not None:
+            if not key < old:
+                return
+            del self.buckets[self.bucket_of[node]][node]
+        if key < self.last:
+            raise ValueError("RadixHeap keys must not go below the last popped key")
+        index = (key ^ self.last).bit_length()
+        self.keys[node] = key
+        self.bucket_of[node] = index
+        self.buckets[index][node] = key
+
+    def _fill_first_bucket(self):
+        buckets = self.buckets
+        if not buckets[0]:
+            index = 1
+            while not buckets[index]:
+                index += 1
+            bucket = buckets[index]
+            buckets[index] = {}
+            last = min(bucket.values())
+            self.last = last
+            bucket_of = self.bucket_of
+            for node, key in bucket.items():
+                new_index = (key ^ last).bit_length()
+                bucket_of[node] = new_index
+                buckets[new_index][node] = key
+        return buckets[0]
+
+    def pop(self):
+        node, key = self._fill_first_bucket().popitem()
+        del self.keys[node]
+        del self.bucket_of[node]
+        return key, node
+
+    def peek(self):
+        node, key = next(iter(self._fill_first_bucket().items()))
+        return key, node
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, node):
+        return node in self.keys
+
+
+# Ways to break ties between frontier entries with the same priority:
+#   "g"     prefer the larger cost so far (at equal f = g + h that is the
+#           smaller h, i.e. the node that looks closest to the goal), then
+#           the earliest pushed
+#   "fifo"  the earliest pushed
+#   "lifo"  the latest pushed
+# Without one, the lazy heap breaks ties by node id and the indexed and
+# pairing heaps by wherever the entries sit in the heap; neither has
+# anything to do with the search.
+# Tie-broken keys are packed ints or tuples rather than plain costs, so the
+# bucket and radix queues can't hold them.
+TIE_BREAKS = ("g", "fifo", "lifo")
+
+
+# Returns key(g, h) building frontier keys that sort by g + h and then by
+# tie_break, or None for plain g + h keys.
+#
+# With integer weights the parts are packed into a single int, which
+# compares much faster than a tuple: (f, h, push counter) each get a fixed
+# bit field. h is rounded down, which keeps an admissible or consistent
+# heuristic so on integer weights. h above the largest possible path cost
+# (num_nodes * max_weight * weight) only loses its tie order, never its f
+# order. Other graphs get (f, h, counter) tuples.
+def make_tie_break_key(tie_break, graph, weight=1):
+    if tie_break is None:
+        return None
+    if tie_break not in TIE_BREAKS:
+        raise ValueError(f"Unknown tie break: {tie_break}")
+    counter = itertools.count()
+    by_g = tie_break == "g"
+    lifo = tie_break == "lifo"
+
+    if not graph.integer_weights:
+        def key(g, h):
+            number = next(counter)
+            return g + h, h if by_g else 0, -number if lifo else number
+        return key
+
+    # Every node is pushed at most once per incoming edge, plus the start
+    counter_bits = (graph.num_edges + 2).bit_length()
+    counter_mask = (1 << counter_bits) - 1
+    h_bits = int(max(weight, 1) * graph.num_nodes * max(graph.max_weight, 1)).bit_length() if by_g else 0
+    h_mask = (1 << h_bits) - 1
+    shift = h_bits + counter_bits
+
+    def key(g, h):
+        if h == INFINITY:
+            return INFINITY
+        h = int(h)
+        number = next(counter)
+        if lifo:
+            number = counter_mask - number
+        return ((g + h) << shift) | ((min(h, h_mask) if by_g else 0) << counter_bits) | number
+    return key
+
+
+FRONTIERS = {
+    "lazy": LazyHeap,
+    "indexed": IndexedHeap,
+    "pairing": PairingHeap,
+    "bucket": BucketQueue,
+    "radix": RadixHeap,
+}
+
+# Above this many buckets Dial's queue spends too long scanning empty ones
+MAX_BUCKETS = 1 << 16
+
+
+# Picks a frontier for one query. Integer keys that only grow (uniform cost
+# search over integer weights) can use the bucket or radix queues; anything
+# else falls back to the indexed binary heap.
+def make_frontier(frontier, graph, monotone_integer_keys=False, tie_broken_keys=False):
+    if frontier is None or frontier == "auto":
+        if monotone_integer_keys and graph.integer_weights and not tie_broken_keys:
+            frontier = "bucket" if graph.max_weight < MAX_BUCKETS else "radix"
+        else:
+            frontier = "indexed"
+    if isinstance(frontier, str):
+        frontier = FRONTIERS[frontier]
+    if tie_broken_keys and frontier in (BucketQueue, RadixHeap):
+        raise ValueError(f"{frontier.__name__} can't break ties; use the lazy, indexed or pairing frontier")
+    if frontier is BucketQueue:
+        return frontier(graph.num_nodes, graph.max_weight)
+    return frontier(graph.num_nodes)
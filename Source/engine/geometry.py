@@ -0,0 +1,178 @@
+import math
+import threading
+from collections import OrderedDict
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+METRICS = ("euclidean", "manhattan", "haversine")
+
+# Mean Earth radius; haversine distances are in kilometres
+EARTH_RADIUS_KM = 6371.0088
+
+# Goals whose heuristic is kept around; each costs one float per node
+DEFAULT_CACHED_GOALS = 16
+
+# The scale is shaved by this fraction so rounding in the distance sums
+# can't push h above the true cost on edges that set the scale
+SCALE_MARGIN = 1e-9
+
+
+def _distance(metric, x1, y1, x2, y2):
+    if metric == "euclidean":
+        return math.hypot(x1 - x2, y1 - y2)
+    if metric == "manhattan":
+        return abs(x1 - x2) + abs(y1 - y2)
+    lon1 = math.radians(x1)
+    lat1 = math.radians(y1)
+    lon2 = math.radians(x2)
+    lat2 = math.radians(y2)
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _distance_numpy(metric, x1, y1, x2, y2):
+    # Same as _distance, element-wise over whole arrays
+    if metric == "euclidean":
+        return numpy.hypot(x1 - x2, y1 - y2)
+    if metric == "manhattan":
+        return numpy.abs(x1 - x2) + numpy.abs(y1 - y2)
+    lon1 = numpy.radians(x1)
+    lat1 = numpy.radians(y1)
+    lon2 = numpy.radians(x2)
+    lat2 = numpy.radians(y2)
+    a = numpy.sin((lat2 - lat1) / 2) ** 2 + numpy.cos(lat1) * numpy.cos(lat2) * numpy.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * numpy.arcsin(numpy.minimum(1.0, numpy.sqrt(a)))
+
+
+# Heuristics from the node coordinates (graph.xs / graph.ys) instead of a
+# hand-typed table.
+#
+# The straight-line (or Manhattan, or great-circle) distance is only a
+# lower bound on the road cost if the weights are in the same units, so it
+# is scaled by the smallest weight / distance ratio over every edge. Every
+# edge then costs at least scale * its length, and by the triangle
+# inequality so does every path, which makes scale * distance admissible
+# and consistent whatever units the weights are in.
+#
+# For haversine, xs are longitudes and ys latitudes, times degrees_per_unit
+# (1e-6 for DIMACS .co files, which store millionths of a degree).
+#
+# heuristic(goal) returns a list indexed by node id, computed for every
+# node at once (with NumPy when it is installed) and cached per goal, so
+# A* only does a list lookup per node.
+class GeometricHeuristic:
+    def __init__(self, graph, metric="euclidean", degrees_per_unit=1.0, cached_goals=DEFAULT_CACHED_GOALS,
+                 use_numpy=True):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        if graph.xs is None or graph.ys is None:
+            raise ValueError("graph has no coordinates")
+        self.graph = graph
+        self.metric = metric
+        self.use_numpy = use_numpy and numpy is not None
+        self.cached_goals = cached_goals
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        if degrees_per_unit != 1 and metric == "haversine":
+            self.xs = [x * degrees_per_unit for x in graph.xs]
+            self.ys = [y * degrees_per_unit for y in graph.ys]
+        else:
+            self.xs = graph.xs
+            self.ys = graph.ys
+        self.scale = self._smallest_ratio() * (1 - SCALE_MARGIN)
+
+    def _edge_arrays(self):
+        # (sources, targets, weights) for every edge as NumPy arrays
+        graph = self.graph
+        offsets = numpy.asarray(graph.offsets, dtype=numpy.int64)
+        sources = numpy.repeat(numpy.arange(graph.num_nodes), numpy.diff(offsets))
+        return sources, numpy.asarray(graph.targets, dtype=numpy.int64), numpy.asarray(graph.weights,
+                                                                                      dtype=numpy.float64)
+
+    def _smallest_ratio(self):
+        # Edges between nodes at the same spot say nothing about the scale
+        graph = self.graph
+        metric = self.metric
+        xs = self.xs
+        ys = self.ys
+        if self.use_numpy:
+            sources, targets, weights = self._edge_arrays()
+            xs = numpy.asarray(xs, dtype=numpy.float64)
+            ys = numpy.asarray(ys, dtype=numpy.float64)
+            lengths = _distance_numpy(metric, xs[sources], ys[sources], xs[targets], ys[targets])
+            positive = lengths > 0
+            if not positive.any():
+                return 0.0
+            return float(numpy.min(weights[positive] / lengths[positive]))
+
+        best = math.inf
+        offsets = graph.offsets
+        targets = graph.targets
+        weights = graph.weights
+        for node in range(graph.num_nodes):
+            x = xs[node]
+            y = ys[node]
+            for slot in range(offsets[node], offsets[node + 1]):
+                target = targets[slot]
+                length = _distance(metric, x, y, xs[target], ys[target])
+                if length > 0 and weights[slot] / length < best:
+                    best = weights[slot] / length
+        return 0.0 if best == math.inf else best
+
+    def heuristic(self, goal):
+        # h[v]: lower bound on d(v, goal)
+        with self.lock:
+            h = self.cache.get(goal)
+            if h is not None:
+                self.cache.move_to_end(goal)
+                return h
+        h = self._compute(goal)
+        with self.lock:
+            self.cache[goal] = h
+            while len(self.cache) > self.cached_goals:
+                self.cache.popitem(last=False)
+        return h
+
+    def reverse_heuristic(self, start):
+        # Lower bound on d(start, v) for bidirectional A*. Every metric is
+        # symmetric and the scale holds for each edge in either direction.
+        return self.heuristic(start)
+
+    def _compute(self, goal):
+        metric = self.metric
+        scale = self.scale
+        xs = self.xs
+        ys = self.ys
+        gx = xs[goal]
+        gy = ys[goal]
+        if self.use_numpy:
+            xs = numpy.asarray(xs, dtype=numpy.float64)
+            ys = numpy.asarray(ys, dtype=numpy.float64)
+            return (scale * _distance_numpy(metric, xs, ys, gx, gy)).tolist()
+        return [scale * _distance(metric, x, y, gx, gy) for x, y in zip(xs, ys)]
+
+    def check_consistency(self, goal, tolerance=1e-6):
+        # Edges (node, neighbor) where h[node] > weight + h[neighbor], which
+        # would break consistency; empty when the heuristic is consistent.
+        # With NumPy every edge is checked in one pass.
+        h = self.heuristic(goal)
+        if self.use_numpy:
+            sources, targets, weights = self._edge_arrays()
+            h = numpy.asarray(h)
+            bad = numpy.nonzero(h[sources] > weights + h[targets] + tolerance)[0]
+            return list(zip(sources[bad].tolist(), targets[bad].tolist()))
+
+        graph = self.graph
+        offsets = graph.offsets
+        targets = graph.targets
+        weights = graph.weights
+        bad = []
+        for node in range(graph.num_nodes):
+            for slot in range(offsets[node], offsets[node + 1]):
+                target = targets[slot]
+                if h[node] > weights[slot] + h[target] + tolerance:
+                    bad.append((node, target))
+        return bad
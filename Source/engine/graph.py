@@ -0,0 +1,154 @@
+from array import array
+
+
+# Element type of an array.array, memoryview or NumPy array, as an array typecode
+def typecode_of(values):
+    typecode = getattr(values, "typecode", None) or getattr(values, "format", None)
+    if typecode is None:
+        dtype = getattr(values, "dtype", None)
+        typecode = dtype.char if dtype is not None else "d"
+    return typecode
+
+
+# Compact graph stored in CSR (compressed sparse row) form.
+# Node i's outgoing edges are targets[offsets[i]:offsets[i + 1]] with the
+# matching weights, and names/ids map city names to integer node ids.
+class CSRGraph:
+    def __init__(self, names, offsets, targets, weights, xs=None, ys=None):
+        self.names = names
+        self._ids = None
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.xs = xs
+        self.ys = ys
+        self._max_weight = None
+        self._reverse = None
+        # NumPy views of the sections, set by load_graph(use_numpy=True)
+        self.arrays = None
+
+    @classmethod
+    def from_dict(cls, graph, coordinates=None):
+        # graph is the GUI format: {city: {neighbor: distance}}
+        names = list(coordinates) if coordinates else []
+        seen = set(names)
+        for city, connections in graph.items():
+            for name in (city, *connections):
+                if name not in seen:
+                    seen.add(name)
+                    names.append(name)
+        ids = {name: i for i, name in enumerate(names)}
+
+        edges = []
+        for city, connections in graph.items():
+            for neighbor, distance in connections.items():
+                edges.append((ids[city], ids[neighbor], distance))
+        return cls.from_edges(names, edges, coordinates)
+
+    @classmethod
+    def from_edges(cls, names, edges, coordinates=None):
+        # edges is a list of directed (source_id, target_id, weight) triples
+        n = len(names)
+        degree = [0] * (n + 1)
+        for source, _, _ in edges:
+            degree[source + 1] += 1
+        for i in range(n):
+            degree[i + 1] += degree[i]
+        offsets = array("q", degree)
+
+        fill = list(degree[:n])
+        targets = array("q", bytes(8 * len(edges)))
+        integral = all(float(w).is_integer() for _, _, w in edges)
+        weights = array("q" if integral else "d", bytes(8 * len(edges)))
+        for source, target, weight in edges:
+            slot = fill[source]
+            targets[slot] = target
+            weights[slot] = int(weight) if integral else weight
+            fill[source] = slot + 1
+
+        xs = ys = None
+        if coordinates:
+            xs = array("d", (coordinates[name][0] if name in coordinates else 0.0 for name in names))
+            ys = array("d", (coordinates[name][1] if name in coordinates else 0.0 for name in names))
+        return cls(list(names), offsets, targets, weights, xs, ys)
+
+    @property
+    def ids(self):
+        # Built on first use; search workers that only see node ids never need it
+        if self._ids is None:
+            self._ids = {name: i for i, name in enumerate(self.names)}
+        return self._ids
+
+    @property
+    def num_nodes(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    @property
+    def integer_weights(self):
+        return typecode_of(self.weights) in "bhilqBHILQ"
+
+    @property
+    def max_weight(self):
+        if self._max_weight is None:
+            self._max_weight = max(self.weights, default=0)
+        return self._max_weight
+
+    def reversed(self):
+        # Same nodes with every edge flipped, for searches that run backwards
+        # from the goal. Built once and cached.
+        if self._reverse is None:
+            n = self.num_nodes
+            m = self.num_edges
+            offsets = self.offsets
+            targets = self.targets
+            weights = self.weights
+
+            counts = [0] * (n + 1)
+            for target in targets:
+                counts[target + 1] += 1
+            for i in range(n):
+                counts[i + 1] += counts[i]
+
+            fill = counts[:n]
+            reverse_targets = array("q", bytes(8 * m))
+            reverse_weights = array(typecode_of(weights), bytes(8 * m))
+            for node in range(n):
+                for slot in range(offsets[node], offsets[node + 1]):
+                    target = targets[slot]
+                    position = fill[target]
+                    reverse_targets[position] = node
+                    reverse_weights[position] = weights[slot]
+                    fill[target] = position + 1
+
+            reverse = CSRGraph(self.names, array("q", counts), reverse_targets, reverse_weights, self.xs, self.ys)
+            reverse._reverse = self
+            self._reverse = reverse
+        return self._reverse
+
+    def id_of(self, name):
+        return self.ids[name]
+
+    def name_of(self, node):
+        return self.names[node]
+
+    def neighbors(self, node):
+        # Yields (target, weight) pairs for the outgoing edges of node
+        targets = self.targets
+        weights = self.weights
+        for slot in range(self.offsets[node], self.offsets[node + 1]):
+            yield targets[slot], weights[slot]
+
+    def node_values(self, values, default=0):
+        # Turns a {city: value} table (e.g. the GUI heuristics) into a list indexed by node id
+        return [values.get(name, default) for name in self.names]
+
+    def to_dict(self):
+        graph = {name: {} for name in self.names}
+        for node, name in enumerate(self.names):
+            for target, weight in self.neighbors(node):
+                graph[name][self.names[target]] = weight
+        return graph
@@ -0,0 +1,257 @@
+import csv
+import io
+import os
+from array import array
+from bisect import bisect_left
+from itertools import compress, islice, repeat
+from operator import add, eq, floordiv, mod, mul, ne
+
+from .graph import CSRGraph
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Bytes read per chunk; memory for parsing stays at about this much no
+# matter how big the file is
+CHUNK_BYTES = 4 * 1024 * 1024
+# CSV rows handled per batch between progress callbacks
+CSV_BATCH_ROWS = 65536
+
+
+# Edge arrays filled chunk by chunk while a file is parsed, kept in flat
+# arrays (24 bytes per edge) and turned into CSR at the end.
+#
+# With NumPy the CSR is built with a sort over flat arrays, which peaks at
+# about 40 bytes per edge on top of the buffer. Without it the edges go
+# through one list of Python ints for the sort, about 60 bytes per edge and
+# several times slower. Undirected input doubles both, since every edge is
+# stored both ways.
+class EdgeBuffer:
+    def __init__(self, integral=True, base=0):
+        # base is the id of the first node in the file (1 for DIMACS)
+        self.base = base
+        self.sources = array("q")
+        self.targets = array("q")
+        self.weights = array("q" if integral else "d")
+
+    def extend(self, sources, targets, weights):
+        # weights may be floats; they stay int64 until one has a fraction
+        self.sources.extend(sources)
+        self.targets.extend(targets)
+        if self.weights.typecode == "q" and not all(map(float.is_integer, weights)):
+            self.weights = array("d", self.weights)
+        if self.weights.typecode == "q":
+            weights = map(int, weights)
+        self.weights.extend(weights)
+
+    def __len__(self):
+        return len(self.sources)
+
+    def to_graph(self, names, xs=None, ys=None, undirected=False):
+        if numpy is not None:
+            return self._to_graph_numpy(names, xs, ys, undirected)
+        n = len(names)
+        sources = self.sources
+        targets = self.targets
+        weights = self.weights
+        if undirected:
+            sources, targets = sources + targets, targets + sources
+            weights = weights + weights
+        m = len(sources)
+
+        keys = map(add, map(mul, sources, repeat(n)), targets)
+        if self.base:
+            keys = map(add, keys, repeat(-self.base * (n + 1)))
+        keys = array("q", keys)
+        if weights.typecode == "q" and min(weights, default=0) >= 0:
+            # Integer weights are packed under the (source, target) key so a
+            # single sort of plain ints orders the edges and puts the
+            # cheapest copy of every parallel edge first
+            scale = max(weights, default=0) + 1
+            packed = list(map(add, map(mul, keys, repeat(scale)), weights))
+            packed.sort()
+            keys = array("q", map(floordiv, packed, repeat(scale)))
+            weights = array("q", map(mod, packed, repeat(scale)))
+            del packed
+        else:
+            order = sorted(range(m), key=weights.__getitem__)
+            order.sort(key=keys.__getitem__)
+            weights = array(weights.typecode, map(weights.__getitem__, order))
+            keys = array("q", map(keys.__getitem__, order))
+            del order
+        if any(map(eq, keys, islice(keys, 1, None))):
+            # Parallel edges: keep the first, cheapest one of each run
+            keep = bytearray(b"\x01")
+            keep.extend(map(ne, islice(keys, 1, None), keys))
+            keys = array("q", compress(keys, keep))
+            weights = array(weights.typecode, compress(weights, keep))
+
+        csr_targets = array("q", map(mod, keys, repeat(n))) if n else array("q")
+        offsets = array("q", map(bisect_left, repeat(keys), range(0, (n + 1) * n, n) if n else [0]))
+        return CSRGraph(names, offsets, csr_targets, weights, xs, ys)
+
+    def _to_graph_numpy(self, names, xs, ys, undirected):
+        # Same result as the pure Python path. The arrays are copied back into
+        # array.array so the searches read Python ints, not numpy.int64.
+        n = len(names)
+        sources = numpy.frombuffer(self.sources, dtype=numpy.int64)
+        targets = numpy.frombuffer(self.targets, dtype=numpy.int64)
+        integral = self.weights.typecode == "q"
+        weights = numpy.frombuffer(self.weights, dtype=numpy.int64 if integral else numpy.float64)
+        if undirected:
+            sources, targets = numpy.concatenate((sources, targets)), numpy.concatenate((targets, sources))
+            weights = numpy.concatenate((weights, weights))
+
+        keys = sources * n + targets
+        del sources, targets
+        if self.base:
+            keys -= self.base * (n + 1)
+        # By (source, target), then cheapest first among parallel edges
+        order = numpy.lexsort((weights, keys))
+        keys = keys[order]
+        weights = weights[order]
+        del order
+        if len(keys) > 1:
+            keep = numpy.empty(len(keys), dtype=bool)
+            keep[0] = True
+            numpy.not_equal(keys[1:], keys[:-1], out=keep[1:])
+            if not keep.all():
+                keys = keys[keep]
+                weights = weights[keep]
+            del keep
+
+        csr_targets = array("q", (keys % n).tobytes()) if n else array("q")
+        offsets = array("q", numpy.searchsorted(keys, numpy.arange(0, (n + 1) * n, n) if n else [0]).astype(
+            numpy.int64).tobytes())
+        weights = array(self.weights.typecode, weights.tobytes())
+        return CSRGraph(names, offsets, csr_targets, weights, xs, ys)
+
+
+def _read_chunks(file, total, progress):
+    # Yields whole lines in chunks of about CHUNK_BYTES
+    done = 0
+    rest = b""
+    while True:
+        chunk = file.read(CHUNK_BYTES)
+        if not chunk:
+            break
+        done += len(chunk)
+        chunk = rest + chunk
+        cut = chunk.rfind(b"\n") + 1
+        if cut == 0:
+            rest = chunk
+            continue
+        rest = chunk[cut:]
+        yield chunk[:cut]
+        if progress:
+            progress(done, total)
+    if rest:
+        yield rest
+
+
+def _fields(chunk, prefix, width):
+    # Whitespace-split fields of the lines starting with prefix, each line
+    # giving width fields. Chunks holding nothing else (the usual case in
+    # the middle of a file) are split in one go.
+    fields = chunk.split()
+    if fields[::width].count(prefix) * width == len(fields):
+        return fields
+    lines = [line for line in chunk.split(b"\n") if line.startswith(prefix + b" ")]
+    return b" ".join(lines).split()
+
+
+# DIMACS shortest path files (9th DIMACS challenge): the .gr file has
+# "p sp <nodes> <arcs>" and "a <from> <to> <weight>" lines with 1-based
+# ids, and the optional .co file has "v <id> <x> <y>" lines. Arcs are
+# directed; road networks list both directions.
+def import_dimacs(gr_path, co_path=None, progress=None):
+    total = os.path.getsize(gr_path) + (os.path.getsize(co_path) if co_path else 0)
+    done = 0
+
+    def step(read, _):
+        if progress:
+            progress(done + read, total)
+
+    n = None
+    edges = EdgeBuffer(base=1)
+    with open(gr_path, "rb") as file:
+        for chunk in _read_chunks(file, total, step):
+            if n is None:
+                fields = _fields(chunk, b"p", 4)
+                if fields:
+                    n = int(fields[2])
+            fields = _fields(chunk, b"a", 4)
+            edges.sources.extend(map(int, islice(fields, 1, None, 4)))
+            edges.targets.extend(map(int, islice(fields, 2, None, 4)))
+            edges.weights.extend(map(int, islice(fields, 3, None, 4)))
+    done = os.path.getsize(gr_path)
+    if n is None:
+        n = max(max(edges.sources, default=0), max(edges.targets, default=0))
+
+    xs = ys = None
+    if co_path:
+        xs = array("d", bytes(8 * n))
+        ys = array("d", bytes(8 * n))
+        with open(co_path, "rb") as file:
+            for chunk in _read_chunks(file, total, step):
+                fields = _fields(chunk, b"v", 4)
+                for node, x, y in zip(islice(fields, 1, None, 4), islice(fields, 2, None, 4),
+                                      islice(fields, 3, None, 4)):
+                    node = int(node) - 1
+                    xs[node] = float(x)
+                    ys[node] = float(y)
+
+    names = list(map(str, range(1, n + 1)))
+    return edges.to_graph(names, xs, ys)
+
+
+# CSV edge list: source,target,weight per row with city names in the first
+# two columns. A first row whose weight is not a number is taken as a
+# header. Roads are undirected by default, like the ones drawn in the
+# editor.
+def import_csv(path, undirected=True, progress=None, delimiter=","):
+    total = os.path.getsize(path)
+    ids = {}
+    names = []
+    edges = EdgeBuffer()
+
+    def intern(name):
+        node = ids.get(name)
+        if node is None:
+            node = ids[name] = len(names)
+            names.append(name)
+        return node
+
+    with open(path, "rb") as raw:
+        text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        rows = csv.reader(text, delimiter=delimiter)
+        first = True
+        while True:
+            batch = list(islice(rows, CSV_BATCH_ROWS))
+            if not batch:
+                break
+            if first:
+                first = False
+                try:
+                    float(batch[0][2])
+                except (IndexError, ValueError):
+                    batch = batch[1:]
+            batch = [row for row in batch if len(row) >= 3]
+            edges.extend(list(map(intern, (row[0].strip() for row in batch))),
+                         list(map(intern, (row[1].strip() for row in batch))),
+                         [float(row[2]) for row in batch])
+            if progress:
+                progress(raw.tell(), total)
+    return edges.to_graph(names, undirected=undirected)
+
+
+# Picks the parser from the file name: .gr (with a .co next to it if there
+# is one) or anything else as CSV
+def import_graph(path, progress=None):
+    if path.endswith(".gr"):
+        co_path = path[:-3] + ".co"
+        return import_dimacs(path, co_path if os.path.exists(co_path) else None, progress)
+    return import_csv(path, progress=progress)
+
@@ -0,0 +1,216 @@
+import heapq
+import threading
+
+from .search import INFINITY, SearchResult
+
+
+# Incremental shortest paths to one goal for a graph that is being edited
+# (D* Lite with a zero heuristic, i.e. LPA* run backwards from the goal).
+#
+# g[node] is the cost to the goal found so far and rhs[node] the one-step
+# lookahead min(weight(node, next) + g[next]). Nodes where the two differ
+# are "inconsistent" and sit in the queue. An edit only makes the nodes
+# next to it inconsistent, so the next search repairs the costs around the
+# edit instead of starting again; a search from a new start reuses every
+# cost to the goal that is already known.
+#
+# The planner keeps its own copy of the graph ({city: {neighbor: distance}},
+# like CSRGraph.from_dict takes). Tell it about edits with set_edge,
+# remove_edge, add_node and remove_node. Nodes get integer ids in order of
+# appearance; names/id_of work like on a CSRGraph, so results and traces
+# can be read the same way.
+#
+# Weights must be positive. Across a zero-cost cycle two nodes can keep
+# vouching for each other's old cost after the real route is cut, so the
+# planner refuses them rather than give wrong answers.
+class IncrementalSearch:
+    def __init__(self, graph, goal):
+        self.names = []
+        self.ids = {}
+        self.pushes = 0
+        self.lock = threading.Lock()
+        self.successors = {}
+        self.predecessors = {}
+        self._add_node(goal)
+        for city, connections in graph.items():
+            self._add_node(city)
+            for neighbor in connections:
+                self._add_node(neighbor)
+        for city, connections in graph.items():
+            for neighbor, distance in connections.items():
+                self._connect(self.ids[city], self.ids[neighbor], distance)
+
+        self.goal = self.ids[goal]
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        self.queue = [(0, self.goal)]
+        self.queued = {self.goal: 0}
+
+    def id_of(self, name):
+        return self.ids[name]
+
+    def name_of(self, node):
+        return self.names[node]
+
+    def add_node(self, name):
+        with self.lock:
+            self._add_node(name)
+
+    def _add_node(self, name):
+        if name not in self.ids:
+            node = len(self.names)
+            self.ids[name] = node
+            self.names.append(name)
+            self.successors[node] = {}
+            self.predecessors[node] = {}
+
+    def _connect(self, node, neighbor, weight):
+        if not weight > 0:
+            raise ValueError(f"incremental search needs positive weights, got {weight} from "
+                             f"{self.names[node]} to {self.names[neighbor]}")
+        self.successors[node][neighbor] = weight
+        self.predecessors[neighbor][node] = weight
+
+    def set_edge(self, city, neighbor, weight):
+        # Adds the directed edge city -> neighbor or changes its weight
+        with self.lock:
+            self._add_node(city)
+            self._add_node(neighbor)
+            node = self.ids[city]
+            self._connect(node, self.ids[neighbor], weight)
+            self._update(node)
+
+    def remove_edge(self, city, neighbor):
+        # Cities the planner has never seen have no edges to remove
+        with self.lock:
+            node = self.ids.get(city)
+            other = self.ids.get(neighbor)
+            if node is None or other is None:
+                return
+            self.successors[node].pop(other, None)
+            self.predecessors[other].pop(node, None)
+            self._update(node)
+
+    def remove_node(self, city):
+        # The node's id stays taken so old traces keep their meaning. A city
+        # the planner has never seen is ignored.
+        with self.lock:
+            node = self.ids.get(city)
+            if node is None:
+                return
+            if node == self.goal:
+                raise ValueError("cannot remove the goal of an incremental search")
+            del self.ids[city]
+            for neighbor in self.successors.pop(node):
+                del self.predecessors[neighbor][node]
+            self.g.pop(node, None)
+            self.rhs.pop(node, None)
+            self.queued.pop(node, None)
+            for neighbor in self.predecessors.pop(node):
+                del self.successors[neighbor][node]
+                self._update(neighbor)
+
+    def _update(self, node, trace=None):
+        # Recompute the lookahead of node and queue it if it is inconsistent
+        if node != self.goal:
+            g = self.g
+            best = INFINITY
+            best_next = None
+            for neighbor, weight in self.successors[node].items():
+                cost = weight + g.get(neighbor, INFINITY)
+                if cost < best:
+                    best = cost
+                    best_next = neighbor
+            if trace is not None and best < self.rhs.get(node, INFINITY):
+                trace.relax(best_next, node)
+            self.rhs[node] = best
+        key = min(self.g.get(node, INFINITY), self.rhs.get(node, INFINITY))
+        if self.g.get(node, INFINITY) != self.rhs.get(node, INFINITY):
+            if self.queued.get(node) != key:
+                self.queued[node] = key
+                heapq.heappush(self.queue, (key, node))
+                self.pushes += 1
+        else:
+            self.queued.pop(node, None)
+
+    def search(self, start, trace=None, metrics=None, cancel=None):
+        # Cheapest path from start to the goal, repairing only what the
+        # edits since the last search made inconsistent. Cancelling leaves
+        # the remaining repairs queued for the next search.
+        with self.lock:
+            if metrics is not None:
+                metrics.start()
+            sample_every = metrics.memory_sample_every if metrics is not None else 0
+            g = self.g
+            rhs = self.rhs
+            queue = self.queue
+            queued = self.queued
+            predecessors = self.predecessors
+            self.pushes = 0
+            stale_pops = 0
+            relaxations = 0
+            expanded = []
+            visit_count = {}
+            max_frontier_size = 0
+            stopped = None
+
+            while queue:
+                key, node = queue[0]
+                if queued.get(node) != key:
+                    heapq.heappop(queue)
+                    stale_pops += 1
+                    continue
+                start_g = g.get(start, INFINITY)
+                start_rhs = rhs.get(start, INFINITY)
+                if key >= min(start_g, start_rhs) and start_g == start_rhs:
+                    break
+                if cancel is not None:
+                    stopped = cancel.stop_reason(len(expanded))
+                    if stopped:
+                        break
+                max_frontier_size = max(max_frontier_size, len(queued))
+                heapq.heappop(queue)
+                del queued[node]
+                expanded.append(node)
+                if sample_every and not len(expanded) % sample_every:
+                    metrics.sample_memory((g, rhs, queued, expanded, visit_count), len(queue))
+                if trace is not None:
+                    trace.expand(node)
+
+                if g.get(node, INFINITY) > rhs[node]:
+                    # Cost went down: settle it and tell the nodes leading here
+                    g[node] = rhs[node]
+                else:
+                    # Cost went up: forget it and recompute everything around it
+                    g[node] = INFINITY
+                    self._update(node, trace)
+                for neighbor in predecessors[node]:
+                    self._update(neighbor, trace)
+                    relaxations += 1
+                    visit_count[neighbor] = visit_count.get(neighbor, 0) + 1
+
+            path = self.path_from(start) if stopped is None else []
+            if trace is not None:
+                trace.path(path)
+            if metrics is not None:
+                metrics.stop(self.pushes, len(expanded), stale_pops, relaxations)
+            return SearchResult(self, path, g.get(start, INFINITY) if path else INFINITY, expanded,
+                                len(expanded), max_frontier_size, visit_count, trace, stopped=stopped)
+
+    def path_from(self, start):
+        # Follow the cheapest next step from start; [] if the goal is out of
+        # reach, or if the steps go round in a circle (which positive
+        # weights rule out, but a stale cost must not hang the caller)
+        g = self.g
+        if g.get(start, INFINITY) == INFINITY:
+            return []
+        path = [start]
+        seen = {start}
+        node = start
+        while node != self.goal:
+            node = min(self.successors[node].items(), key=lambda item: item[1] + g.get(item[0], INFINITY))[0]
+            if node in seen:
+                return []
+            seen.add(node)
+            path.append(node)
+        return path
@@ -0,0 +1,188 @@
+import random
+from array import array
+
+from .search import INFINITY, shortest_path_costs
+
+DEFAULT_LANDMARKS = 8
+
+
+# ALT (A*, landmarks, triangle inequality) heuristics.
+#
+# For a few landmark nodes L we store d(L, v) and d(v, L) for every node v.
+# By the triangle inequality
+#     d(v, t) >= d(v, L) - d(t, L)   and   d(v, t) >= d(L, t) - d(L, v)
+# so the best of these bounds over all landmarks is an admissible and
+# consistent heuristic for any goal t, with no hand-tuned numbers.
+#
+# Distances are kept in two flat arrays laid out node by node:
+# from_landmark[v * k + i] = d(L_i, v), to_landmark[v * k + i] = d(v, L_i).
+class Landmarks:
+    def __init__(self, graph, landmarks, from_landmark, to_landmark):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.from_landmark = from_landmark
+        self.to_landmark = to_landmark
+
+    @classmethod
+    def build(cls, graph, count=DEFAULT_LANDMARKS, strategy="farthest", seed=0):
+        if strategy not in ("farthest", "avoid"):
+            raise ValueError(f"Unknown landmark strategy: {strategy}")
+        n = graph.num_nodes
+        count = min(count, n)
+        reverse = graph.reversed()
+        rng = random.Random(seed)
+
+        landmarks = []
+        from_costs = []
+        to_costs = []
+        # Smallest distance from any chosen landmark, for farthest-point picking
+        nearest = array("d", [INFINITY]) * n
+
+        while len(landmarks) < count:
+            if strategy == "avoid" and landmarks:
+                landmark = cls._avoid_pick(graph, landmarks, nearest, from_costs, to_costs, rng)
+            else:
+                landmark = cls._farthest_pick(graph, landmarks, nearest, rng)
+            if landmark is None or landmark in landmarks:
+                break
+            landmarks.append(landmark)
+            from_cost = shortest_path_costs(graph, landmark)[0]
+            to_cost = shortest_path_costs(reverse, landmark)[0]
+            from_costs.append(from_cost)
+            to_costs.append(to_cost)
+            for node in range(n):
+                if from_cost[node] < nearest[node]:
+                    nearest[node] = from_cost[node]
+
+        k = len(landmarks)
+        from_landmark = array("d", bytes(8 * n * k))
+        to_landmark = array("d", bytes(8 * n * k))
+        for i in range(k):
+            from_cost = from_costs[i]
+            to_cost = to_costs[i]
+            for node in range(n):
+                from_landmark[node * k + i] = from_cost[node]
+                to_landmark[node * k + i] = to_cost[node]
+        return cls(graph, landmarks, from_landmark, to_landmark)
+
+    @staticmethod
+    def _farthest_pick(graph, landmarks, nearest, rng):
+        if not landmarks:
+            # Start from a random node and take the node farthest from it
+            costs = shortest_path_costs(graph, rng.randrange(graph.num_nodes))[0]
+        else:
+            costs = nearest
+        best = None
+        best_cost = -1
+        for node in range(graph.num_nodes):
+            cost = costs[node]
+            if node in landmarks:
+                continue
+            # Unreached nodes are the farthest of all: they start a new component
+            if cost == INFINITY:
+                return node
+            if cost > best_cost:
+                best = node
+                best_cost = cost
+        return best
+
+    @staticmethod
+    def _avoid_pick(graph, landmarks, nearest, from_costs, to_costs, rng):
+        # Goldberg and Werneck's "avoid": grow a shortest path tree from a
+        # random root, weight each node by how badly the current landmarks
+        # bound its distance from the root, and walk down the heaviest
+        # landmark-free subtree to a leaf.
+        n = graph.num_nodes
+        root = rng.randrange(n)
+        costs, parents, order = shortest_path_costs(graph, root)
+
+        size = [0.0] * n
+        blocked = [False] * n
+        for landmark in landmarks:
+            blocked[landmark] = True
+        for node in reversed(order):
+            bound = 0
+            for from_cost, to_cost in zip(from_costs, to_costs):
+                if from_cost[node] != INFINITY and from_cost[root] != INFINITY:
+                    bound = max(bound, from_cost[node] - from_cost[root])
+                if to_cost[root] != INFINITY and to_cost[node] != INFINITY:
+                    bound = max(bound, to_cost[root] - to_cost[node])
+            size[node] += costs[node] - bound
+            parent = parents[node]
+            if parent >= 0:
+                if blocked[node]:
+                    blocked[parent] = True
+                else:
+                    size[parent] += size[node]
+        for node in order:
+            if blocked[node]:
+                size[node] = 0
+
+        children = {}
+        for node in order:
+            parent = parents[node]
+            if parent >= 0:
+                children.setdefault(parent, []).append(node)
+        node = root
+        while children.get(node):
+            heaviest = max(children[node], key=size.__getitem__)
+            if size[heaviest] <= 0:
+                break
+            node = heaviest
+        if node in landmarks:
+            # Every subtree already holds a landmark
+            return Landmarks._farthest_pick(graph, landmarks, nearest, rng)
+        return node
+
+    def heuristic(self, goal):
+        # h(v): lower bound on d(v, goal)
+        k = len(self.landmarks)
+        from_landmark = self.from_landmark
+        to_landmark = self.to_landmark
+        base = goal * k
+        goal_from = from_landmark[base:base + k]
+        goal_to = to_landmark[base:base + k]
+
+        def h(node):
+            best = 0
+            i = node * k
+            for j in range(k):
+                # d(v, L) - d(t, L)
+                a = to_landmark[i + j]
+                b = goal_to[j]
+                if a != INFINITY and b != INFINITY and a - b > best:
+                    best = a - b
+                # d(L, t) - d(L, v)
+                a = goal_from[j]
+                b = from_landmark[i + j]
+                if a != INFINITY and b != INFINITY and a - b > best:
+                    best = a - b
+            return best
+        return h
+
+    def reverse_heuristic(self, start):
+        # h(v): lower bound on d(start, v), for the backward half of a
+        # bidirectional search
+        k = len(self.landmarks)
+        from_landmark = self.from_landmark
+        to_landmark = self.to_landmark
+        base = start * k
+        start_from = from_landmark[base:base + k]
+        start_to = to_landmark[base:base + k]
+
+        def h(node):
+            best = 0
+            i = node * k
+            for j in range(k):
+                # d(L, v) - d(L, s)
+                a = from_landmark[i + j]
+                b = start_from[j]
+                if a != INFINITY and b != INFINITY and a - b > best:
+                    best = a - b
+                # d(s, L) - d(v, L)
+                a = start_to[j]
+                b = to_landmark[i + j]
+                if a != INFINITY and b != INFINITY and a - b > best:
+                    best = a - b
+            return best
+        return h
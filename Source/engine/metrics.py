@@ -0,0 +1,89 @@
+import sys
+import threading
+from time import perf_counter_ns
+
+# Rough size of one frontier entry (node, key and the backend's bookkeeping),
+# used when estimating memory without looking inside each backend
+FRONTIER_ENTRY_BYTES = 64
+
+
+# Counters and a timer for one search. Pass one to a search as metrics=...;
+# the search starts the timer itself, so only the search is timed and not
+# thread start-up or GUI work around it.
+#
+# Memory is estimated by measuring the search's own containers every
+# memory_sample_every expansions (0 turns it off). Unlike tracemalloc this
+# does not slow down other threads and works with any number of searches
+# running at once, as long as each has its own SearchMetrics.
+class SearchMetrics:
+    def __init__(self, memory_sample_every=0):
+        self.memory_sample_every = memory_sample_every
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.relaxations = 0
+        self.elapsed_ns = 0
+        self.peak_memory_bytes = 0
+        self._started = 0
+
+    def start(self):
+        self._started = perf_counter_ns()
+
+    def stop(self, pushes, pops, stale_pops, relaxations):
+        self.elapsed_ns += perf_counter_ns() - self._started
+        self.pushes += pushes
+        self.pops += pops
+        self.stale_pops += stale_pops
+        self.relaxations += relaxations
+
+    def sample_memory(self, containers, frontier_size=0):
+        size = sum(sys.getsizeof(container) for container in containers)
+        size += frontier_size * FRONTIER_ENTRY_BYTES
+        if size > self.peak_memory_bytes:
+            self.peak_memory_bytes = size
+
+    @property
+    def elapsed_seconds(self):
+        return self.elapsed_ns / 1e9
+
+    def add(self, other):
+        self.pushes += other.pushes
+        self.pops += other.pops
+        self.stale_pops += other.stale_pops
+        self.relaxations += other.relaxations
+        self.elapsed_ns += other.elapsed_ns
+        self.peak_memory_bytes = max(self.peak_memory_bytes, other.peak_memory_bytes)
+
+    def as_dict(self):
+        return {
+            "pushes": self.pushes,
+            "pops": self.pops,
+            "stale_pops": self.stale_pops,
+            "relaxations": self.relaxations,
+            "elapsed_ns": self.elapsed_ns,
+            "peak_memory_bytes": self.peak_memory_bytes,
+        }
+
+
+# Totals over many searches, e.g. a batch job or a long GUI session.
+# record() may be called from several threads at once.
+class MetricsCollector:
+    def __init__(self, memory_sample_every=0):
+        self.memory_sample_every = memory_sample_every
+        self.totals = SearchMetrics()
+        self.searches = 0
+        self.lock = threading.Lock()
+
+    def new(self):
+        return SearchMetrics(self.memory_sample_every)
+
+    def record(self, metrics):
+        with self.lock:
+            self.totals.add(metrics)
+            self.searches += 1
+
+    def as_dict(self):
+        with self.lock:
+            summary = self.totals.as_dict()
+            summary["searches"] = self.searches
+        return summary
@@ -0,0 +1,626 @@
+import heapq
+import time
+from array import array
+
+from .frontier import make_frontier, make_tie_break_key
+from .workspace import borrow_workspace, return_workspace
+
+INFINITY = float('inf')
+
+# How much a query records, from least to most. Lower levels skip the
+# bookkeeping outright, so a batch job that only wants costs pays nothing
+# for the expansion order or a path it would throw away.
+# DETAIL_COST: total_cost and nodes_expanded only; path is None
+# DETAIL_PATH: also the path
+# DETAIL_FULL: also traversed, visit_count and max_frontier_size
+DETAIL_COST = 0
+DETAIL_PATH = 1
+DETAIL_FULL = 2
+
+
+# Result of a single query. Node ids can be turned back into city names
+# with the graph the search ran on.
+class SearchResult:
+    def __init__(self, graph, path, total_cost, traversed, nodes_expanded, max_frontier_size, visit_count, trace=None,
+                 expanded_per_direction=None, bound=1, stopped=None):
+        self.graph = graph
+        self.path = path
+        self.total_cost = total_cost
+        self.traversed = traversed
+        self.nodes_expanded = nodes_expanded
+        self.max_frontier_size = max_frontier_size
+        self.visit_count = visit_count
+        self.trace = trace
+        # (forward, backward) expansion counts for bidirectional searches
+        self.expanded_per_direction = expanded_per_direction
+        # total_cost is at most bound times the optimal cost (1 = optimal)
+        self.bound = bound
+        # Why the search stopped before finishing (see engine.cancel), or None
+        self.stopped = stopped
+
+    @property
+    def found(self):
+        return self.total_cost != INFINITY
+
+    @property
+    def path_names(self):
+        return [self.graph.names[node] for node in self.path or []]
+
+    @property
+    def traversed_names(self):
+        return [self.graph.names[node] for node in self.traversed or []]
+
+    @property
+    def visit_count_names(self):
+        return {self.graph.names[node]: count for node, count in (self.visit_count or {}).items()}
+
+
+def _heuristic_function(heuristic):
+    # Accepts None, a list/array indexed by node id, or a callable h(node)
+    if heuristic is None:
+        return lambda node: 0
+    if callable(heuristic):
+        return heuristic
+    return heuristic.__getitem__
+
+
+# A* search over a CSRGraph. start and goal are node ids.
+# Pass a SearchTrace to record expand/relax/path events for replay, and a
+# SearchMetrics for timing and counters (see engine.metrics).
+# frontier picks the priority queue backend (see engine.frontier).
+# cancel is an optional CancellationToken (see engine.cancel).
+#
+# weight > 1 runs weighted A* (f = g + weight * h): it expands far fewer
+# nodes and, with a consistent heuristic, the path costs at most weight
+# times the optimum. The result's bound says so.
+#
+# detail says how much of the result to record (DETAIL_COST, DETAIL_PATH
+# or DETAIL_FULL). Costs and parents live in a SearchWorkspace (see
+# engine.workspace); one is borrowed from the graph's pool unless workspace
+# is given. tie_break orders nodes with equal f (see engine.frontier); "g"
+# walks straight through plateaus instead of fanning out across them.
+def a_star_search(graph, start, goal, heuristic=None, trace=None, frontier="auto", metrics=None, weight=1,
+                  cancel=None, workspace=None, detail=DETAIL_FULL, tie_break=None):
+    if workspace is not None:
+        return _a_star_search(graph, start, goal, heuristic, trace, frontier, metrics, weight, cancel, workspace,
+                              detail, tie_break)
+    workspace = borrow_workspace(graph)
+    try:
+        return _a_star_search(graph, start, goal, heuristic, trace, frontier, metrics, weight, cancel, workspace,
+                              detail, tie_break)
+    finally:
+        return_workspace(graph, workspace)
+
+
+def _a_star_search(graph, start, goal, heuristic, trace, frontier, metrics, weight, cancel, workspace, detail,
+                   tie_break):
+    if metrics is not None:
+        metrics.start()
+    sample_every = metrics.memory_sample_every if metrics is not None else 0
+    h = _heuristic_function(heuristic)
+    if weight != 1:
+        unweighted = h
+        h = lambda node: weight * unweighted(node)
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    # With a heuristic the f values are not guaranteed to be monotone
+    # integers, so only plain A* (h = 0) may use the bucket queues
+    tie_key = make_tie_break_key(tie_break, graph, weight)
+    open_nodes = make_frontier(frontier, graph, monotone_integer_keys=heuristic is None and tie_key is None,
+                               tie_broken_keys=tie_key is not None)
+    open_nodes.push(start, tie_key(0, h(start)) if tie_key else h(start))
+
+    # Only entries stamped with this query's generation are valid
+    generation = workspace.begin()
+    actual_costs = workspace.cost
+    parent_records = workspace.parent
+    reached = workspace.reached
+    closed = workspace.closed
+    actual_costs[start] = 0
+    reached[start] = generation
+
+    full = detail >= DETAIL_FULL
+    traversed_path = [] if full else None
+    nodes_expanded = 0
+    max_frontier_size = 0
+    visit_count = {start: 1} if full else None
+    relaxations = 0
+
+    stopped = None
+    while open_nodes:
+        if cancel is not None:
+            stopped = cancel.stop_reason(nodes_expanded)
+            if stopped:
+                break
+        if full:
+            max_frontier_size = max(max_frontier_size, len(open_nodes))
+        current = open_nodes.pop()[1]
+
+        closed[current] = generation
+        if full:
+            traversed_path.append(current)
+        nodes_expanded += 1
+        if sample_every and not nodes_expanded % sample_every:
+            metrics.sample_memory((actual_costs, parent_records, reached, closed, visit_count, traversed_path),
+                                  len(open_nodes))
+
+        if current == goal:
+            path = workspace.path_to(start, goal) if detail >= DETAIL_PATH else None
+            if trace is not None and path is not None:
+                trace.path(path)
+            if metrics is not None:
+                metrics.stop(relaxations + 1, nodes_expanded, open_nodes.stale_pops, relaxations)
+            return SearchResult(graph, path, actual_costs[goal], traversed_path,
+                                nodes_expanded, max_frontier_size, visit_count, trace, bound=max(weight, 1))
+
+        if trace is not None:
+            trace.expand(current)
+
+        current_cost = actual_costs[current]
+        for slot in range(offsets[current], offsets[current + 1]):
+            neighbor_node = targets[slot]
+            if closed[neighbor_node] == generation:
+                continue
+            accumulative_cost = current_cost + weights[slot]
+
+            if reached[neighbor_node] != generation or accumulative_cost < actual_costs[neighbor_node]:
+                reached[neighbor_node] = generation
+                parent_records[neighbor_node] = current
+                actual_costs[neighbor_node] = accumulative_cost
+                if tie_key is None:
+                    open_nodes.push(neighbor_node, accumulative_cost + h(neighbor_node))
+                else:
+                    open_nodes.push(neighbor_node, tie_key(accumulative_cost, h(neighbor_node)))
+                relaxations += 1
+
+                if full:
+                    visit_count[neighbor_node] = visit_count.get(neighbor_node, 0) + 1
+
+                if trace is not None:
+                    trace.relax(current, neighbor_node)
+
+    if metrics is not None:
+        metrics.stop(relaxations + 1, nodes_expanded, open_nodes.stale_pops, relaxations)
+    return SearchResult(graph, None, float('inf'), traversed_path,
+                        nodes_expanded, max_frontier_size, visit_count, trace, stopped=stopped)
+
+
+# Anytime Repairing A* (ARA*). A weighted A* with weight initial_weight
+# finds a first path quickly; the weight is then lowered by weight_step and
+# the search carries on from where it was, re-expanding only nodes whose
+# cost improved, until the path is proven optimal or deadline seconds have
+# passed. Each result's bound is min(weight, cost / lowest g + h still
+# open), so it can reach 1 before the weight does.
+#
+# on_solution(result) is called with every improved path as it is found;
+# the last one is returned. The deadline only applies once there is a first
+# path, so a reachable goal always gets an answer. heuristic must be
+# consistent (the ALT landmark heuristics are). A cancel token stops it
+# like the deadline does, but also before the first path.
+def anytime_a_star(graph, start, goal, heuristic=None, initial_weight=3.0, weight_step=0.5, deadline=None,
+                   trace=None, metrics=None, on_solution=None, cancel=None):
+    if metrics is not None:
+        metrics.start()
+    started = time.perf_counter()
+    stopped = None
+    sample_every = metrics.memory_sample_every if metrics is not None else 0
+    h = _heuristic_function(heuristic)
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    g = {start: 0}
+    parent = {}
+    # Weight of the edge from parent[node]; parents can get cheaper after
+    # their children were reached, so the path may cost less than g[goal]
+    parent_weight = {}
+    weight = max(initial_weight, 1)
+    # open_keys[node] is the key node is queued under; heap entries with any
+    # other key are stale
+    open_keys = {start: weight * h(start)}
+    heap = [(open_keys[start], start)]
+    closed = set()
+    # Nodes that got cheaper after being expanded in this round; they go
+    # back into the open list for the next one
+    inconsistent = set()
+
+    traversed_path = []
+    visit_count = {start: 1}
+    max_frontier_size = 0
+    pushes = 1
+    stale_pops = 0
+    relaxations = 0
+    best = None
+
+    def out_of_time():
+        return best is not None and deadline is not None and time.perf_counter() - started >= deadline
+
+    def improve_path():
+        # One round of weighted A*; False if it ran out of time
+        nonlocal max_frontier_size, pushes, stale_pops, relaxations, stopped
+        while heap:
+            key, current = heap[0]
+            if open_keys.get(current) != key:
+                heapq.heappop(heap)
+                stale_pops += 1
+                continue
+            if g.get(goal, INFINITY) <= key:
+                return True
+            if out_of_time():
+                return False
+            if cancel is not None:
+                stopped = cancel.stop_reason(len(traversed_path))
+                if stopped:
+                    return False
+            max_frontier_size = max(max_frontier_size, len(open_keys))
+            heapq.heappop(heap)
+            del open_keys[current]
+            closed.add(current)
+            traversed_path.append(current)
+            if sample_every and not len(traversed_path) % sample_every:
+                metrics.sample_memory((g, parent, open_keys, closed, inconsistent, traversed_path), len(heap))
+            if trace is not None:
+                trace.expand(current)
+
+            current_cost = g[current]
+            for slot in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[slot]
+                new_cost = current_cost + weights[slot]
+                if new_cost < g.get(neighbor, INFINITY):
+                    g[neighbor] = new_cost
+                    parent[neighbor] = current
+                    parent_weight[neighbor] = weights[slot]
+                    relaxations += 1
+                    visit_count[neighbor] = visit_count.get(neighbor, 0) + 1
+                    if trace is not None:
+                        trace.relax(current, neighbor)
+                    if neighbor in closed:
+                        inconsistent.add(neighbor)
+                    else:
+                        key = new_cost + weight * h(neighbor)
+                        open_keys[neighbor] = key
+                        heapq.heappush(heap, (key, neighbor))
+                        pushes += 1
+        return True
+
+    def lower_bound():
+        # No path can be cheaper than the best g + h left to expand
+        nodes = list(open_keys) + list(inconsistent)
+        return min((g[node] + h(node) for node in nodes), default=INFINITY)
+
+    def solution(cost, bound):
+        path = [goal]
+        while path[-1] != start:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return SearchResult(graph, path, cost, list(traversed_path), len(traversed_path),
+                            max_frontier_size, dict(visit_count), trace, bound=bound)
+
+    def path_cost():
+        cost = 0
+        node = goal
+        while node != start:
+            cost += parent_weight[node]
+            node = parent[node]
+        return cost
+
+    while True:
+        finished = improve_path()
+        if goal not in g or (best is None and not finished):
+            break
+        cost = path_cost()
+        if finished:
+            bound = max(min(weight, cost / lower_bound()), 1) if cost else 1
+        else:
+            # Cut short: the last proven bound still holds, and gets
+            # tighter by however much cheaper the path has become
+            bound = max(best.bound * cost / best.total_cost, 1) if best.total_cost else 1
+        if best is None or cost < best.total_cost or bound < best.bound:
+            best = solution(cost, bound)
+            if on_solution is not None:
+                on_solution(best)
+        if not finished or bound <= 1 or out_of_time():
+            break
+
+        # Next round with a smaller weight: everything still open or made
+        # inconsistent is queued again under the new weight
+        weight = max(weight - weight_step, 1)
+        for node in inconsistent:
+            open_keys[node] = 0
+        inconsistent.clear()
+        for node in open_keys:
+            open_keys[node] = g[node] + weight * h(node)
+        heap = [(key, node) for node, key in open_keys.items()]
+        heapq.heapify(heap)
+        pushes += len(heap)
+        closed.clear()
+
+    if metrics is not None:
+        metrics.stop(pushes, len(traversed_path), stale_pops, relaxations)
+    if best is None:
+        return SearchResult(graph, None, INFINITY, traversed_path, len(traversed_path), max_frontier_size,
+                            visit_count, trace, stopped=stopped)
+    if trace is not None:
+        trace.path(best.path)
+    best.trace = trace
+    best.stopped = stopped
+    return best
+
+
+# Uniform cost search over a CSRGraph. start and goal are node ids.
+# Pass a SearchTrace to record expand/relax/path events for replay, and a
+# SearchMetrics for timing and counters (see engine.metrics).
+# frontier picks the priority queue backend (see engine.frontier).
+# workspace, detail and tie_break work as for a_star_search.
+def uniform_cost_search(graph, start, goal, trace=None, frontier="auto", metrics=None, cancel=None,
+                        workspace=None, detail=DETAIL_FULL, tie_break=None):
+    if workspace is not None:
+        return _uniform_cost_search(graph, start, goal, trace, frontier, metrics, cancel, workspace, detail,
+                                    tie_break)
+    workspace = borrow_workspace(graph)
+    try:
+        return _uniform_cost_search(graph, start, goal, trace, frontier, metrics, cancel, workspace, detail,
+                                    tie_break)
+    finally:
+        return_workspace(graph, workspace)
+
+
+def _uniform_cost_search(graph, start, goal, trace, frontier, metrics, cancel, workspace, detail, tie_break):
+    if metrics is not None:
+        metrics.start()
+    sample_every = metrics.memory_sample_every if metrics is not None else 0
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    # Priority queue of nodes to be explored, starting with the initial node and cost of 0
+    tie_key = make_tie_break_key(tie_break, graph)
+    queue = make_frontier(frontier, graph, monotone_integer_keys=tie_key is None, tie_broken_keys=tie_key is not None)
+    queue.push(start, tie_key(0, 0) if tie_key else 0)
+
+    # Frequency count of node visits, and the order nodes were expanded in
+    full = detail >= DETAIL_FULL
+    visit_count = {start: 1} if full else None
+    visited_order = [] if full else None
+    nodes_expanded = 0
+    max_frontier_size = 0
+
+    # Cost to reach each node and the node we came from; a node is reached
+    # or settled when its stamp is this query's generation
+    generation = workspace.begin()
+    cost_so_far = workspace.cost
+    came_from = workspace.parent
+    reached = workspace.reached
+    settled = workspace.closed
+    cost_so_far[start] = 0
+    reached[start] = generation
+    relaxations = 0
+
+    stopped = None
+    while queue:
+        if cancel is not None:
+            stopped = cancel.stop_reason(nodes_expanded)
+            if stopped:
+                break
+        if full:
+            max_frontier_size = max(max_frontier_size, len(queue))
+
+        # Pop the node with the lowest cost from the priority queue
+        current_node = queue.pop()[1]
+        current_cost = cost_so_far[current_node]
+        settled[current_node] = generation
+        nodes_expanded += 1
+        if full:
+            visited_order.append(current_node)
+        if sample_every and not nodes_expanded % sample_every:
+            metrics.sample_memory((cost_so_far, came_from, reached, settled, visit_count, visited_order), len(queue))
+
+        if trace is not None:
+            trace.expand(current_node)
+
+        # If the current node is the goal, reconstruct the path and return it
+        if current_node == goal:
+            path = workspace.path_to(start, goal) if detail >= DETAIL_PATH else None
+            if trace is not None and path is not None:
+                trace.path(path)
+            if metrics is not None:
+                metrics.stop(relaxations + 1, nodes_expanded, queue.stale_pops, relaxations)
+            return SearchResult(graph, path, cost_so_far[goal], visited_order,
+                                nodes_expanded, max_frontier_size, visit_count, trace)
+
+        # Explore neighbors of the current node
+        for slot in range(offsets[current_node], offsets[current_node + 1]):
+            neighbor = targets[slot]
+            if settled[neighbor] == generation:
+                continue
+            new_cost = current_cost + weights[slot]
+
+            # If this path to the neighbor is cheaper, update cost and path
+            if reached[neighbor] != generation or new_cost < cost_so_far[neighbor]:
+                reached[neighbor] = generation
+                cost_so_far[neighbor] = new_cost
+                queue.push(neighbor, tie_key(new_cost, 0) if tie_key else new_cost)
+                came_from[neighbor] = current_node
+                relaxations += 1
+                if full:
+                    visit_count[neighbor] = visit_count.get(neighbor, 0) + 1
+
+                if trace is not None:
+                    trace.relax(current_node, neighbor)
+
+    # If the goal is not reachable, return infinity as cost and an empty path
+    if metrics is not None:
+        metrics.stop(relaxations + 1, nodes_expanded, queue.stale_pops, relaxations)
+    return SearchResult(graph, [] if detail >= DETAIL_PATH else None, float('inf'), visited_order,
+                        nodes_expanded, max_frontier_size, visit_count, trace, stopped=stopped)
+
+
+# Result of multi_target_search. reached lists the targets settled, nearest
+# first; costs[target] and paths[target] hold each one's answer (paths is
+# empty at DETAIL_COST). path and total_cost are those of the nearest
+# target, and the traversal fields cover the one shared search.
+class MultiTargetResult(SearchResult):
+    def __init__(self, graph, reached, costs, paths, traversed, nodes_expanded, max_frontier_size, visit_count,
+                 trace=None, stopped=None):
+        nearest = reached[0] if reached else None
+        super().__init__(graph, paths.get(nearest), costs[nearest] if reached else INFINITY, traversed,
+                         nodes_expanded, max_frontier_size, visit_count, trace, stopped=stopped)
+        self.reached = reached
+        self.costs = costs
+        self.paths = paths
+
+    @property
+    def reached_names(self):
+        return [self.graph.names[node] for node in self.reached]
+
+    @property
+    def paths_names(self):
+        names = self.graph.names
+        return {names[target]: [names[node] for node in path] for target, path in self.paths.items()}
+
+
+# Uniform cost search from start to several targets at once: one expansion
+# answers every target, instead of one search per target. It stops once k
+# targets are settled (k=None: all of them), so k=1 finds the nearest.
+# Targets that can't be reached are missing from the result's reached.
+# For the nearest of several sources to one node on a directed graph, run
+# it on graph.reversed() from that node.
+# trace, metrics, cancel, workspace and detail work as for a_star_search.
+def multi_target_search(graph, start, targets, k=None, trace=None, frontier="auto", metrics=None, cancel=None,
+                        workspace=None, detail=DETAIL_FULL):
+    if workspace is not None:
+        return _multi_target_search(graph, start, targets, k, trace, frontier, metrics, cancel, workspace, detail)
+    workspace = borrow_workspace(graph)
+    try:
+        return _multi_target_search(graph, start, targets, k, trace, frontier, metrics, cancel, workspace, detail)
+    finally:
+        return_workspace(graph, workspace)
+
+
+def _multi_target_search(graph, start, targets, k, trace, frontier, metrics, cancel, workspace, detail):
+    if metrics is not None:
+        metrics.start()
+    sample_every = metrics.memory_sample_every if metrics is not None else 0
+    offsets = graph.offsets
+    targets_of = graph.targets
+    weights = graph.weights
+    remaining = set(targets)
+    wanted = len(remaining) if k is None else min(k, len(remaining))
+
+    queue = make_frontier(frontier, graph, monotone_integer_keys=True)
+    queue.push(start, 0)
+
+    full = detail >= DETAIL_FULL
+    visit_count = {start: 1} if full else None
+    traversed = [] if full else None
+    nodes_expanded = 0
+    max_frontier_size = 0
+    relaxations = 0
+    reached = []
+    costs = {}
+    paths = {}
+
+    generation = workspace.begin()
+    cost = workspace.cost
+    reached_stamp = workspace.reached
+    settled = workspace.closed
+    parent = workspace.parent
+    cost[start] = 0
+    reached_stamp[start] = generation
+
+    stopped = None
+    while queue and len(reached) < wanted:
+        if cancel is not None:
+            stopped = cancel.stop_reason(nodes_expanded)
+            if stopped:
+                break
+        if full:
+            max_frontier_size = max(max_frontier_size, len(queue))
+        current_cost, current = queue.pop()
+        settled[current] = generation
+        nodes_expanded += 1
+        if full:
+            traversed.append(current)
+        if sample_every and not nodes_expanded % sample_every:
+            metrics.sample_memory((cost, parent, reached_stamp, settled, visit_count, traversed), len(queue))
+        if trace is not None:
+            trace.expand(current)
+
+        if current in remaining:
+            remaining.discard(current)
+            reached.append(current)
+            costs[current] = current_cost
+            if detail >= DETAIL_PATH:
+                paths[current] = workspace.path_to(start, current)
+            if len(reached) == wanted:
+                break
+
+        for slot in range(offsets[current], offsets[current + 1]):
+            neighbor = targets_of[slot]
+            if settled[neighbor] == generation:
+                continue
+            new_cost = current_cost + weights[slot]
+            if reached_stamp[neighbor] != generation or new_cost < cost[neighbor]:
+                reached_stamp[neighbor] = generation
+                cost[neighbor] = new_cost
+                parent[neighbor] = current
+                queue.push(neighbor, new_cost)
+                relaxations += 1
+                if full:
+                    visit_count[neighbor] = visit_count.get(neighbor, 0) + 1
+                if trace is not None:
+                    trace.relax(current, neighbor)
+
+    if trace is not None:
+        for target in reached:
+            if target in paths:
+                trace.path(paths[target])
+    if metrics is not None:
+        metrics.stop(relaxations + 1, nodes_expanded, queue.stale_pops, relaxations)
+    return MultiTargetResult(graph, reached, costs, paths, traversed, nodes_expanded, max_frontier_size,
+                             visit_count, trace, stopped=stopped)
+
+
+# Uniform cost search bound to one graph, so callers can keep a single
+# instance around and issue many queries against it. With a
+# ShortestPathTreeCache, repeated queries from the same start reuse the
+# work of earlier ones. A query with a trace runs uncached: an answer taken
+# from a cached tree expands nothing, so it would have nothing to replay.
+class UniformCostSearch:
+    def __init__(self, graph, cache=None):
+        self.graph = graph
+        self.cache = cache
+
+    def search(self, start, goal, trace=None, frontier="auto", metrics=None, cancel=None, detail=DETAIL_FULL):
+        if self.cache is not None and trace is None:
+            return self.cache.search(start, goal, trace, metrics, cancel, detail)
+        return uniform_cost_search(self.graph, start, goal, trace, frontier, metrics, cancel, detail=detail)
+
+
+# Cost from source to every node (inf where unreachable), as an array
+# indexed by node id. Returns the settle order and parents as well, for
+# callers that need the shortest path tree.
+def shortest_path_costs(graph, source):
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    costs = array("d", [INFINITY]) * graph.num_nodes
+    parents = array("q", [-1]) * graph.num_nodes
+    order = []
+    costs[source] = 0
+    heap = [(0, source)]
+    while heap:
+        cost, node = heapq.heappop(heap)
+        if cost > costs[node]:
+            continue
+        order.append(node)
+        for slot in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[slot]
+            new_cost = cost + weights[slot]
+            if new_cost < costs[neighbor]:
+                costs[neighbor] = new_cost
+                parents[neighbor] = node
+                heapq.heappush(heap, (new_cost, neighbor))
+    return costs, parents, order
@@ -0,0 +1,157 @@
+import sys
+import threading
+from collections import OrderedDict
+
+from .frontier import make_frontier
+from .search import DETAIL_FULL, DETAIL_PATH, INFINITY, SearchResult
+
+# Default memory budget for all cached trees together
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+# Dijkstra from one origin that can be paused and resumed. Settled nodes
+# keep their final cost and parent, and the frontier is kept as it was, so
+# a later query either reads its answer straight away or carries on
+# expanding where the previous query stopped. Queries on one tree take
+# turns through its lock.
+class ShortestPathTree:
+    def __init__(self, graph, origin, frontier="auto"):
+        self.graph = graph
+        self.origin = origin
+        self.lock = threading.Lock()
+        self.cost = {origin: 0}
+        self.parent = {origin: None}
+        self.settled = set()
+        self.queue = make_frontier(frontier, graph, monotone_integer_keys=True)
+        self.queue.push(origin, 0)
+
+    def settle(self, goal, trace=None, metrics=None, cancel=None, full=True):
+        # Expand until goal is settled or the whole component is done.
+        # Returns how many nodes this call expanded and, if full, which ones
+        # in order, and why cancel stopped it (None if it didn't). A stopped
+        # tree stays valid and a later call carries on.
+        sample_every = metrics.memory_sample_every if metrics is not None else 0
+        graph = self.graph
+        offsets = graph.offsets
+        targets = graph.targets
+        weights = graph.weights
+        cost = self.cost
+        parent = self.parent
+        settled = self.settled
+        queue = self.queue
+
+        expanded = [] if full else None
+        visit_count = {} if full else None
+        nodes_expanded = 0
+        max_frontier_size = 0
+        relaxations = 0
+        stale_pops = queue.stale_pops
+        stopped = None
+        while goal not in settled and queue:
+            if cancel is not None:
+                stopped = cancel.stop_reason(nodes_expanded)
+                if stopped:
+                    break
+            if full:
+                max_frontier_size = max(max_frontier_size, len(queue))
+            current_cost, current = queue.pop()
+            settled.add(current)
+            nodes_expanded += 1
+            if full:
+                expanded.append(current)
+            if sample_every and not nodes_expanded % sample_every:
+                metrics.sample_memory((cost, parent, settled, expanded, visit_count), len(queue))
+            if trace is not None:
+                trace.expand(current)
+
+            for slot in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[slot]
+                if neighbor in settled:
+                    continue
+                new_cost = current_cost + weights[slot]
+                if neighbor not in cost or new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = current
+                    queue.push(neighbor, new_cost)
+                    relaxations += 1
+                    if full:
+                        visit_count[neighbor] = visit_count.get(neighbor, 0) + 1
+                    if trace is not None:
+                        trace.relax(current, neighbor)
+        if metrics is not None:
+            metrics.stop(relaxations, nodes_expanded, queue.stale_pops - stale_pops, relaxations)
+        return nodes_expanded, expanded, visit_count, max_frontier_size, stopped
+
+    def path_to(self, goal):
+        if goal not in self.settled:
+            return []
+        path = []
+        node = goal
+        while node is not None:
+            path.append(node)
+            node = self.parent[node]
+        path.reverse()
+        return path
+
+    def memory_bytes(self):
+        # Size of the containers themselves; the small ints they hold are
+        # mostly shared, so this is a good enough estimate for eviction
+        return (sys.getsizeof(self.cost) + sys.getsizeof(self.parent) +
+                sys.getsizeof(self.settled) + 64 * len(self.queue))
+
+
+# Keeps a ShortestPathTree per origin, evicting the least recently used
+# trees once their estimated size goes over max_bytes. Safe to share
+# between threads: the cache lock only covers finding the tree, and each
+# tree has its own lock, so queries from different origins run at the same
+# time. Call invalidate() whenever the graph changes.
+class ShortestPathTreeCache:
+    def __init__(self, graph, max_bytes=DEFAULT_CACHE_BYTES, frontier="auto"):
+        self.graph = graph
+        self.max_bytes = max_bytes
+        self.frontier = frontier
+        self.trees = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, graph=None):
+        # Drop every tree; pass the new graph if it was rebuilt
+        with self.lock:
+            self.trees.clear()
+            if graph is not None:
+                self.graph = graph
+
+    def search(self, start, goal, trace=None, metrics=None, cancel=None, detail=DETAIL_FULL):
+        if metrics is not None:
+            metrics.start()
+        with self.lock:
+            tree = self.trees.get(start)
+            if tree is None:
+                self.misses += 1
+                tree = ShortestPathTree(self.graph, start, self.frontier)
+                self.trees[start] = tree
+            else:
+                self.hits += 1
+                self.trees.move_to_end(start)
+
+        with tree.lock:
+            nodes_expanded, expanded, visit_count, max_frontier_size, stopped = tree.settle(
+                goal, trace, metrics, cancel, detail >= DETAIL_FULL)
+            path = tree.path_to(goal) if detail >= DETAIL_PATH else None
+            total_cost = tree.cost[goal] if goal in tree.settled else INFINITY
+            if trace is not None and path is not None:
+                trace.path(path)
+        with self.lock:
+            self._evict()
+
+        return SearchResult(tree.graph, path, total_cost, expanded, nodes_expanded, max_frontier_size, visit_count,
+                            trace, stopped=stopped)
+
+    def memory_bytes(self):
+        return sum(tree.memory_bytes() for tree in self.trees.values())
+
+    def _evict(self):
+        # Always keep the most recent tree, even if it alone is over budget
+        while len(self.trees) > 1 and self.memory_bytes() > self.max_bytes:
+            self.trees.popitem(last=False)
@@ -0,0 +1,135 @@
+import mmap
+import struct
+import sys
+from array import array
+
+from .graph import CSRGraph, typecode_of
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# On-disk CSR graph, little-endian, every section 8-byte aligned:
+#
+#   header        64 bytes, see HEADER below
+#   offsets       (num_nodes + 1) int64
+#   targets       num_edges int64
+#   weights       num_edges int64, or float64 if FLOAT_WEIGHTS is set
+#   xs, ys        num_nodes float64 each, only if HAS_COORDINATES is set
+#   name_offsets  (num_nodes + 1) int64 byte offsets into the name blob
+#   names         UTF-8 name blob, every name stored once
+#
+# Loading maps the file and hands out views into it, so opening costs the
+# same for any size and all processes share the pages through the page cache.
+MAGIC = b"CSRG"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIqqq24x")
+FLOAT_WEIGHTS = 1
+HAS_COORDINATES = 2
+
+
+# Node names read straight out of the mapped name blob. Behaves like the
+# list CSRGraph.names normally is, but only decodes the names it is asked for.
+class NameTable:
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return str(self.blob[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    def __iter__(self):
+        blob = self.blob
+        offsets = self.offsets
+        for i in range(len(offsets) - 1):
+            yield str(blob[offsets[i]:offsets[i + 1]], "utf-8")
+
+
+def _as_int64(values):
+    if typecode_of(values) == "q" and isinstance(values, array):
+        return values
+    return array("q", values)
+
+
+def save_graph(graph, path):
+    n = graph.num_nodes
+    m = graph.num_edges
+    integral = graph.integer_weights
+    weights = _as_int64(graph.weights) if integral else array("d", graph.weights)
+    coordinates = graph.xs is not None and graph.ys is not None
+
+    encoded = [str(name).encode("utf-8") for name in graph.names]
+    name_offsets = array("q", [0]) * (n + 1)
+    total = 0
+    for i, name in enumerate(encoded):
+        total += len(name)
+        name_offsets[i + 1] = total
+
+    flags = (0 if integral else FLOAT_WEIGHTS) | (HAS_COORDINATES if coordinates else 0)
+    sections = [_as_int64(graph.offsets), _as_int64(graph.targets), weights]
+    if coordinates:
+        sections += [array("d", graph.xs), array("d", graph.ys)]
+    sections.append(name_offsets)
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, flags, 0, n, m, total))
+        for section in sections:
+            if sys.byteorder != "little":
+                section = array(section.typecode, section)
+                section.byteswap()
+            file.write(section.tobytes())
+        for name in encoded:
+            file.write(name)
+
+
+# Opens a graph written by save_graph. The arrays are read-only views into
+# the mapped file. With use_numpy=True (and NumPy installed) graph.arrays
+# also holds numpy.memmap arrays over the same sections, for code that works
+# on whole arrays at once. The searches always get the plain views: they are
+# faster for per-node loops and hand back Python ints and floats, where a
+# NumPy array hands back numpy.int64 and numpy.float64.
+def load_graph(path, use_numpy=False):
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, flags, _, n, m, name_bytes = HEADER.unpack_from(mapped, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a graph file")
+    if version != VERSION:
+        raise ValueError(f"{path} has graph format version {version}, expected {VERSION}")
+
+    layout = [("offsets", "q", n + 1), ("targets", "q", m), ("weights", "d" if flags & FLOAT_WEIGHTS else "q", m)]
+    if flags & HAS_COORDINATES:
+        layout += [("xs", "d", n), ("ys", "d", n)]
+    layout.append(("name_offsets", "q", n + 1))
+
+    view = memoryview(mapped)
+    sections = {}
+    arrays = {} if use_numpy and numpy is not None else None
+    position = HEADER.size
+    for key, typecode, length in layout:
+        end = position + 8 * length
+        if arrays is not None:
+            arrays[key] = numpy.memmap(path, dtype="<i8" if typecode == "q" else "<f8", mode="r", offset=position,
+                                       shape=(length,))
+        if sys.byteorder == "little":
+            sections[key] = view[position:end].cast(typecode)
+        else:
+            # Big-endian host: no zero-copy view possible, so copy and swap
+            section = array(typecode, view[position:end].tobytes())
+            section.byteswap()
+            sections[key] = section
+        position = end
+
+    names = NameTable(view[position:position + name_bytes], sections["name_offsets"])
+    graph = CSRGraph(names, sections["offsets"], sections["targets"], sections["weights"], sections.get("xs"),
+                     sections.get("ys"))
+    graph.arrays = arrays
+    return graph
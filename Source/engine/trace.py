@@ -0,0 +1,42 @@
+from array import array
+
+# Event kinds stored in a SearchTrace
+EXPAND = 0
+RELAX = 1
+PATH = 2
+
+
+# Compact record of what a search did, kept as flat (kind, a, b) integer
+# triples so that a GUI can replay it later at any speed.
+# EXPAND: a is the expanded node, b is -1
+# RELAX:  edge a -> b improved the cost of b
+# PATH:   edge a -> b is part of the final path
+class SearchTrace:
+    def __init__(self):
+        self.events = array("q")
+
+    def expand(self, node):
+        self.events.extend((EXPAND, node, -1))
+
+    def relax(self, node, neighbor):
+        self.events.extend((RELAX, node, neighbor))
+
+    def path(self, path):
+        for node, next_node in zip(path, path[1:]):
+            self.events.extend((PATH, node, next_node))
+
+    def clear(self):
+        del self.events[:]
+
+    def __len__(self):
+        return len(self.events) // 3
+
+    def __getitem__(self, index):
+        i = index * 3
+        events = self.events
+        return events[i], events[i + 1], events[i + 2]
+
+    def __iter__(self):
+        events = self.events
+        for i in range(0, len(events), 3):
+            yield events[i], events[i + 1], events[i + 2]
@@ -0,0 +1,58 @@
+import threading
+import weakref
+
+
+# Per-node search state in flat buffers indexed by node id: the cost found
+# so far, the parent on the best path, and two generation stamps saying
+# whether a node has been reached and expanded by the current query.
+#
+# A query calls begin(), which only bumps the generation. Entries stamped
+# with an older generation count as empty, so the n-sized buffers are
+# allocated once and never cleared between queries.
+#
+# The buffers are plain lists rather than array.array: the search reads and
+# writes one entry at a time, and a list hands back the stored int or float
+# object where an array has to box a new one on every read.
+class SearchWorkspace:
+    def __init__(self, num_nodes):
+        self.num_nodes = num_nodes
+        self.cost = [0] * num_nodes
+        self.parent = [0] * num_nodes
+        self.reached = [0] * num_nodes
+        self.closed = [0] * num_nodes
+        self.generation = 0
+
+    def begin(self):
+        self.generation += 1
+        return self.generation
+
+    def path_to(self, start, goal):
+        # Follows the parents of the current query from goal back to start
+        parent = self.parent
+        path = [goal]
+        node = goal
+        while node != start:
+            node = parent[node]
+            path.append(node)
+        path.reverse()
+        return path
+
+
+# Free workspaces of each graph. A search borrows one for the length of a
+# query, so searches running at once on different threads each get their
+# own, and a graph never has more workspaces than it had searches in flight.
+_free = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def borrow_workspace(graph):
+    with _lock:
+        free = _free.get(graph)
+        if free:
+            return free.pop()
+    return SearchWorkspace(graph.num_nodes)
+
+
+def return_workspace(graph, workspace):
+    with _lock:
+        _free.setdefault(graph, []).append(workspace)
@@ -0,0 +1,7 @@
+# Tk helpers shared by the A*, UCS and editor windows
+from .edges import EdgeIndex
+from .importing import ImportDialog
+from .mapview import MapView
+from .replay import ReplayControls, TraceReplayer
+from .spatial import SpatialGrid
+from .updates import CanvasUpdateQueue
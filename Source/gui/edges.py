@@ -0,0 +1,26 @@
+# Canvas items (line id, distance label id) of every road in the editor,
+# indexed from both end cities so that dragging or removing a city only
+# touches its own roads instead of scanning every line on the canvas.
+class EdgeIndex:
+    def __init__(self):
+        self.edges = {}
+
+    def add(self, city1, city2, line, label):
+        self.edges.setdefault(city1, {})[city2] = (line, label)
+        self.edges.setdefault(city2, {})[city1] = (line, label)
+
+    def get(self, city1, city2):
+        # (line, label) of the road between the two cities, or None
+        return self.edges.get(city1, {}).get(city2)
+
+    def edges_of(self, city):
+        # {neighbor: (line, label)} for every road touching city
+        return self.edges.get(city, {})
+
+    def remove(self, city1, city2):
+        items = self.edges.get(city1, {}).pop(city2, None)
+        self.edges.get(city2, {}).pop(city1, None)
+        return items
+
+    def clear(self):
+        self.edges.clear()
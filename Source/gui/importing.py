@@ -0,0 +1,71 @@
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from engine import import_graph
+
+# How often the dialog looks at the worker's progress, in milliseconds
+POLL_MS = 50
+
+
+# Small window that imports a road network file on a worker thread and
+# shows how far it has got. The worker only stores its progress; the Tk
+# thread reads it on a timer, so the import never touches Tk.
+#
+# on_done(graph, seconds) or on_error(error) runs on the Tk thread once the
+# import has finished.
+class ImportDialog:
+    def __init__(self, root, path, on_done, on_error=None):
+        self.path = path
+        self.on_done = on_done
+        self.on_error = on_error
+        self.progress = (0, 1)
+        self.graph = None
+        self.error = None
+        self.seconds = 0.0
+        self.finished = False
+
+        self.top = tk.Toplevel(root)
+        self.top.title("Importing")
+        self.top.transient(root)
+        tk.Label(self.top, text=path, font=('Helvetica', 10)).pack(padx=20, pady=(15, 5))
+        self.bar = ttk.Progressbar(self.top, length=360, maximum=1000)
+        self.bar.pack(padx=20, pady=5)
+        self.status = tk.Label(self.top, text="Reading...", font=('Helvetica', 10))
+        self.status.pack(padx=20, pady=(5, 15))
+
+        threading.Thread(target=self.run, daemon=True).start()
+        self.top.after(POLL_MS, self.poll)
+
+    def report(self, done, total):
+        # Progress callback, called from the worker thread
+        self.progress = (done, total)
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            self.graph = import_graph(self.path, progress=self.report)
+        except Exception as error:
+            self.error = error
+        self.seconds = time.perf_counter() - started
+        self.finished = True
+
+    def poll(self):
+        done, total = self.progress
+        self.bar["value"] = 1000 * done / max(total, 1)
+        if done >= total:
+            # File read; the edges are being sorted into the graph now
+            self.status.config(text="Building graph...")
+        else:
+            self.status.config(text=f"Read {done / 1e6:.1f} of {total / 1e6:.1f} MB")
+
+        if not self.finished:
+            self.top.after(POLL_MS, self.poll)
+            return
+        self.top.destroy()
+        if self.error is not None:
+            if self.on_error is not None:
+                self.on_error(self.error)
+        else:
+            self.on_done(self.graph, self.seconds)
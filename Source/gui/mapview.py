@@ -0,0 +1,353 @@
+import math
+import tkinter as tk
+
+from .spatial import SpatialGrid
+
+# Zoom levels (canvas pixels per map unit) for the level of detail:
+# at DETAIL_ZOOM and above cities get their name, dropdown and road labels,
+# between CLUSTER_ZOOM and DETAIL_ZOOM they are small dots, and below
+# CLUSTER_ZOOM nearby cities are merged into one glyph with a count.
+DETAIL_ZOOM = 0.75
+CLUSTER_ZOOM = 0.2
+MIN_ZOOM = 1e-4
+MAX_ZOOM = 20
+ZOOM_STEP = 1.2
+
+# More visible cities or roads than this are clustered at any zoom, so a
+# redraw never creates more canvas items than Tk can handle smoothly
+MAX_ITEMS = 3000
+# Size of one cluster cell on screen, in pixels
+CLUSTER_PX = 48
+# A full redraw waits until the view has been still this long (ms); until
+# then panning and zooming just move or scale the existing items
+REDRAW_DELAY_MS = 40
+
+NODE_STYLE = {"fill": "white"}
+EDGE_STYLE = {"fill": "blue", "width": 1}
+
+
+# Zoomable, pannable city map on a Tk canvas. Only the cities and roads
+# inside the visible region have canvas items at all; everything else
+# lives in two spatial grids and is drawn when it scrolls into view.
+#
+# Colors set during a replay are kept per city/road, so an item that is
+# culled and later redrawn comes back with the right color. Pass keys of
+# the form ("node", city) or ("edge", city1, city2) to configure(), or use
+# it as the apply callback of a CanvasUpdateQueue.
+#
+# Mouse wheel zooms around the pointer; drag with the right (or middle)
+# button to pan.
+class MapView:
+    def __init__(self, canvas, coordinates, roads, dropdowns=True):
+        self.canvas = canvas
+        self.coordinates = coordinates
+        self.dropdowns = dropdowns
+        # Created lazily when a city is first drawn with its dropdown
+        self.dropdown_vars = {}
+        self.dropdown_widgets = {}
+
+        self.roads = {}
+        for city1, city2, distance in roads:
+            self.roads[self.edge_key(city1, city2)] = distance
+
+        xs = [x for x, _ in coordinates.values()] or [0]
+        ys = [y for _, y in coordinates.values()] or [0]
+        self.bounds = (min(xs), min(ys), max(xs), max(ys))
+        # About two cities per cell on an even spread
+        extent = max(self.bounds[2] - self.bounds[0], self.bounds[3] - self.bounds[1], 1)
+        cell_size = max(extent / math.sqrt(max(len(coordinates), 1) / 2), 1)
+        self.node_grid = SpatialGrid(cell_size)
+        for city, (x, y) in coordinates.items():
+            self.node_grid.insert(city, x, y, x, y)
+        self.edge_grid = SpatialGrid(cell_size)
+        for city1, city2 in self.roads:
+            x1, y1 = coordinates[city1]
+            x2, y2 = coordinates[city2]
+            self.edge_grid.insert((city1, city2), min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+        self.scale = 1.0
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.node_styles = {}
+        self.edge_styles = {}
+        self.node_items = {}
+        self.edge_items = {}
+        self.redraw_id = None
+        self.pan_start = None
+        # Cluster grids per zoom level, built the first time a level is shown
+        self.cluster_levels = {}
+
+        canvas.bind("<Configure>", lambda event: self.schedule_redraw())
+        canvas.bind("<MouseWheel>", self.on_wheel)
+        canvas.bind("<Button-4>", lambda event: self.zoom(ZOOM_STEP, event.x, event.y))
+        canvas.bind("<Button-5>", lambda event: self.zoom(1 / ZOOM_STEP, event.x, event.y))
+        for button in (2, 3):
+            canvas.bind(f"<ButtonPress-{button}>", self.on_pan_start)
+            canvas.bind(f"<B{button}-Motion>", self.on_pan)
+        self.redraw()
+
+    @staticmethod
+    def edge_key(city1, city2):
+        return (city1, city2) if city1 <= city2 else (city2, city1)
+
+    def to_screen(self, x, y):
+        return x * self.scale + self.offset_x, y * self.scale + self.offset_y
+
+    def to_world(self, sx, sy):
+        return (sx - self.offset_x) / self.scale, (sy - self.offset_y) / self.scale
+
+    def visible_region(self, margin=60):
+        # World rectangle on screen, clipped to the map so a zoomed-out
+        # view never walks millions of empty grid cells
+        width = max(self.canvas.winfo_width(), int(self.canvas.cget("width") or 1))
+        height = max(self.canvas.winfo_height(), int(self.canvas.cget("height") or 1))
+        x0, y0 = self.to_world(-margin, -margin)
+        x1, y1 = self.to_world(width + margin, height + margin)
+        bx0, by0, bx1, by1 = self.bounds
+        return max(x0, bx0), max(y0, by0), min(x1, bx1), min(y1, by1)
+
+    def fit(self, padding=40):
+        # Zoom and pan so the whole map is on screen
+        width = max(self.canvas.winfo_width(), int(self.canvas.cget("width") or 1))
+        height = max(self.canvas.winfo_height(), int(self.canvas.cget("height") or 1))
+        bx0, by0, bx1, by1 = self.bounds
+        span_x = max(bx1 - bx0, 1e-9)
+        span_y = max(by1 - by0, 1e-9)
+        self.scale = min((width - 2 * padding) / span_x, (height - 2 * padding) / span_y, MAX_ZOOM)
+        self.scale = max(self.scale, MIN_ZOOM)
+        self.offset_x = padding - bx0 * self.scale
+        self.offset_y = padding - by0 * self.scale
+        self.redraw()
+
+    def zoom(self, factor, sx, sy):
+        new_scale = min(max(self.scale * factor, MIN_ZOOM), MAX_ZOOM)
+        factor = new_scale / self.scale
+        if factor == 1:
+            return
+        # Keep the point under the pointer where it is
+        self.offset_x = sx - (sx - self.offset_x) * factor
+        self.offset_y = sy - (sy - self.offset_y) * factor
+        self.scale = new_scale
+        self.canvas.scale("map", sx, sy, factor, factor)
+        self.schedule_redraw()
+
+    def pan(self, dx, dy):
+        self.offset_x += dx
+        self.offset_y += dy
+        self.canvas.move("map", dx, dy)
+        self.schedule_redraw()
+
+    def on_wheel(self, event):
+        self.zoom(ZOOM_STEP if event.delta > 0 else 1 / ZOOM_STEP, event.x, event.y)
+
+    def on_pan_start(self, event):
+        self.pan_start = (event.x, event.y)
+
+    def on_pan(self, event):
+        if self.pan_start is not None:
+            x, y = self.pan_start
+            self.pan_start = (event.x, event.y)
+            self.pan(event.x - x, event.y - y)
+
+    def configure(self, key, **options):
+        if key[0] == "node":
+            self.style_node(key[1], **options)
+        else:
+            self.style_edge(key[1], key[2], **options)
+
+    def apply(self, key, options):
+        # CanvasUpdateQueue apply callback
+        self.configure(key, **options)
+
+    def style_node(self, city, **options):
+        self.node_styles.setdefault(city, {}).update(options)
+        item = self.node_items.get(city)
+        if item is not None:
+            self.canvas.itemconfig(item, **options)
+
+    def style_edge(self, city1, city2, **options):
+        key = self.edge_key(city1, city2)
+        self.edge_styles.setdefault(key, {}).update(options)
+        item = self.edge_items.get(key)
+        if item is not None:
+            self.canvas.itemconfig(item, **options)
+
+    def clear_edge_styles(self):
+        self.edge_styles.clear()
+        for item in self.edge_items.values():
+            self.canvas.itemconfig(item, **EDGE_STYLE)
+
+    def clear_styles(self):
+        self.node_styles.clear()
+        for item in self.node_items.values():
+            self.canvas.itemconfig(item, **NODE_STYLE)
+        self.clear_edge_styles()
+
+    def schedule_redraw(self):
+        if self.redraw_id is not None:
+            self.canvas.after_cancel(self.redraw_id)
+        self.redraw_id = self.canvas.after(REDRAW_DELAY_MS, self.redraw)
+
+    def close(self):
+        # Drop a pending redraw so it can't fire after the window is destroyed
+        if self.redraw_id is not None:
+            self.canvas.after_cancel(self.redraw_id)
+            self.redraw_id = None
+
+    def redraw(self):
+        self.redraw_id = None
+        canvas = self.canvas
+        canvas.delete("map")
+        self.node_items = {}
+        self.edge_items = {}
+
+        region = self.visible_region()
+        if region[0] > region[2] or region[1] > region[3]:
+            return
+        # Cell sizes tell roughly how much is on screen without touching
+        # every city
+        if (self.scale < CLUSTER_ZOOM or self.node_grid.estimate(*region) > MAX_ITEMS or
+                self.edge_grid.estimate(*region) > 3 * MAX_ITEMS):
+            level = self.cluster_level()
+            self.draw_clusters(level, self.visible_clusters(level, region))
+            return
+
+        cities = self.node_grid.query(*region)
+        roads = self.edge_grid.query(*region)
+        detail = self.scale >= DETAIL_ZOOM
+        for key in roads:
+            self.draw_road(key, detail)
+        # Roads go under everything, including other roads' labels
+        canvas.tag_lower("road")
+        for city in cities:
+            self.draw_city(city, detail)
+
+    def draw_road(self, key, detail):
+        canvas = self.canvas
+        city1, city2 = key
+        x1, y1 = self.to_screen(*self.coordinates[city1])
+        x2, y2 = self.to_screen(*self.coordinates[city2])
+        style = dict(EDGE_STYLE, **self.edge_styles.get(key, {}))
+        line = canvas.create_line(x1, y1, x2, y2, tags=("map", "road"), **style)
+        self.edge_items[key] = line
+        if detail:
+            mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
+            label = canvas.create_text(mid_x, mid_y - 10, text=str(self.roads[key]), fill="black", tags=("map",))
+            x0, y0, x1, y1 = canvas.bbox(label)
+            background = canvas.create_rectangle(x0-2, y0-2, x1+2, y1+2, fill="pink", outline="", tags=("map",))
+            canvas.tag_lower(background, label)
+
+    def draw_city(self, city, detail):
+        canvas = self.canvas
+        x, y = self.to_screen(*self.coordinates[city])
+        style = dict(NODE_STYLE, **self.node_styles.get(city, {}))
+        if not detail:
+            self.node_items[city] = canvas.create_rectangle(x-4, y-4, x+4, y+4, outline="black", tags=("map",),
+                                                            **style)
+            return
+        # Boxes shrink with the zoom so neighbouring cities stay apart
+        size = min(self.scale, 1)
+        w = 48 * size
+        h = 28 * size
+        # White margin hides the roads running under the city
+        canvas.create_rectangle(x-w-2, y-h-2, x+w+2, y+h+2, fill="white", outline="white", tags=("map",))
+        self.node_items[city] = canvas.create_rectangle(x-w, y-h, x+w, y+h, outline="black", tags=("map",), **style)
+        canvas.create_text(x, y - 10 * size, text=city, fill="black", tags=("map",))
+        if self.dropdowns:
+            canvas.create_window(x, y + 12 * size, window=self.dropdown(city), tags=("map",))
+
+    def dropdown(self, city):
+        widget = self.dropdown_widgets.get(city)
+        if widget is None:
+            var = self.dropdown_vars.get(city)
+            if var is None:
+                var = tk.StringVar(self.canvas)
+                var.set(" ")
+                self.dropdown_vars[city] = var
+            widget = tk.OptionMenu(self.canvas, var, " ", "Start", "End")
+            widget.config(width=5, height=1, font=('Helvetica', 8))
+            self.dropdown_widgets[city] = widget
+        return widget
+
+    def cluster_level(self):
+        # Cities are merged per square world cell of about CLUSTER_PX on
+        # screen. Cell sizes are powers of two, so each level is built once
+        # and reused for every zoom that rounds to it.
+        power = round(math.log2(CLUSTER_PX / self.scale))
+        level = self.cluster_levels.get(power)
+        if level is None:
+            level = self.build_cluster_level(2.0 ** power)
+            self.cluster_levels[power] = level
+        return level
+
+    def build_cluster_level(self, size):
+        clusters = {}
+        cell_of = {}
+        for city, (x, y) in self.coordinates.items():
+            cell = (int(x // size), int(y // size))
+            cell_of[city] = cell
+            entry = clusters.get(cell)
+            if entry is None:
+                clusters[cell] = [1, x, y]
+            else:
+                entry[0] += 1
+                entry[1] += x
+                entry[2] += y
+        # Roads between different cells become links between their
+        # clusters. Only worth it for coarse levels; on fine ones there
+        # would be as many links as roads.
+        links = {}
+        if len(clusters) <= MAX_ITEMS:
+            for city1, city2 in self.roads:
+                a = cell_of[city1]
+                b = cell_of[city2]
+                if a != b:
+                    links.setdefault(a, set()).add(b)
+                    links.setdefault(b, set()).add(a)
+        return size, clusters, links
+
+    def visible_clusters(self, level, region):
+        size, clusters, _ = level
+        cx0, cy0 = int(region[0] // size), int(region[1] // size)
+        cx1, cy1 = int(region[2] // size), int(region[3] // size)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(clusters):
+            return {cell: entry for cell, entry in clusters.items()
+                    if cx0 <= cell[0] <= cx1 and cy0 <= cell[1] <= cy1}
+        visible = {}
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                entry = clusters.get((cx, cy))
+                if entry is not None:
+                    visible[(cx, cy)] = entry
+        return visible
+
+    def draw_clusters(self, level, visible):
+        # One glyph per cluster at the centre of its cities, sized by how
+        # many cities it stands for, joined where roads cross between them
+        canvas = self.canvas
+        _, clusters, links = level
+        centres = {}
+        for cell, (count, sum_x, sum_y) in visible.items():
+            centres[cell] = self.to_screen(sum_x / count, sum_y / count)
+
+        drawn = set()
+        for cell in visible:
+            x1, y1 = centres[cell]
+            for other in links.get(cell, ()):
+                if (other, cell) in drawn:
+                    continue
+                drawn.add((cell, other))
+                if other in centres:
+                    x2, y2 = centres[other]
+                else:
+                    count, sum_x, sum_y = clusters[other]
+                    x2, y2 = self.to_screen(sum_x / count, sum_y / count)
+                canvas.create_line(x1, y1, x2, y2, fill="lightsteelblue", tags=("map",))
+
+        for cell, (count, _, _) in visible.items():
+            x, y = centres[cell]
+            radius = 3 + 3 * math.log2(count)
+            canvas.create_oval(x - radius, y - radius, x + radius, y + radius, fill="lightblue",
+                               outline="steelblue", tags=("map",))
+            if count > 1:
+                canvas.create_text(x, y, text=str(count), font=('Helvetica', 8), tags=("map",))
@@ -0,0 +1,118 @@
+import tkinter as tk
+
+# Fastest redraw rate the replay will ask Tk for, in milliseconds
+MIN_INTERVAL_MS = 16
+
+
+# Plays back a SearchTrace on the Tk event loop. The search itself runs at
+# full speed; only the animation is paced, so it never slows the algorithm.
+class TraceReplayer:
+    def __init__(self, root, on_event, on_done=None, speed=2.0):
+        self.root = root
+        self.on_event = on_event
+        self.on_done = on_done
+        self.speed = speed
+        self.trace = None
+        self.position = 0
+        self.paused = False
+        self.after_id = None
+
+    def start(self, trace):
+        self.stop()
+        self.trace = trace
+        self.position = 0
+        if not self.running:
+            if self.on_done:
+                self.on_done()
+        elif not self.paused:
+            self._schedule()
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.trace = None
+
+    @property
+    def running(self):
+        return self.trace is not None and self.position < len(self.trace)
+
+    def set_speed(self, events_per_second):
+        self.speed = max(float(events_per_second), 0.1)
+
+    def pause(self):
+        self.paused = True
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def resume(self):
+        self.paused = False
+        if self.running and self.after_id is None:
+            self._schedule()
+
+    def toggle_pause(self):
+        if self.paused:
+            self.resume()
+        else:
+            self.pause()
+
+    def step(self):
+        # Show exactly one more event; mostly useful while paused
+        if self.running:
+            self._play(1)
+
+    def skip_to_end(self):
+        if self.running:
+            self._play(len(self.trace) - self.position)
+
+    def _schedule(self):
+        interval = max(MIN_INTERVAL_MS, int(1000 / self.speed))
+        self.after_id = self.root.after(interval, self._tick, interval)
+
+    def _tick(self, interval):
+        self.after_id = None
+        # At high speeds several events are shown per frame instead of
+        # asking Tk for more frames than it can draw
+        self._play(max(1, int(self.speed * interval / 1000)))
+        if self.running and not self.paused:
+            self._schedule()
+
+    def _play(self, count):
+        trace = self.trace
+        end = min(self.position + count, len(trace))
+        for index in range(self.position, end):
+            self.on_event(*trace[index])
+        self.position = end
+        if end == len(trace):
+            if self.after_id is not None:
+                self.root.after_cancel(self.after_id)
+                self.after_id = None
+            if self.on_done:
+                self.on_done()
+
+
+# Pause / Step / Skip buttons and a speed slider for a TraceReplayer
+class ReplayControls(tk.Frame):
+    def __init__(self, parent, replayer, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.replayer = replayer
+
+        self.pause_button = tk.Button(self, text="Pause", width=7, command=self.toggle_pause)
+        self.pause_button.pack(side=tk.LEFT, padx=5)
+
+        step_button = tk.Button(self, text="Step", command=replayer.step)
+        step_button.pack(side=tk.LEFT, padx=5)
+
+        skip_button = tk.Button(self, text="Skip to End", command=replayer.skip_to_end)
+        skip_button.pack(side=tk.LEFT, padx=5)
+
+        self.speed_scale = tk.Scale(self, from_=1, to=200, orient=tk.HORIZONTAL,
+                                    label="Steps per second", length=160,
+                                    command=lambda value: replayer.set_speed(value))
+        self.speed_scale.set(replayer.speed)
+        self.speed_scale.pack(side=tk.LEFT, padx=5)
+
+    def toggle_pause(self):
+        self.replayer.toggle_pause()
+        self.pause_button.config(text="Resume" if self.replayer.paused else "Pause")
@@ -0,0 +1,147 @@
+# Default cell size in canvas pixels, about one city rectangle across
+CELL_SIZE = 100
+# Rectangles covering more cells than this (long roads, mostly) are kept
+# in a separate list instead of being copied into every cell they touch
+MAX_CELLS_PER_BOX = 64
+
+
+# Uniform grid over canvas coordinates for hit-testing. Every rectangle is
+# listed in each cell it overlaps, so a click only looks at the few
+# rectangles in its own cell and never asks Tk for a bbox.
+#
+# When rectangles overlap, find() returns the one inserted first, which is
+# the same city the old loop over node_objects used to pick.
+class SpatialGrid:
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.large = set()
+        self.boxes = {}
+        self.order = {}
+        self.counter = 0
+
+    def _cell_range(self, x0, y0, x1, y1):
+        size = self.cell_size
+        return int(x0 // size), int(y0 // size), int(x1 // size), int(y1 // size)
+
+    def _cells_of(self, x0, y0, x1, y1):
+        cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                yield cx, cy
+
+    def _is_large(self, box):
+        cx0, cy0, cx1, cy1 = self._cell_range(*box)
+        return (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > MAX_CELLS_PER_BOX
+
+    def insert(self, key, x0, y0, x1, y1):
+        if key in self.boxes:
+            self.move(key, x0, y0, x1, y1)
+            return
+        self.order[key] = self.counter
+        self.counter += 1
+        self._add(key, (x0, y0, x1, y1))
+
+    def _add(self, key, box):
+        self.boxes[key] = box
+        if self._is_large(box):
+            self.large.add(key)
+            return
+        cells = self.cells
+        for cell in self._cells_of(*box):
+            members = cells.get(cell)
+            if members is None:
+                cells[cell] = {key}
+            else:
+                members.add(key)
+
+    def _discard(self, key, box):
+        if key in self.large:
+            self.large.discard(key)
+            return
+        for cell in self._cells_of(*box):
+            members = self.cells[cell]
+            members.discard(key)
+            if not members:
+                del self.cells[cell]
+
+    def remove(self, key):
+        box = self.boxes.pop(key, None)
+        if box is None:
+            return
+        self._discard(key, box)
+        del self.order[key]
+
+    def move(self, key, x0, y0, x1, y1):
+        box = (x0, y0, x1, y1)
+        old = self.boxes[key]
+        if key in self.large or self._is_large(box):
+            self._discard(key, old)
+            self._add(key, box)
+            return
+        old_cells = set(self._cells_of(*old))
+        new_cells = set(self._cells_of(*box))
+        self.boxes[key] = box
+        for cell in old_cells - new_cells:
+            members = self.cells[cell]
+            members.discard(key)
+            if not members:
+                del self.cells[cell]
+        for cell in new_cells - old_cells:
+            self.cells.setdefault(cell, set()).add(key)
+
+    def query(self, x0, y0, x1, y1):
+        # Set of keys whose rectangles overlap the given rectangle
+        found = set()
+        boxes = self.boxes
+        cells = self.cells
+        cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(cells):
+            # Bigger than the occupied part of the grid: walk the cells we have
+            candidates = (members for (cx, cy), members in cells.items()
+                          if cx0 <= cx <= cx1 and cy0 <= cy <= cy1)
+        else:
+            candidates = (cells.get(cell, ()) for cell in self._cells_of(x0, y0, x1, y1))
+        for members in (*candidates, self.large):
+            for key in members:
+                if key in found:
+                    continue
+                bx0, by0, bx1, by1 = boxes[key]
+                if bx0 <= x1 and x0 <= bx1 and by0 <= y1 and y0 <= by1:
+                    found.add(key)
+        return found
+
+    def estimate(self, x0, y0, x1, y1):
+        # Quick upper bound on len(query(...)) from the cell sizes alone
+        cells = self.cells
+        cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(cells):
+            total = sum(len(members) for (cx, cy), members in cells.items()
+                        if cx0 <= cx <= cx1 and cy0 <= cy <= cy1)
+        else:
+            total = sum(len(cells.get(cell, ())) for cell in self._cells_of(x0, y0, x1, y1))
+        return total + len(self.large)
+
+    def find(self, x, y):
+        # Key of the rectangle containing (x, y), or None
+        size = self.cell_size
+        best = None
+        for members in (self.cells.get((int(x // size), int(y // size)), ()), self.large):
+            for key in members:
+                x0, y0, x1, y1 = self.boxes[key]
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    if best is None or self.order[key] < self.order[best]:
+                        best = key
+        return best
+
+    def clear(self):
+        self.cells.clear()
+        self.large.clear()
+        self.boxes.clear()
+        self.order.clear()
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __contains__(self, key):
+        return key in self.boxes
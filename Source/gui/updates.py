@@ -0,0 +1,82 @@
+import threading
+
+# How often the Tk thread drains the queue, in milliseconds (about 60 fps)
+FRAME_MS = 16
+
+
+# Collects canvas changes from any thread and applies them from the Tk
+# thread on a root.after timer. Tk is not thread-safe, so search workers
+# must only talk to the GUI through this queue.
+#
+# Several changes to the same item within one frame are merged, so a burst
+# of thousands of color changes costs one itemconfig per item and a single
+# redraw.
+class CanvasUpdateQueue:
+    def __init__(self, root, canvas, resolve=None, interval=FRAME_MS, apply=None):
+        self.root = root
+        self.canvas = canvas
+        # Maps a key passed to configure() to a canvas item id (or None if
+        # the item does not exist right now). Defaults to using item ids.
+        self.resolve = resolve or (lambda key: key)
+        # Or apply(key, options) takes over completely, e.g. MapView.apply,
+        # which also remembers options for items that are not drawn yet
+        self.apply = apply
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.calls = []
+        self.after_id = None
+        self.start()
+
+    def configure(self, key, **options):
+        with self.lock:
+            current = self.pending.get(key)
+            if current is None:
+                self.pending[key] = options
+            else:
+                current.update(options)
+
+    def call(self, func, *args):
+        # Run func(*args) on the Tk thread during the next frame
+        with self.lock:
+            self.calls.append((func, args))
+
+    def clear(self):
+        with self.lock:
+            self.pending = {}
+            self.calls = []
+
+    def start(self):
+        if self.after_id is None:
+            self.after_id = self.root.after(self.interval, self._drain)
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def flush(self):
+        # Apply everything queued so far right now; Tk thread only
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            calls, self.calls = self.calls, []
+
+        canvas = self.canvas
+        resolve = self.resolve
+        apply = self.apply
+        for key, options in pending.items():
+            if apply is not None:
+                apply(key, options)
+                continue
+            item = resolve(key)
+            if item is not None:
+                canvas.itemconfig(item, **options)
+        for func, args in calls:
+            func(*args)
+
+    def _drain(self):
+        self.after_id = None
+        try:
+            self.flush()
+        finally:
+            self.after_id = self.root.after(self.interval, self._drain)
@@ -1,11 +1,17 @@
 import tkinter as tk
-import subprocess 
 from tkinter.scrolledtext import ScrolledText
+from astarGUI import AStarWindow
+from citymap import CityMap
+from ucsGUI import UCSWindow
 
 # Create the main window
 root = tk.Tk()
 root.title("MCO1 - State Based Model - CSINTSY - S13 - GRP3")
 
+# One map and engine for every window, so opening a second window doesn't
+# build the graph (or the A* landmarks) again
+city_map = CityMap()
+
 # Create a menu frame
 menu_frame = tk.Frame(root)
 menu_frame.pack(pady=10)
@@ -14,17 +20,17 @@ menu_frame.pack(pady=10)
 welcome_label = tk.Label(menu_frame, text="Choose a Search Algorithm", font=("Helvetica", 16))
 welcome_label.pack(pady=10, padx=10)
 
-# Function to open AStar GUI in another file
+# Function to open the AStar window
 def open_astar_gui():
-    subprocess.Popen(["python", "astarGUI.py"])
+    AStarWindow(tk.Toplevel(root), city_map)
 
 # Button to open AStar GUI
 astar_button = tk.Button(menu_frame, text="AStar Search", command=open_astar_gui, width=20, height=2)
 astar_button.pack(pady=10)
 
-# Function to open Uniform Cost Search GUI in another file
+# Function to open the Uniform Cost Search window
 def open_ucs_gui():
-    subprocess.Popen(["python", "ucsGUI.py"])
+    UCSWindow(tk.Toplevel(root), city_map)
 
 # Button to open Uniform Cost Search GUI
 ucs_button = tk.Button(menu_frame, text="Uniform Cost Search", command=open_ucs_gui, width=20, height=2)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The tests import the engine package from the Source folder, and the shared
+# helpers in random_graphs.py from this one
+TESTS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS))
+sys.path.insert(0, TESTS)
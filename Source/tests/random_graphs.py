@@ -0,0 +1,65 @@
+import math
+import random
+
+import pytest
+
+from engine import CSRGraph, shortest_path_costs
+
+SEEDS = range(12)
+
+
+# Random directed graph as {city: {neighbor: weight}}. Some weights are
+# zero, and the last few cities only link among themselves, so part of the
+# graph can't reach the rest.
+def random_map(seed, n=24, isolated=4, zero_weights=True, integer=True):
+    rng = random.Random(seed)
+    names = [f"c{i}" for i in range(n)]
+    coordinates = {name: (rng.uniform(0, 100), rng.uniform(0, 100)) for name in names}
+    graph = {name: {} for name in names}
+    main = names[:n - isolated]
+    island = names[n - isolated:]
+    for group in (main, island):
+        for _ in range(len(group) * 3):
+            city, neighbor = rng.sample(group, 2)
+            if integer:
+                weight = rng.randint(0 if zero_weights else 1, 20)
+            else:
+                weight = rng.choice([0.0, rng.uniform(0.5, 20)]) if zero_weights else rng.uniform(0.5, 20)
+            graph[city][neighbor] = weight
+    return graph, coordinates
+
+
+# (seed, CSRGraph) pairs: integer weights, then float weights
+def graphs():
+    for seed in SEEDS:
+        yield seed, CSRGraph.from_dict(*random_map(seed))
+    for seed in SEEDS:
+        yield seed, CSRGraph.from_dict(*random_map(seed, integer=False))
+
+
+def queries(graph, seed, count=8):
+    rng = random.Random(seed)
+    return [(rng.randrange(graph.num_nodes), rng.randrange(graph.num_nodes)) for _ in range(count)]
+
+
+def expected(graph, start):
+    return shortest_path_costs(graph, start)[0]
+
+
+def path_cost(graph, path):
+    total = 0
+    for node, neighbor in zip(path, path[1:]):
+        total += min(graph.weights[slot] for slot in range(graph.offsets[node], graph.offsets[node + 1])
+                     if graph.targets[slot] == neighbor)
+    return total
+
+
+def check(graph, start, goal, result, costs):
+    # Same cost as Dijkstra, and a path that actually has that cost
+    if costs[goal] == math.inf:
+        assert not result.found
+        return
+    assert result.total_cost == pytest.approx(costs[goal])
+    path = result.path
+    assert path[0] == start and path[-1] == goal
+    assert path_cost(graph, path) == pytest.approx(costs[goal])
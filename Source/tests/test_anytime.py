@@ -0,0 +1,46 @@
+import math
+
+import pytest
+
+from engine import Landmarks, a_star_search, anytime_a_star
+from random_graphs import check, expected, graphs, queries
+
+
+def test_anytime_ends_optimal():
+    # Without a deadline it keeps improving until the path is optimal
+    for seed, graph in graphs():
+        landmarks = Landmarks.build(graph, count=3)
+        for start, goal in queries(graph, seed):
+            result = anytime_a_star(graph, start, goal, landmarks.heuristic(goal))
+            check(graph, start, goal, result, expected(graph, start))
+            if result.found:
+                assert result.bound == 1
+
+
+def test_every_solution_keeps_its_bound():
+    for seed, graph in graphs():
+        landmarks = Landmarks.build(graph, count=3)
+        for start, goal in queries(graph, seed, 4):
+            optimum = expected(graph, start)[goal]
+            solutions = []
+            anytime_a_star(graph, start, goal, landmarks.heuristic(goal), initial_weight=4,
+                           on_solution=solutions.append)
+            if optimum == math.inf:
+                assert not solutions
+                continue
+            for solution in solutions:
+                assert solution.total_cost <= solution.bound * optimum + 1e-9
+            assert [s.total_cost for s in solutions] == sorted((s.total_cost for s in solutions), reverse=True)
+
+
+@pytest.mark.parametrize("weight", [1.5, 3])
+def test_weighted_a_star_bound(weight):
+    for seed, graph in graphs():
+        landmarks = Landmarks.build(graph, count=3)
+        for start, goal in queries(graph, seed):
+            optimum = expected(graph, start)[goal]
+            result = a_star_search(graph, start, goal, landmarks.heuristic(goal), weight=weight)
+            if optimum == math.inf:
+                assert not result.found
+            else:
+                assert optimum - 1e-9 <= result.total_cost <= weight * optimum + 1e-9
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from engine import BatchRunner, CSRGraph, uniform_cost_search
+
+
+def random_graph(seed, n=40, m=150, integer=True):
+    rng = random.Random(seed)
+    edges = [(rng.randrange(n), rng.randrange(n), rng.randint(1, 30) if integer else rng.uniform(0.5, 30))
+             for _ in range(m)]
+    return CSRGraph.from_edges([str(i) for i in range(n)], edges)
+
+
+def pairs(graph, seed, count=60):
+    rng = random.Random(seed)
+    return [(rng.randrange(graph.num_nodes), rng.randrange(graph.num_nodes)) for _ in range(count)]
+
+
+def check(graph, queries, answers):
+    assert sorted(answer.index for answer in answers) == list(range(len(queries)))
+    for answer in answers:
+        start, goal = queries[answer.index]
+        assert (answer.start, answer.goal) == (start, goal)
+        direct = uniform_cost_search(graph, start, goal)
+        assert answer.total_cost == pytest.approx(direct.total_cost)
+        if direct.found:
+            assert answer.path[0] == start and answer.path[-1] == goal
+        else:
+            assert answer.path is None
+
+
+@pytest.mark.parametrize("algorithm", ["ucs", "bidirectional"])
+@pytest.mark.parametrize("integer", [True, False])
+def test_matches_uniform_cost_search(algorithm, integer):
+    graph = random_graph(1, integer=integer)
+    queries = pairs(graph, 2)
+    with BatchRunner(graph, workers=2, algorithm=algorithm, chunk_size=7) as runner:
+        ordered = list(runner.run(queries))
+        assert [answer.index for answer in ordered] == list(range(len(queries)))
+        check(graph, queries, ordered)
+        check(graph, queries, list(runner.run(queries, ordered=False)))
+        assert sum(stats["queries"] for stats in runner.worker_stats().values()) == 2 * len(queries)
+
+
+def test_graph_without_edges():
+    graph = CSRGraph.from_edges(["a", "b", "c"], [])
+    queries = [(0, 1), (2, 2), (1, 0)]
+    with BatchRunner(graph, workers=1) as runner:
+        answers = list(runner.run(queries))
+    check(graph, queries, answers)
+    assert answers[1].total_cost == 0
+
+
+def test_costs_only_and_metrics():
+    graph = random_graph(3)
+    queries = pairs(graph, 4, 20)
+    with BatchRunner(graph, workers=1, with_paths=False, metrics=True) as runner:
+        answers = list(runner.run(queries))
+    assert all(answer.path is None for answer in answers)
+    assert runner.metrics.pops >= sum(answer.nodes_expanded for answer in answers)
+
+
+def test_rejects_unknown_algorithm():
+    with pytest.raises(ValueError):
+        BatchRunner(random_graph(5), algorithm="dfs")
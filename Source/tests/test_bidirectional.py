@@ -0,0 +1,38 @@
+from engine import FRONTIERS, CSRGraph, Landmarks, bidirectional_a_star, bidirectional_search
+from random_graphs import check, expected, graphs, queries
+
+
+def test_matches_dijkstra():
+    for seed, graph in graphs():
+        landmarks = Landmarks.build(graph, count=3)
+        for start, goal in queries(graph, seed):
+            costs = expected(graph, start)
+            check(graph, start, goal, bidirectional_search(graph, start, goal), costs)
+            check(graph, start, goal, bidirectional_a_star(graph, start, goal, landmarks.heuristic(goal),
+                                                           landmarks.reverse_heuristic(start)), costs)
+
+
+def test_every_frontier():
+    for seed, graph in graphs():
+        for name in FRONTIERS:
+            if name in ("bucket", "radix") and not graph.integer_weights:
+                continue
+            for start, goal in queries(graph, seed, 3):
+                check(graph, start, goal, bidirectional_search(graph, start, goal, frontier=name),
+                      expected(graph, start))
+
+
+def test_one_way_roads():
+    # The backward search must follow edges against their direction
+    graph = CSRGraph.from_edges(["s", "a", "b", "t"], [(0, 1, 1), (1, 3, 1), (3, 0, 1), (0, 2, 5), (2, 3, 5)])
+    result = bidirectional_search(graph, 0, 3)
+    assert result.total_cost == 2 and result.path_names == ["s", "a", "t"]
+    back = bidirectional_search(graph, 3, 1)
+    assert back.total_cost == 2 and back.path_names == ["t", "s", "a"]
+    assert sum(result.expanded_per_direction) == result.nodes_expanded
+
+
+def test_start_is_goal():
+    graph = CSRGraph.from_edges(["s", "t"], [(0, 1, 3)])
+    result = bidirectional_search(graph, 0, 0)
+    assert result.total_cost == 0 and result.path == [0]
@@ -0,0 +1,109 @@
+import random
+
+from engine import (BUDGET, CANCELLED, CSRGraph, CancellationToken, IncrementalSearch, ShortestPathTreeCache,
+                    a_star_search, anytime_a_star, bidirectional_search, multi_target_search, shortest_path_costs,
+                    uniform_cost_search)
+
+
+def ring(n):
+    # Every node is on a cycle, so a search to the far side expands about half of it
+    edges = []
+    for node in range(n):
+        edges.append((node, (node + 1) % n, 1))
+        edges.append(((node + 1) % n, node, 1))
+    return CSRGraph.from_edges([str(node) for node in range(n)], edges)
+
+
+SEARCHES = [
+    lambda graph, goal, token: uniform_cost_search(graph, 0, goal, cancel=token),
+    lambda graph, goal, token: a_star_search(graph, 0, goal, cancel=token),
+    lambda graph, goal, token: bidirectional_search(graph, 0, goal, cancel=token),
+    lambda graph, goal, token: multi_target_search(graph, 0, [goal], cancel=token),
+    lambda graph, goal, token: ShortestPathTreeCache(graph).search(0, goal, cancel=token),
+    lambda graph, goal, token: anytime_a_star(graph, 0, goal, cancel=token),
+]
+
+
+def test_budget_applies_to_each_search_the_token_is_given_to():
+    graph = ring(200)
+    for search in SEARCHES:
+        token = CancellationToken(max_expansions=20)
+        first = search(graph, 100, token)
+        assert first.stopped == BUDGET and not first.found
+        # The second search gets its own budget and finds a nearby goal
+        second = search(graph, 3, token)
+        assert second.stopped is None
+        assert second.total_cost == 3
+        assert second.nodes_expanded > 0
+
+
+def test_incremental_search_reuses_token():
+    graph = {str(node): {str((node + 1) % 50): 1, str((node - 1) % 50): 1} for node in range(50)}
+    planner = IncrementalSearch(graph, "0")
+    token = CancellationToken(max_expansions=5)
+    assert planner.search(planner.id_of("25"), cancel=token).stopped == BUDGET
+    # The stopped search left its repairs queued; later calls carry on from there
+    for _ in range(10):
+        result = planner.search(planner.id_of("25"), cancel=token)
+        if result.stopped is None:
+            break
+    assert result.total_cost == 25
+
+
+def test_cancel_stays_in_force():
+    graph = ring(50)
+    token = CancellationToken()
+    token.cancel()
+    for search in SEARCHES:
+        result = search(graph, 25, token)
+        assert result.stopped == CANCELLED and not result.found
+
+
+def test_unstopped_search_matches_dijkstra():
+    rng = random.Random(1)
+    graph = ring(60)
+    token = CancellationToken(deadline=60)
+    for _ in range(5):
+        goal = rng.randrange(60)
+        assert uniform_cost_search(graph, 0, goal, cancel=token).total_cost == shortest_path_costs(graph, 0)[0][goal]
+
+
+# Trace that runs another search in the middle of this one, the way a
+# search on another thread sharing the token could
+class Interrupt:
+    def __init__(self, action):
+        self.action = action
+
+    def expand(self, node):
+        if self.action is not None:
+            action = self.action
+            self.action = None
+            action()
+
+    def relax(self, node, neighbor):
+        pass
+
+    def path(self, path):
+        pass
+
+
+TRACED_SEARCHES = [
+    lambda graph, goal, token, trace: uniform_cost_search(graph, 0, goal, trace, cancel=token),
+    lambda graph, goal, token, trace: a_star_search(graph, 0, goal, trace=trace, cancel=token),
+    lambda graph, goal, token, trace: bidirectional_search(graph, 0, goal, trace, cancel=token),
+    lambda graph, goal, token, trace: multi_target_search(graph, 0, [goal], trace=trace, cancel=token),
+    lambda graph, goal, token, trace: ShortestPathTreeCache(graph).search(0, goal, trace, cancel=token),
+    lambda graph, goal, token, trace: anytime_a_star(graph, 0, goal, trace=trace, cancel=token),
+]
+
+
+def test_searches_sharing_a_token_at_once():
+    # A search that runs out of budget while another one is running must
+    # not make the other one stop or report a stop
+    graph = ring(400)
+    for search in TRACED_SEARCHES:
+        token = CancellationToken(max_expansions=30)
+        other = []
+        result = search(graph, 5, token, Interrupt(lambda: other.append(search(graph, 200, token, None))))
+        assert other[0].stopped == BUDGET and not other[0].found
+        assert result.stopped is None and result.total_cost == 5
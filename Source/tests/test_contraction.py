@@ -0,0 +1,28 @@
+from benchmarks.graphs import grid_graph
+from engine import ContractionHierarchy, contraction_hierarchy_search
+from random_graphs import check, expected, graphs, queries
+
+
+def test_matches_dijkstra():
+    # The unpacked path must use original edges only, which check() verifies
+    for seed, graph in graphs():
+        ch = ContractionHierarchy.build(graph)
+        for start, goal in queries(graph, seed):
+            check(graph, start, goal, contraction_hierarchy_search(ch, start, goal), expected(graph, start))
+
+
+def test_short_witness_searches():
+    # A witness search that gives up early only adds shortcuts, never wrong ones
+    graph = grid_graph(8, 20, 3)
+    ch = ContractionHierarchy.build(graph, witness_limit=1)
+    assert ch.num_shortcuts >= ContractionHierarchy.build(graph).num_shortcuts
+    for start, goal in queries(graph, 3, 20):
+        check(graph, start, goal, contraction_hierarchy_search(ch, start, goal), expected(graph, start))
+
+
+def test_rank_and_progress():
+    graph = grid_graph(5, 9, 1)
+    calls = []
+    ch = ContractionHierarchy.build(graph, progress=lambda done, total: calls.append((done, total)))
+    assert sorted(ch.rank) == list(range(graph.num_nodes))
+    assert calls[-1] == (graph.num_nodes, graph.num_nodes)
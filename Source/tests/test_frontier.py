@@ -0,0 +1,50 @@
+import pytest
+
+from benchmarks.graphs import grid_graph
+from engine import (FRONTIERS, TIE_BREAKS, BucketQueue, Landmarks, a_star_search, shortest_path_costs,
+                    uniform_cost_search)
+from random_graphs import check, expected, graphs, queries
+
+
+@pytest.mark.parametrize("frontier", ["bucket", "radix", BucketQueue])
+def test_tie_break_rejects_bucket_frontiers(frontier):
+    graph = grid_graph(5, 9, 1)
+    with pytest.raises(ValueError):
+        uniform_cost_search(graph, 0, 24, frontier=frontier, tie_break="fifo")
+    with pytest.raises(ValueError):
+        a_star_search(graph, 0, 24, frontier=frontier, tie_break="g")
+
+
+@pytest.mark.parametrize("tie_break", TIE_BREAKS)
+def test_tie_break_with_heaps(tie_break):
+    graph = grid_graph(6, 1, 2)
+    costs = shortest_path_costs(graph, 0)[0]
+    for name in FRONTIERS:
+        if name in ("bucket", "radix"):
+            continue
+        for goal in (7, 20, 35):
+            assert uniform_cost_search(graph, 0, goal, frontier=name, tie_break=tie_break).total_cost == costs[goal]
+    # "auto" picks a heap that can hold the keys
+    assert uniform_cost_search(graph, 0, 35, tie_break=tie_break).total_cost == costs[35]
+
+
+@pytest.mark.parametrize("frontier", list(FRONTIERS) + ["auto"])
+def test_uniform_cost_search(frontier):
+    for seed, graph in graphs():
+        if frontier in ("bucket", "radix") and not graph.integer_weights:
+            continue
+        for start, goal in queries(graph, seed):
+            check(graph, start, goal, uniform_cost_search(graph, start, goal, frontier=frontier),
+                  expected(graph, start))
+
+
+@pytest.mark.parametrize("tie_break", TIE_BREAKS)
+def test_tie_break_on_random_graphs(tie_break):
+    # Zero-weight edges give plenty of equal keys; floats take the tuple keys
+    for seed, graph in graphs():
+        landmarks = Landmarks.build(graph, count=3)
+        for start, goal in queries(graph, seed):
+            costs = expected(graph, start)
+            check(graph, start, goal, uniform_cost_search(graph, start, goal, tie_break=tie_break), costs)
+            check(graph, start, goal, a_star_search(graph, start, goal, landmarks.heuristic(goal),
+                                                    tie_break=tie_break), costs)
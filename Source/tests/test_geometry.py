@@ -0,0 +1,90 @@
+import math
+import random
+
+import pytest
+
+from engine import CSRGraph, GeometricHeuristic, a_star_search, shortest_path_costs
+from random_graphs import check, expected, graphs, queries
+
+
+def scattered(seed, metric, road_factor, n=60):
+    # Cities on a 1000 x 1000 canvas with roads costing road_factor times
+    # their length or more, so the heuristic has to be rescaled to the weights
+    rng = random.Random(seed)
+    points = [(rng.uniform(0, 1000), rng.uniform(0, 1000)) for _ in range(n)]
+    names = [str(node) for node in range(n)]
+    edges = []
+    for node in range(n):
+        for neighbor in rng.sample(range(n), 4):
+            if neighbor == node:
+                continue
+            (x1, y1), (x2, y2) = points[node], points[neighbor]
+            length = math.hypot(x1 - x2, y1 - y2) if metric == "euclidean" else abs(x1 - x2) + abs(y1 - y2)
+            # The first road costs exactly road_factor per unit, the rest more
+            weight = length * road_factor * (1 if not edges else rng.uniform(1, 3))
+            edges.append((node, neighbor, weight))
+            edges.append((neighbor, node, weight))
+    return CSRGraph.from_edges(names, edges, dict(zip(names, points)))
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+@pytest.mark.parametrize("metric", ["euclidean", "manhattan"])
+@pytest.mark.parametrize("road_factor", [0.001, 1, 250])
+def test_admissible_and_consistent(metric, road_factor, use_numpy):
+    graph = scattered(int(road_factor * 1000), metric, road_factor)
+    geometric = GeometricHeuristic(graph, metric, use_numpy=use_numpy)
+    # The scale is the cheapest weight per unit of length, a little under
+    assert road_factor * (1 - 1e-6) <= geometric.scale <= road_factor
+    for goal in range(0, graph.num_nodes, 7):
+        h = geometric.heuristic(goal)
+        exact = shortest_path_costs(graph.reversed(), goal)[0]
+        for node in range(graph.num_nodes):
+            assert h[node] <= exact[node]
+        assert geometric.check_consistency(goal, tolerance=0) == []
+        for start in range(3, graph.num_nodes, 11):
+            assert a_star_search(graph, start, goal, h).total_cost == pytest.approx(exact[start])
+
+
+def test_numpy_and_plain_agree():
+    graph = scattered(5, "euclidean", 3)
+    plain = GeometricHeuristic(graph, use_numpy=False)
+    fast = GeometricHeuristic(graph, use_numpy=True)
+    assert fast.scale == pytest.approx(plain.scale)
+    assert fast.heuristic(4) == pytest.approx(plain.heuristic(4))
+
+
+def test_check_consistency_finds_bad_edges():
+    graph = scattered(2, "euclidean", 1)
+    geometric = GeometricHeuristic(graph)
+    # Pretend the roads are cheaper than the scale allows
+    geometric.scale *= 10
+    geometric.cache.clear()
+    assert geometric.check_consistency(0)
+
+
+def test_haversine():
+    # Longitude/latitude in millionths of a degree, weights in metres
+    names = ["a", "b", "c"]
+    coordinates = {"a": (0, 0), "b": (1000000, 0), "c": (1000000, 1000000)}
+    graph = CSRGraph.from_edges(names, [(0, 1, 112000), (1, 2, 112000), (0, 2, 300000)], coordinates)
+    geometric = GeometricHeuristic(graph, "haversine", degrees_per_unit=1e-6)
+    h = geometric.heuristic(2)
+    assert 0 < h[0] <= 224000
+    assert geometric.check_consistency(2) == []
+
+
+def test_random_graphs():
+    for seed, graph in graphs():
+        geometric = GeometricHeuristic(graph)
+        for start, goal in queries(graph, seed):
+            check(graph, start, goal, a_star_search(graph, start, goal, geometric.heuristic(goal)),
+                  expected(graph, start))
+
+
+def test_rejects_bad_input():
+    graph = CSRGraph.from_edges(["a", "b"], [(0, 1, 1)])
+    with pytest.raises(ValueError):
+        GeometricHeuristic(graph)
+    graph = CSRGraph.from_edges(["a", "b"], [(0, 1, 1)], {"a": (0, 0), "b": (1, 0)})
+    with pytest.raises(ValueError):
+        GeometricHeuristic(graph, "chebyshev")
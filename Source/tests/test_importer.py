@@ -0,0 +1,112 @@
+import pytest
+
+from engine import import_csv, import_dimacs, import_graph, importer
+
+GR = """c 9th DIMACS challenge style test graph
+c with a comment that is not four words long
+p sp 5 7
+a 1 2 7
+a 1 2 3
+a 2 3 4
+c a comment between arcs
+a 3 1 2
+a 3 4 10
+a 1 2 5
+a 4 3 1
+"""
+
+CO = """c coordinates
+p aux sp co 5
+v 1 10 20
+v 2 30 40
+v 3 -5 6
+v 4 0 0
+v 5 1000000 -1000000
+"""
+
+
+def edges(graph):
+    return {(graph.names[node], graph.names[target]): weight
+            for node in range(graph.num_nodes) for target, weight in graph.neighbors(node)}
+
+
+@pytest.fixture(params=["numpy", "plain"])
+def build(request, monkeypatch):
+    # Runs each test with and without the NumPy CSR builder
+    if request.param == "plain":
+        monkeypatch.setattr(importer, "numpy", None)
+    elif importer.numpy is None:
+        pytest.skip("needs NumPy")
+
+
+@pytest.mark.parametrize("chunk_bytes", [importer.CHUNK_BYTES, 16])
+def test_dimacs(tmp_path, monkeypatch, build, chunk_bytes):
+    # Small chunks put the c and p lines and the arcs in different chunks
+    monkeypatch.setattr(importer, "CHUNK_BYTES", chunk_bytes)
+    gr = tmp_path / "road.gr"
+    co = tmp_path / "road.co"
+    gr.write_text(GR)
+    co.write_text(CO)
+    progress = []
+    graph = import_dimacs(str(gr), str(co), lambda done, total: progress.append((done, total)))
+    assert graph.num_nodes == 5
+    assert list(graph.names) == ["1", "2", "3", "4", "5"]
+    # Three arcs 1 -> 2; only the cheapest is kept
+    assert edges(graph) == {("1", "2"): 3, ("2", "3"): 4, ("3", "1"): 2, ("3", "4"): 10, ("4", "3"): 1}
+    assert graph.integer_weights
+    assert list(graph.xs) == [10, 30, -5, 0, 1000000]
+    assert list(graph.ys) == [20, 40, 6, 0, -1000000]
+    assert progress and progress[-1][0] == progress[-1][1] == len(GR) + len(CO)
+
+
+def test_import_graph_finds_coordinates(tmp_path, build):
+    (tmp_path / "road.gr").write_text(GR)
+    assert import_graph(str(tmp_path / "road.gr")).xs is None
+    (tmp_path / "road.co").write_text(CO)
+    assert import_graph(str(tmp_path / "road.gr")).xs[1] == 30
+
+
+def test_fields_of_mixed_chunks():
+    chunk = b"c comment\np sp 3 2\na 1 2 5\nc another one here\na 2 3 6\n"
+    assert importer._fields(chunk, b"a", 4) == [b"a", b"1", b"2", b"5", b"a", b"2", b"3", b"6"]
+    assert importer._fields(chunk, b"p", 4) == [b"p", b"sp", b"3", b"2"]
+    assert importer._fields(b"a 1 2 5\na 2 3 6\n", b"a", 4) == [b"a", b"1", b"2", b"5", b"a", b"2", b"3", b"6"]
+    assert importer._fields(b"c nothing\n", b"p", 4) == []
+
+
+def test_csv_with_header(tmp_path, build):
+    path = tmp_path / "roads.csv"
+    path.write_text("from,to,miles\nDallas,Houston,239\nHouston,Austin,165\nDallas,Houston,250\n")
+    graph = import_csv(str(path))
+    assert list(graph.names) == ["Dallas", "Houston", "Austin"]
+    # Undirected: every road both ways, the cheaper Dallas-Houston road wins
+    assert edges(graph) == {("Dallas", "Houston"): 239, ("Houston", "Dallas"): 239, ("Houston", "Austin"): 165,
+                            ("Austin", "Houston"): 165}
+    assert graph.integer_weights
+
+
+def test_csv_without_header(tmp_path, build):
+    path = tmp_path / "roads.csv"
+    path.write_text("a,b,1.5\nb,c,2\n\na,c,4.25\nshort,row\nb,a,0.5\n")
+    graph = import_csv(str(path), undirected=False)
+    assert edges(graph) == {("a", "b"): 1.5, ("b", "c"): 2.0, ("a", "c"): 4.25, ("b", "a"): 0.5}
+    assert not graph.integer_weights
+    assert "short" not in graph.names
+
+
+def test_csv_delimiter_and_batches(tmp_path, monkeypatch, build):
+    monkeypatch.setattr(importer, "CSV_BATCH_ROWS", 2)
+    path = tmp_path / "roads.tsv"
+    path.write_text("source\ttarget\tcost\n" + "".join(f"n{i}\tn{i + 1}\t{i}\n" for i in range(7)))
+    graph = import_csv(str(path), undirected=False, delimiter="\t")
+    assert edges(graph) == {(f"n{i}", f"n{i + 1}"): i for i in range(7)}
+
+
+def test_empty_files(tmp_path, build):
+    gr = tmp_path / "empty.gr"
+    gr.write_text("p sp 3 0\n")
+    graph = import_dimacs(str(gr))
+    assert graph.num_nodes == 3 and graph.num_edges == 0
+    path = tmp_path / "empty.csv"
+    path.write_text("from,to,miles\n")
+    assert import_csv(str(path)).num_nodes == 0
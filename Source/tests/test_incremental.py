@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from engine import CSRGraph, IncrementalSearch, shortest_path_costs
+from random_graphs import SEEDS, expected, queries, random_map
+
+
+def planner_costs(planner):
+    # Cost from every node to the goal, by plain Dijkstra over the planner's
+    # current edges run backwards from the goal
+    names = planner.names
+    graph = {name: {} for name in names}
+    for node, connections in planner.successors.items():
+        for neighbor, weight in connections.items():
+            graph[names[neighbor]][names[node]] = weight
+    reverse = CSRGraph.from_dict(graph)
+    costs = shortest_path_costs(reverse, reverse.id_of(names[planner.goal]))[0]
+    return {name: costs[reverse.id_of(name)] for name in graph}
+
+
+def check(planner, start):
+    expected = planner_costs(planner)[start]
+    result = planner.search(planner.id_of(start))
+    assert result.total_cost == expected
+    if result.found:
+        path = result.path_names
+        assert path[0] == start and path[-1] == planner.name_of(planner.goal)
+        assert sum(planner.successors[planner.id_of(a)][planner.id_of(b)] for a, b in zip(path, path[1:])) == expected
+    else:
+        assert result.path == []
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_dijkstra_after_random_edits(seed):
+    rng = random.Random(seed)
+    cities = [f"c{i}" for i in range(30)]
+    graph = {city: {} for city in cities}
+    for _ in range(60):
+        a, b = rng.sample(cities, 2)
+        graph[a][b] = rng.randint(1, 20)
+    planner = IncrementalSearch(graph, cities[0])
+    for _ in range(40):
+        a, b = rng.sample(cities, 2)
+        if rng.random() < 0.5:
+            planner.set_edge(a, b, rng.randint(1, 20))
+        else:
+            planner.remove_edge(a, b)
+        check(planner, rng.choice(cities[1:]))
+
+
+def test_rejects_zero_and_negative_weights():
+    graph = {"s": {"a": 5}, "a": {"s": 5, "b": 0, "t": 1}, "b": {"a": 0}, "t": {"a": 1}}
+    with pytest.raises(ValueError):
+        IncrementalSearch(graph, "t")
+    planner = IncrementalSearch({"s": {"t": 1}}, "t")
+    with pytest.raises(ValueError):
+        planner.set_edge("s", "t", -1)
+    check(planner, "s")
+
+
+def test_ignores_cities_it_has_never_seen():
+    planner = IncrementalSearch({"s": {"a": 2}, "a": {"t": 3}}, "t")
+    check(planner, "s")
+    # A city added in the editor after the planner was built
+    planner.remove_node("x")
+    planner.remove_edge("x", "s")
+    planner.remove_edge("s", "x")
+    check(planner, "s")
+    planner.remove_node("a")
+    check(planner, "s")
+    with pytest.raises(ValueError):
+        planner.remove_node("t")
+
+
+def test_fresh_planner_matches_dijkstra():
+    # random_map leaves some cities unable to reach others
+    for seed in SEEDS:
+        city_graph, coordinates = random_map(seed, zero_weights=False)
+        graph = CSRGraph.from_dict(city_graph, coordinates)
+        for start, goal in queries(graph, seed, 4):
+            planner = IncrementalSearch(city_graph, graph.names[goal])
+            result = planner.search(planner.id_of(graph.names[start]))
+            assert result.total_cost == expected(graph, start)[goal]
+            if result.found:
+                assert result.path_names[0] == graph.names[start] and result.path_names[-1] == graph.names[goal]
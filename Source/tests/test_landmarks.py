@@ -0,0 +1,40 @@
+import math
+
+import pytest
+
+from engine import Landmarks, a_star_search, shortest_path_costs
+from random_graphs import check, expected, graphs, queries
+
+
+@pytest.mark.parametrize("strategy", ["farthest", "avoid"])
+def test_a_star_matches_dijkstra(strategy):
+    for seed, graph in graphs():
+        landmarks = Landmarks.build(graph, count=3, strategy=strategy, seed=seed)
+        for start, goal in queries(graph, seed):
+            check(graph, start, goal, a_star_search(graph, start, goal, landmarks.heuristic(goal)),
+                  expected(graph, start))
+
+
+def test_admissible_and_consistent():
+    for seed, graph in graphs():
+        landmarks = Landmarks.build(graph, count=4)
+        for start, goal in queries(graph, seed, 4):
+            h = landmarks.heuristic(goal)
+            to_goal = shortest_path_costs(graph.reversed(), goal)[0]
+            back = landmarks.reverse_heuristic(start)
+            from_start = expected(graph, start)
+            for node in range(graph.num_nodes):
+                assert h(node) <= to_goal[node] + 1e-9
+                assert back(node) <= from_start[node] + 1e-9
+                for neighbor, weight in graph.neighbors(node):
+                    # Nodes that can't reach the goal never lie on a path to it
+                    if to_goal[neighbor] != math.inf:
+                        assert h(node) <= weight + h(neighbor) + 1e-9
+                    if from_start[node] != math.inf:
+                        assert back(neighbor) <= weight + back(node) + 1e-9
+
+
+def test_rejects_unknown_strategy():
+    graph = next(graphs())[1]
+    with pytest.raises(ValueError):
+        Landmarks.build(graph, strategy="random")
@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+from engine import CSRGraph, MetricsCollector, SearchMetrics, a_star_search, uniform_cost_search
+
+# s -> a -> b -> t -> g, with dearer edges s -> b and a -> t that are found
+# first and then beaten:
+#   pop s: reach a (1) and b (4)
+#   pop a: b improves to 2, reach t (6)
+#   pop b: t improves to 3
+#   pop t: reach g (13)
+#   the lazy heap then pops the old b (4) and t (6) entries, both stale
+#   pop g: done
+# 6 relaxations, 7 pushes counting the start, 5 nodes expanded
+NAMES = ["s", "a", "b", "t", "g"]
+EDGES = [(0, 1, 1), (0, 2, 4), (1, 2, 1), (1, 3, 5), (2, 3, 1), (3, 4, 10)]
+
+
+class CountingMetrics(SearchMetrics):
+    def __init__(self, memory_sample_every=0):
+        super().__init__(memory_sample_every)
+        self.samples = 0
+
+    def sample_memory(self, containers, frontier_size=0):
+        self.samples += 1
+        super().sample_memory(containers, frontier_size)
+
+
+@pytest.mark.parametrize("search", [uniform_cost_search, a_star_search])
+def test_counters_on_a_worked_graph(search):
+    graph = CSRGraph.from_edges(NAMES, EDGES)
+    metrics = SearchMetrics()
+    result = search(graph, 0, 4, frontier="lazy", metrics=metrics)
+    assert result.total_cost == 13
+    assert (metrics.pushes, metrics.pops, metrics.stale_pops, metrics.relaxations) == (7, 5, 2, 6)
+    assert metrics.elapsed_ns > 0
+    assert metrics.peak_memory_bytes == 0
+
+
+def test_decrease_key_leaves_no_stale_pops():
+    graph = CSRGraph.from_edges(NAMES, EDGES)
+    metrics = SearchMetrics()
+    uniform_cost_search(graph, 0, 4, frontier="indexed", metrics=metrics)
+    assert (metrics.pushes, metrics.pops, metrics.stale_pops, metrics.relaxations) == (7, 5, 0, 6)
+
+
+@pytest.mark.parametrize("every, samples", [(0, 0), (1, 5), (2, 2), (10, 0)])
+def test_memory_sampling(every, samples):
+    graph = CSRGraph.from_edges(NAMES, EDGES)
+    metrics = CountingMetrics(memory_sample_every=every)
+    uniform_cost_search(graph, 0, 4, metrics=metrics)
+    assert metrics.samples == samples
+    assert (metrics.peak_memory_bytes > 0) == (samples > 0)
+
+
+def test_counters_add_up_over_searches():
+    graph = CSRGraph.from_edges(NAMES, EDGES)
+    first = SearchMetrics()
+    second = SearchMetrics()
+    uniform_cost_search(graph, 0, 4, frontier="lazy", metrics=first)
+    uniform_cost_search(graph, 1, 4, frontier="lazy", metrics=second)
+    total = SearchMetrics()
+    total.add(first)
+    total.add(second)
+    assert total.pushes == first.pushes + second.pushes
+    assert total.elapsed_ns == first.elapsed_ns + second.elapsed_ns
+    assert total.as_dict()["relaxations"] == first.relaxations + second.relaxations
+
+    # One SearchMetrics reused for both searches sums them the same way
+    reused = SearchMetrics()
+    uniform_cost_search(graph, 0, 4, frontier="lazy", metrics=reused)
+    uniform_cost_search(graph, 1, 4, frontier="lazy", metrics=reused)
+    assert (reused.pushes, reused.pops, reused.stale_pops) == (total.pushes, total.pops, total.stale_pops)
+
+
+def test_collector_from_several_threads():
+    graph = CSRGraph.from_edges(NAMES, EDGES)
+    collector = MetricsCollector()
+
+    def run():
+        for _ in range(50):
+            metrics = collector.new()
+            uniform_cost_search(graph, 0, 4, frontier="lazy", metrics=metrics)
+            collector.record(metrics)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = collector.as_dict()
+    assert summary["searches"] == 200
+    assert summary["pushes"] == 200 * 7 and summary["stale_pops"] == 200 * 2
@@ -0,0 +1,47 @@
+import math
+import random
+
+import pytest
+
+from engine import CSRGraph, multi_target_search
+from random_graphs import expected, graphs, path_cost, queries
+
+
+def test_matches_dijkstra():
+    for seed, graph in graphs():
+        rng = random.Random(seed)
+        for start, _ in queries(graph, seed):
+            costs = expected(graph, start)
+            targets = rng.sample(range(graph.num_nodes), 4)
+            result = multi_target_search(graph, start, targets)
+            assert sorted(result.reached) == sorted(t for t in targets if costs[t] != math.inf)
+            assert [costs[t] for t in result.reached] == sorted(costs[t] for t in result.reached)
+            for target in result.reached:
+                path = result.paths[target]
+                assert result.costs[target] == pytest.approx(costs[target])
+                assert path[0] == start and path[-1] == target
+                assert path_cost(graph, path) == pytest.approx(costs[target])
+            nearest = multi_target_search(graph, start, targets, k=1)
+            best = min(costs[t] for t in targets)
+            if best == math.inf:
+                assert not nearest.found
+            else:
+                assert nearest.total_cost == pytest.approx(best)
+
+
+def test_stops_after_k_targets():
+    # On a chain the targets are settled in order, so k=2 never reaches the third
+    names = [str(node) for node in range(10)]
+    graph = CSRGraph.from_edges(names, [(node, node + 1, 1) for node in range(9)])
+    result = multi_target_search(graph, 0, [8, 3, 5], k=2)
+    assert result.reached == [3, 5]
+    assert result.nodes_expanded == 6
+    assert result.reached_names == ["3", "5"]
+    assert result.paths_names["5"] == ["0", "1", "2", "3", "4", "5"]
+
+
+def test_target_behind_another_target():
+    # Reaching the first target must not stop the search from going through it
+    graph = CSRGraph.from_edges(["s", "a", "b"], [(0, 1, 1), (1, 2, 1)])
+    result = multi_target_search(graph, 0, [1, 2])
+    assert result.costs == {1: 1, 2: 2}
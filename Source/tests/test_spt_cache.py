@@ -0,0 +1,76 @@
+import threading
+
+from engine import BatchRunner, CSRGraph, SearchTrace, ShortestPathTreeCache, UniformCostSearch, shortest_path_costs
+from random_graphs import check, expected, graphs, queries
+
+
+def chain(n):
+    edges = [(node, node + 1, 2) for node in range(n - 1)]
+    return CSRGraph.from_edges([str(node) for node in range(n)], edges)
+
+
+def test_cost_only_queries_reuse_the_tree():
+    graph = chain(30)
+    cache = ShortestPathTreeCache(graph)
+    ucs = UniformCostSearch(graph, cache)
+    costs = shortest_path_costs(graph, 0)[0]
+    assert ucs.search(0, 29).total_cost == costs[29]
+    assert ucs.search(0, 10).total_cost == costs[10]
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_traced_query_runs_uncached():
+    graph = chain(30)
+    cache = ShortestPathTreeCache(graph)
+    ucs = UniformCostSearch(graph, cache)
+    ucs.search(0, 29)
+    # The tree already covers node 10, but a replay still needs the expansions
+    result = ucs.search(0, 10, SearchTrace())
+    assert result.total_cost == 20
+    assert result.nodes_expanded == 11
+    assert len(result.trace) > 0
+    assert cache.hits == 0
+
+
+def test_other_origins_do_not_wait_for_a_busy_tree():
+    graph = chain(30)
+    cache = ShortestPathTreeCache(graph)
+    cache.search(0, 5)
+    results = []
+    # Hold origin 0's tree as a long query would
+    with cache.trees[0].lock:
+        worker = threading.Thread(target=lambda: results.append(cache.search(3, 29)))
+        worker.start()
+        worker.join(5)
+        assert results and results[0].total_cost == 52
+
+
+def test_batch_runner_reuses_trees():
+    graph = chain(30)
+    pairs = [(0, goal) for goal in range(30)] + [(4, goal) for goal in range(4, 30)]
+    with BatchRunner(graph, workers=1, cache_trees=True) as runner:
+        answers = list(runner.run(pairs))
+    for answer, (start, goal) in zip(answers, pairs):
+        assert answer.total_cost == shortest_path_costs(graph, start)[0][goal]
+        assert answer.path == list(range(start, goal + 1))
+    # Each origin's tree is grown once, not once per query
+    assert sum(answer.nodes_expanded for answer in answers) == 30 + 26
+
+
+def test_matches_dijkstra():
+    # Queries share origins, so most of them resume or read a cached tree
+    for seed, graph in graphs():
+        ucs = UniformCostSearch(graph, ShortestPathTreeCache(graph))
+        for start, goal in queries(graph, seed, 20):
+            check(graph, start, goal, ucs.search(start, goal), expected(graph, start))
+            check(graph, start, start, ucs.search(start, start), expected(graph, start))
+
+
+def test_invalidate_drops_trees():
+    graph = chain(10)
+    cache = ShortestPathTreeCache(graph)
+    cache.search(0, 9)
+    shorter = CSRGraph.from_edges([str(node) for node in range(10)], [(0, 9, 1)])
+    cache.invalidate(shorter)
+    assert cache.search(0, 9).total_cost == 1
+    assert cache.misses == 2
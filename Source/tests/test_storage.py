@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from engine import (CSRGraph, a_star_search, bidirectional_search, load_graph, save_graph, shortest_path_costs,
+                    uniform_cost_search)
+from engine.storage import numpy
+
+
+def random_graph(seed, max_weight, integer=True):
+    rng = random.Random(seed)
+    n = 40
+    names = [f"city {i}" for i in range(n)]
+    coordinates = {name: (rng.uniform(0, 10), rng.uniform(0, 10)) for name in names}
+    edges = []
+    for _ in range(160):
+        weight = rng.randint(1, max_weight) if integer else rng.uniform(0.5, max_weight)
+        edges.append((rng.randrange(n), rng.randrange(n), weight))
+    return CSRGraph.from_edges(names, edges, coordinates)
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+@pytest.mark.parametrize("max_weight, integer", [(50, True), (1 << 20, True), (50.0, False)])
+def test_round_trip_search(tmp_path, use_numpy, max_weight, integer):
+    # Weights of 2**16 and more make "auto" pick the radix heap
+    graph = random_graph(1, max_weight, integer)
+    path = tmp_path / "graph.csrg"
+    save_graph(graph, path)
+    loaded = load_graph(path, use_numpy=use_numpy)
+
+    assert list(loaded.names) == graph.names
+    assert list(loaded.offsets) == list(graph.offsets)
+    assert list(loaded.targets) == list(graph.targets)
+    assert list(loaded.weights) == list(graph.weights)
+    assert list(loaded.xs) == list(graph.xs)
+    assert loaded.integer_weights == integer
+    for start in range(0, 40, 7):
+        costs = shortest_path_costs(graph, start)[0]
+        for goal in range(0, 40, 3):
+            assert uniform_cost_search(loaded, start, goal).total_cost == costs[goal]
+            assert a_star_search(loaded, start, goal).total_cost == costs[goal]
+            assert bidirectional_search(loaded, start, goal).total_cost == pytest.approx(costs[goal])
+
+
+@pytest.mark.skipif(numpy is None, reason="needs NumPy")
+def test_numpy_arrays(tmp_path):
+    graph = random_graph(2, 9)
+    path = tmp_path / "graph.csrg"
+    save_graph(graph, path)
+    assert load_graph(path).arrays is None
+    arrays = load_graph(path, use_numpy=True).arrays
+    assert arrays["weights"].tolist() == list(graph.weights)
+    assert arrays["offsets"].tolist() == list(graph.offsets)
+
+
+def test_empty_graph(tmp_path):
+    graph = CSRGraph.from_edges([], [])
+    path = tmp_path / "graph.csrg"
+    save_graph(graph, path)
+    loaded = load_graph(path)
+    assert loaded.num_nodes == 0 and loaded.num_edges == 0
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "graph.csrg"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        load_graph(path)
@@ -1,239 +1,256 @@
 import tkinter as tk
-import heapq
-import time
 import threading
-import tracemalloc
 from tkinter.scrolledtext import ScrolledText
+from citymap import CityMap
+from engine import (CANCELLED, EXPAND, PATH, RELAX, CancellationToken, SearchMetrics, SearchTrace, bidirectional_search,
+                    multi_target_search, uniform_cost_search)
+from gui import CanvasUpdateQueue, MapView, ReplayControls, TraceReplayer
+
+# Searches give up after this long
+MAX_SEARCH_SECONDS = 30
+
+
+# Uniform cost search window. root is the window to build it in: a Toplevel
+# when opened from the launcher, or the Tk root when this file is run
+# directly. city_map holds the graph shared with the other windows.
+class UCSWindow:
+    def __init__(self, root, city_map):
+        self.root = root
+        self.city_map = city_map
+        self.engine_graph = city_map.engine_graph
+
+        # Set up the window
+        root.title("Uniform Cost Search | City Graph")
+        root.protocol("WM_DELETE_WINDOW", self.back_to_menu)
+        graph_label_uc = tk.Label(root, text="Uniform Cost Search", font=("Helvetica", 18, "bold"))
+        graph_label_uc.pack(pady=20)
+        # Create a canvas widget
+        self.canvas = tk.Canvas(root, width=800, height=600, bg="white")
+        self.canvas.pack()
+
+        # The search runs at full speed; the replayer animates its trace afterwards.
+        # One path per End city reached.
+        self.final_paths = []
+        self.replayer = TraceReplayer(root, self.visualize_step, self.highlight_final_path)
+
+        # Token of the running search; starting another one, Reset or Back to
+        # Menu cancels it
+        self.search_token = None
+
+        # Draw the roads and cities. Only the part of the map on screen is drawn;
+        # scroll to zoom and drag with the right mouse button to pan. A city's
+        # dropdown exists once the city has been shown up close.
+        self.view = MapView(self.canvas, city_map.coordinates, city_map.roads)
+        self.dropdown_vars = self.view.dropdown_vars
+
+        # Canvas changes are queued and applied by the Tk thread once per frame
+        self.updates = CanvasUpdateQueue(root, self.canvas, apply=self.view.apply)
+
+        # Frame for buttons
+        frame = tk.Frame(root)
+        frame.pack(pady=10)
+
+        # Checkbox to search from both ends at once
+        self.bidirectional_var = tk.BooleanVar(root, value=False)
+        bidirectional_check = tk.Checkbutton(frame, text="Bidirectional", variable=self.bidirectional_var)
+        bidirectional_check.pack(side=tk.LEFT, padx=10)
+
+        # With several End cities, stop at the nearest one instead of reaching them all
+        self.nearest_var = tk.BooleanVar(root, value=False)
+        nearest_check = tk.Checkbutton(frame, text="Nearest End Only", variable=self.nearest_var)
+        nearest_check.pack(side=tk.LEFT, padx=10)
+
+        # Button to find and display the path
+        find_button = tk.Button(frame, text="Find Path", command=self.find_path)
+        find_button.pack(side=tk.LEFT, padx=10)
+
+        # Button to reset
+        reset_button = tk.Button(frame, text="Reset", command=self.reset)
+        reset_button.pack(side=tk.LEFT, padx=10)
+
+        back_button = tk.Button(frame, text="Back to Menu", command=self.back_to_menu)
+        back_button.pack(side=tk.LEFT, padx=10)
+
+        # Pause, step and speed controls for the replay
+        replay_controls = ReplayControls(root, self.replayer)
+        replay_controls.pack(pady=5)
+
+        # Create a scrollable text widget for displaying the result
+        self.result_text_widget = ScrolledText(root, width=80, height=10, wrap=tk.WORD, bg="white")
+        self.result_text_widget.pack(pady=10)
+
+    # Function to visualize each replayed step of the algorithm
+    def visualize_step(self, kind, node, neighbor):
+        names = self.engine_graph.names
+        node = names[node]
+        if kind == EXPAND:
+            self.updates.configure(("node", node), fill="lightgreen")
+        elif kind == RELAX:
+            self.updates.configure(("edge", node, names[neighbor]), fill="yellow")
+        elif kind == PATH:
+            self.updates.configure(("edge", node, names[neighbor]), fill="red", width=3)
+
+    # Highlight the final best paths once the replay is over
+    def highlight_final_path(self):
+        # Apply the last replay frame first so it can't paint over the result
+        self.updates.flush()
+        self.view.clear_edge_styles()
+        for path in self.final_paths:
+            for city1, city2 in zip(path, path[1:]):
+                self.view.style_edge(city1, city2, fill="red", width=3)
+
+    # Stop the running search and its replay so neither paints over what comes next
+    def cancel_search(self):
+        if self.search_token is not None:
+            self.search_token.cancel()
+        self.replayer.stop()
+        self.updates.clear()
+
+    # Show the result of a finished search; runs on the Tk thread
+    def show_result(self, result_text, paths, trace, token):
+        # A newer search has started since this one finished
+        if token is not self.search_token:
+            return
+
+        # Clear previous result and insert new result
+        self.result_text_widget.delete(1.0, tk.END)
+        self.result_text_widget.insert(tk.END, result_text)
+
+        # Replay the search on the canvas
+        self.final_paths = paths
+        self.replayer.start(trace)
+
+    # Function to find the path and display it
+    def find_path(self):
+        start_city = None
+        end_cities = []
+
+        for city, var in self.dropdown_vars.items():
+            if var.get() == "Start":
+                start_city = city
+            elif var.get() == "End":
+                end_cities.append(city)
+
+        if len(end_cities) > 1 and start_city is not None:
+            self.find_paths(start_city, end_cities)
+        elif start_city is not None and end_cities:
+            end_city = end_cities[0]
+            engine_graph = self.engine_graph
+            bidirectional = self.bidirectional_var.get()
+            self.cancel_search()
+            token = self.search_token = CancellationToken(deadline=MAX_SEARCH_SECONDS)
+
+            # Run the algorithm in a separate thread to keep the GUI responsive
+            def run_algorithm():
+                # Times only the search itself; memory is sampled every expansion
+                metrics = SearchMetrics(memory_sample_every=1)
+                if bidirectional:
+                    # Search from both ends until the two frontiers meet
+                    result = bidirectional_search(engine_graph, engine_graph.id_of(start_city),
+                                                  engine_graph.id_of(end_city), SearchTrace(), metrics=metrics,
+                                                  cancel=token)
+                else:
+                    result = uniform_cost_search(engine_graph, engine_graph.id_of(start_city),
+                                                 engine_graph.id_of(end_city), SearchTrace(), metrics=metrics,
+                                                 cancel=token)
+                if result.stopped == CANCELLED:
+                    return
+                visited_order = result.traversed_names
+                total_cost = result.total_cost
+                path = result.path_names
+                nodes_expanded = result.nodes_expanded
+                if result.expanded_per_direction:
+                    forward, backward = result.expanded_per_direction
+                    nodes_expanded = f"{nodes_expanded} (forward {forward}, backward {backward})"
+                max_frontier_size = result.max_frontier_size
+                visit_count = result.visit_count_names
+
+                path_str = " -> ".join(path)
+                visited_str = " -> ".join(visited_order)
+
+                result_text = (
+                    f"Final Path: {path_str}\n\n"
+                    f"Path Traversed: {visited_str}\n\n"
+                    f"Total Cost: {total_cost}\n\n"
+                    f"Time: {metrics.elapsed_seconds:.6f} seconds\n\n"
+                    f"Nodes Expanded: {nodes_expanded}\n\n"
+                    f"Max Frontier Size: {max_frontier_size}\n\n"
+                    f"Frontier Operations: {metrics.pushes} pushes, {metrics.pops} pops "
+                    f"({metrics.stale_pops} stale), {metrics.relaxations} relaxations\n\n"
+                    f"Memory Usage: Peak={metrics.peak_memory_bytes / 1024:.1f}KB (sampled)\n\n"
+                    f"Visit Count: {visit_count}"
+                )
+                if result.stopped:
+                    result_text = (
+                        f"Search stopped ({result.stopped}) after {nodes_expanded} nodes expanded; no path yet.\n\n"
+                        f"Time: {metrics.elapsed_seconds:.6f} seconds\n\n"
+                        f"Frontier Operations: {metrics.pushes} pushes, {metrics.pops} pops "
+                        f"({metrics.stale_pops} stale), {metrics.relaxations} relaxations\n"
+                    )
+
+                # Hand the result to the Tk thread instead of touching widgets here
+                self.updates.call(self.show_result, result_text, [path], result.trace, token)
+
+            threading.Thread(target=run_algorithm, daemon=True).start()
+
+    # Several End cities: one search reaches all of them, or just the nearest
+    def find_paths(self, start_city, end_cities):
+        engine_graph = self.engine_graph
+        k = 1 if self.nearest_var.get() else None
+        self.cancel_search()
+        token = self.search_token = CancellationToken(deadline=MAX_SEARCH_SECONDS)
 
-
-# Uniform Cost Search algorithm
-class UniformCostSearch:
-    def __init__(self, graph, canvas, coordinates):
-        self.graph = graph
-        self.canvas = canvas
-        self.coordinates = coordinates
-
-    def search(self, start, goal):
-        # Priority queue to store nodes to be explored, starting with the initial node and cost of 0
-        frontier = []
-        heapq.heappush(frontier, (0, start))
-
-        # Frequency count of node visits
-        visit_count = {start: 1}
-
-        # Track the maximum size of the priority queue
-        max_frontier_size = 0
-
-        # Store the cost to reach each node
-        cost_so_far = {start: 0}
-        # Store the path taken to reach each node
-        came_from = {start: None}
-
-        # Store all visited nodes
-        visited_order = []
-
-        while frontier:
-            # Track the maximum size of the priority queue
-            max_frontier_size = max(max_frontier_size, len(frontier))
-
-            # Pop the node with the lowest cost from the priority queue
-            current_cost, current_node = heapq.heappop(frontier)
-            # Record the current node as visited
-            visited_order.append(current_node)
-
-            # Visualize the current step
-            visualize_step(current_node, visited=True)
-
-            # If the current node is the goal, reconstruct the path and return it
-            if current_node == goal:
-                path = []
-                while current_node is not None:
-                    path.append(current_node)
-                    current_node = came_from[current_node]
-                return visited_order, cost_so_far[goal], path[::-1], len(visited_order), max_frontier_size, visit_count
-
-            # Explore neighbors of the current node
-            for neighbor, cost in self.graph[current_node].items():
-                # Calculate the new cost to reach the neighbor
-                new_cost = current_cost + cost
-
-                # If this path to the neighbor is cheaper, update cost and path
-                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
-                    cost_so_far[neighbor] = new_cost
-                    heapq.heappush(frontier, (new_cost, neighbor))
-                    came_from[neighbor] = current_node
-                    visit_count[neighbor] = visit_count.get(neighbor, 0) + 1
-
-                    # Visualize the current step
-                    visualize_step(current_node, neighbor)
-
-        # If the goal is not reachable, return the visited order, infinity as cost, and an empty path
-        return visited_order, float('inf'), [], len(visited_order), max_frontier_size, visit_count
-
-
-# Function to visualize each step of the algorithm
-def visualize_step(current, neighbor=None, visited=False):
-    if visited:
-        canvas.itemconfig(node_objects[current], fill="lightgreen")
-    if neighbor:
-        canvas.itemconfig(line_objects[(current, neighbor)], fill="yellow")
-    root.update_idletasks()
-    time.sleep(0.5)
-
-
-# Create the main window
-root = tk.Tk()
-root.title("Uniform Cost Search | City Graph")
-graph_label_uc = tk.Label(root, text="Uniform Cost Search", font=("Helvetica", 18, "bold"))
-graph_label_uc.pack(pady=20)
-# Create a canvas widget
-canvas = tk.Canvas(root, width=800, height=600, bg="white")
-canvas.pack()
-
-# Define coordinates for each city
-coordinates = {
-    "Dallas": (200, 400),
-    "Los Angeles": (100, 200),
-    "San Francisco": (100, 100),
-    "Chicago": (400, 50),
-    "New York": (400, 200),
-    "Boston": (600, 100),
-    "Miami": (600, 300)
-}
-
-# Define the graph (connections between cities with distances)
-graph = {
-    "Dallas": {"Los Angeles": 1700, "Miami": 1200, "New York": 1500},
-    "Los Angeles": {"San Francisco": 500, "Dallas": 1700, "New York": 3000},
-    "San Francisco": {"Los Angeles": 500, "Chicago": 2200},
-    "Chicago": {"San Francisco": 2200, "New York": 800},
-    "New York": {"Chicago": 800, "Boston": 250, "Miami": 1000, "Dallas": 1500, "Los Angeles": 3000},
-    "Boston": {"New York": 250},
-    "Miami": {"New York": 1000, "Dallas": 1200}
-}
-
-# Create UniformCostSearch instance with the graph
-ucs = UniformCostSearch(graph, canvas, coordinates)
-
-# Draw the connections (edges) and distances
-line_objects = {}
-lines = []
-for city1, connections in graph.items():
-    for city2, distance in connections.items():
-        x1, y1 = coordinates[city1]
-        x2, y2 = coordinates[city2]
-        line = canvas.create_line(x1, y1, x2, y2, fill="blue")
-        line_objects[(city1, city2)] = line
-        line_objects[(city2, city1)] = line  # Ensure both directions are covered
-        lines.append((line, city1, city2))
-        mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
-
-        # Create a background rectangle for the distance label
-        bbox = canvas.create_text(mid_x, mid_y - 10, text=str(distance), fill="black")
-        x0, y0, x1, y1 = canvas.bbox(bbox)
-        canvas.create_rectangle(x0-2, y0-2, x1+2, y1+2, fill="pink", outline="")
-        canvas.lift(bbox)  # Ensure the text is above the rectangle
-
-# Draw the cities (nodes) with a background to hide overlapping lines
-dropdown_vars = {}
-node_objects = {}
-for city, (x, y) in coordinates.items():
-    # Draw a white rectangle behind the city label to hide the lines
-    canvas.create_rectangle(x-50, y-30, x+50, y+30, fill="white", outline="white")
-    node_rect = canvas.create_rectangle(x-48, y-28, x+48, y+28, outline="black", fill="white")
-    node_objects[city] = node_rect
-    canvas.create_text(x, y-10, text=city, fill="black")
-
-    # Create dropdown inside each city box
-    var = tk.StringVar(root)
-    var.set(" ")  # Default value
-    dropdown_vars[city] = var
-    dropdown = tk.OptionMenu(canvas, var, " ", "Start", "End")
-    dropdown.config(width=5, height=1, font=('Helvetica', 8))
-    canvas.create_window(x, y + 12, window=dropdown)
-
-# Function to find the path and display it
-def find_path():
-    start_city = None
-    end_city = None
-    
-    for city, var in dropdown_vars.items():
-        if var.get() == "Start":
-            start_city = city
-        elif var.get() == "End":
-            end_city = city
-    
-    if start_city is not None and end_city is not None:
-        # Measure time before executing the algorithm
-        start_time = time.time()
-        tracemalloc.start()  # Start memory tracking
-        
-        # Run the algorithm in a separate thread to keep the GUI responsive
         def run_algorithm():
-            visited_order, total_cost, path, nodes_expanded, max_frontier_size, visit_count = ucs.search(start_city, end_city)
-            
-            # Measure time after executing the algorithm
-            end_time = time.time()
-            current, peak = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-            
-            path_str = " -> ".join(path)
-            visited_str = " -> ".join(visited_order)
-            
+            metrics = SearchMetrics(memory_sample_every=1)
+            result = multi_target_search(engine_graph, engine_graph.id_of(start_city),
+                                         [engine_graph.id_of(city) for city in end_cities], k=k, trace=SearchTrace(),
+                                         metrics=metrics, cancel=token)
+            if result.stopped == CANCELLED:
+                return
+            paths = result.paths_names
+            lines = [f"{city}: {result.costs[engine_graph.id_of(city)]} via {' -> '.join(paths[city])}"
+                     for city in result.reached_names]
+            unreached = [city for city in end_cities if city not in paths]
+            if unreached and k is None:
+                lines.append(f"Not reachable: {', '.join(unreached)}")
+
             result_text = (
-                f"Final Path: {path_str}\n\n"
-                f"Path Traversed: {visited_str}\n\n"
-                f"Total Cost: {total_cost}\n\n"
-                f"Time: {end_time - start_time} seconds\n\n"
-                f"Nodes Expanded: {nodes_expanded}\n\n"
-                f"Max Frontier Size: {max_frontier_size}\n\n"
-                f"Memory Usage: Current={current / 1024}KB, Peak={peak / 1024}KB\n\n"
-                f"Visit Count: {visit_count}"
+                f"{'Nearest End' if k else 'Paths to each End'} (one shared search):\n" + "\n".join(lines) + "\n\n"
+                f"Path Traversed: {' -> '.join(result.traversed_names)}\n\n"
+                f"Time: {metrics.elapsed_seconds:.6f} seconds\n\n"
+                f"Nodes Expanded: {result.nodes_expanded}\n\n"
+                f"Max Frontier Size: {result.max_frontier_size}\n\n"
+                f"Frontier Operations: {metrics.pushes} pushes, {metrics.pops} pops "
+                f"({metrics.stale_pops} stale), {metrics.relaxations} relaxations\n\n"
+                f"Memory Usage: Peak={metrics.peak_memory_bytes / 1024:.1f}KB (sampled)\n\n"
+                f"Visit Count: {result.visit_count_names}"
             )
-
-            # Clear previous result and insert new result
-            result_text_widget.delete(1.0, tk.END)
-            result_text_widget.insert(tk.END, result_text)
-
-            # Highlight the final best path
-            for line, city1, city2 in lines:
-                if (city1, city2) in zip(path, path[1:]) or (city2, city1) in zip(path, path[1:]):
-                    canvas.itemconfig(line, fill="red", width=3)
-                else:
-                    canvas.itemconfig(line, fill="blue", width=1)
-        
-        threading.Thread(target=run_algorithm).start()
-
-# Function to reset the canvas and dropdowns
-def reset():
-    for line, city1, city2 in lines:
-        canvas.itemconfig(line, fill="blue", width=1)
-    for city, rect in node_objects.items():
-        canvas.itemconfig(rect, fill="white")
-        dropdown_vars[city].set(" ")
-    result_text_widget.delete(1.0, tk.END)
-def back_to_menu():
-    root.destroy()
-
-# Frame for buttons
-frame = tk.Frame(root)
-frame.pack(pady=10)
-
-# Button to find and display the path
-find_button = tk.Button(frame, text="Find Path", command=find_path)
-find_button.pack(side=tk.LEFT, padx=10)
-
-# Button to reset
-reset_button = tk.Button(frame, text="Reset", command=reset)
-reset_button.pack(side=tk.LEFT, padx=10)
-
-back_button = tk.Button(frame, text="Back to Menu", command=lambda: back_to_menu())
-back_button.pack(side=tk.LEFT, padx=10)
-
-# Create a scrollable text widget for displaying the result
-result_text_widget = ScrolledText(root, width=80, height=10, wrap=tk.WORD, bg="white")
-result_text_widget.pack(pady=10)
-
-
-# Start the Tkinter event loop
-root.mainloop()
\ No newline at end of file
+            if result.stopped:
+                result_text = (f"Search stopped ({result.stopped}) after {result.nodes_expanded} nodes expanded.\n\n"
+                               + "\n".join(lines))
+
+            self.updates.call(self.show_result, result_text, list(paths.values()), result.trace, token)
+
+        threading.Thread(target=run_algorithm, daemon=True).start()
+
+    # Function to reset the canvas and dropdowns
+    def reset(self):
+        self.cancel_search()
+        self.view.clear_styles()
+        for var in self.dropdown_vars.values():
+            var.set(" ")
+        self.result_text_widget.delete(1.0, tk.END)
+
+    def back_to_menu(self):
+        # Stop everything that would otherwise keep running on the Tk timer
+        self.cancel_search()
+        self.updates.stop()
+        self.view.close()
+        self.root.destroy()
+
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    UCSWindow(root, CityMap())
+    # Start the Tkinter event loop
+    root.mainloop()
@@ -1,61 +1,25 @@
+import os
+import sys
 import tkinter as tk
-from tkinter import Menu, simpledialog
-import heapq
-import time
+from tkinter import Menu, filedialog, simpledialog
 import threading
-import tracemalloc
 from tkinter.scrolledtext import ScrolledText
 
-# Uniform Cost Search algorithm
-class UniformCostSearch:
-    def __init__(self, graph, canvas, coordinates):
-        self.graph = graph
-        self.canvas = canvas
-        self.coordinates = coordinates
-
-    def search(self, start, goal):
-        frontier = []
-        heapq.heappush(frontier, (0, start))
-        visit_count = {start: 1}
-        max_frontier_size = 0
-        cost_so_far = {start: 0}
-        came_from = {start: None}
-        visited_order = []
-
-        while frontier:
-            max_frontier_size = max(max_frontier_size, len(frontier))
-            current_cost, current_node = heapq.heappop(frontier)
-            visited_order.append(current_node)
-            visualize_step(current_node, visited=True)
-
-            if current_node == goal:
-                path = []
-                while current_node is not None:
-                    path.append(current_node)
-                    current_node = came_from[current_node]
-                return visited_order, cost_so_far[goal], path[::-1], len(visited_order), max_frontier_size, visit_count
-
-            for neighbor, cost in self.graph[current_node].items():
-                new_cost = current_cost + cost
-
-                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
-                    cost_so_far[neighbor] = new_cost
-                    heapq.heappush(frontier, (new_cost, neighbor))
-                    came_from[neighbor] = current_node
-                    visit_count[neighbor] = visit_count.get(neighbor, 0) + 1
-
-                    visualize_step(current_node, neighbor)
-
-        return visited_order, float('inf'), [], len(visited_order), max_frontier_size, visit_count
-
-
-def visualize_step(current, neighbor=None, visited=False):
-    if visited:
-        app.canvas.itemconfig(app.node_objects[current]['rect'], fill="lightgreen")
-    if neighbor:
-        app.canvas.itemconfig(app.line_objects[(current, neighbor)], fill="yellow")
-    root.update_idletasks()
-    time.sleep(0.5)
+# The search engine lives in the Source folder next to this file
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Source"))
+from engine import (CANCELLED, EXPAND, PATH, RELAX, CSRGraph, CancellationToken, IncrementalSearch, SearchMetrics,
+                    SearchTrace, bidirectional_search, load_graph, multi_target_search, save_graph,
+                    uniform_cost_search)
+from gui import CanvasUpdateQueue, EdgeIndex, ImportDialog, ReplayControls, SpatialGrid, TraceReplayer
+
+# Half the size of a city rectangle on the canvas
+NODE_HALF_WIDTH = 48
+NODE_HALF_HEIGHT = 28
+# Imported networks with more cities than this are too big to edit city by
+# city; they can still be saved as a graph file for the search engine
+EDITOR_MAX_CITIES = 1000
+# Searches give up after this long
+MAX_SEARCH_SECONDS = 30
 
 class App:
     def __init__(self, root):
@@ -67,6 +31,10 @@ class App:
         root.config(menu=self.menu_bar)
 
         file_menu = Menu(self.menu_bar, tearoff=0)
+        file_menu.add_command(label="Open Map...", command=self.open_map)
+        file_menu.add_command(label="Save Map As...", command=self.save_map)
+        file_menu.add_command(label="Import Road Network...", command=self.import_map)
+        file_menu.add_separator()
         file_menu.add_command(label="Run", command=self.run_algorithm)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=root.quit)
@@ -81,16 +49,41 @@ class App:
 
         self.coordinates = {}
         self.node_objects = {}
+        # City rectangles by position, so clicks don't loop over every city
+        self.node_index = SpatialGrid()
         self.dropdown_vars = {}
 
         self.graph = {}
         self.line_objects = {}
         self.distance_labels = {}
+        # Line and label ids of each city's roads, for O(degree) drags and removals
+        self.edge_index = EdgeIndex()
+        self.node_tags = 0
 
         self.selected_node = None
         self.node_offset_x = 0
         self.node_offset_y = 0
 
+        self.engine_graph = None
+        self.graph_changed = True
+        self.bidirectional_var = tk.BooleanVar(root, value=False)
+        # Incremental mode keeps one planner per End city and tells it about
+        # every edit, so Find Path after an edit only repairs around the edit
+        self.incremental_var = tk.BooleanVar(root, value=False)
+        self.planner = None
+        # With several End cities, stop at the nearest one
+        self.nearest_var = tk.BooleanVar(root, value=False)
+        # Graph whose node ids the trace being replayed uses
+        self.trace_graph = None
+        # Token of the running search; a new search or Reset cancels it
+        self.search_token = None
+        # One path per End city reached
+        self.final_paths = []
+        self.updates = CanvasUpdateQueue(root, self.canvas)
+        self.replayer = TraceReplayer(root, self.visualize_step, self.highlight_final_path)
+        self.replay_controls = ReplayControls(root, self.replayer)
+        self.replay_controls.pack(pady=5)
+
         self.result_text_widget = ScrolledText(root, width=80, height=10, wrap=tk.WORD, bg="white")
         self.result_text_widget.pack(pady=10)
 
@@ -136,85 +129,95 @@ class App:
             y_coord = event.y
             self.coordinates[city_name] = (x_coord, y_coord)
             self.draw_city(city_name, x_coord, y_coord)
+            if self.planner is not None:
+                self.planner.add_node(city_name)
+            self.mark_graph_changed()
 
     def draw_city(self, city, x, y):
-        node_rect = self.canvas.create_rectangle(x-48, y-28, x+48, y+28, outline="black", fill="ivory")
-        text_id = self.canvas.create_text(x, y-10, text=city, fill="black")
+        # All items of a city share one tag so the group moves with one call.
+        # City names can contain spaces, so the tag is a generated one.
+        self.node_tags += 1
+        tag = f"node{self.node_tags}"
+        node_rect = self.canvas.create_rectangle(*self.node_box(x, y), outline="black", fill="ivory", tags=(tag,))
+        text_id = self.canvas.create_text(x, y-10, text=city, fill="black", tags=(tag,))
         var = tk.StringVar(self.root)
         var.set(" ")
         self.dropdown_vars[city] = var
         dropdown = tk.OptionMenu(self.canvas, var, " ", "Start", "End")
         dropdown.config(width=5, height=1, font=('Helvetica', 8))
-        dropdown_id = self.canvas.create_window(x, y + 12, window=dropdown, tags=("dropdown_" + city,))
-        self.node_objects[city] = {'rect': node_rect, 'text': text_id, 'dropdown': dropdown_id}
+        dropdown_id = self.canvas.create_window(x, y + 12, window=dropdown, tags=("dropdown_" + city, tag))
+        self.node_objects[city] = {'rect': node_rect, 'text': text_id, 'dropdown': dropdown_id, 'tag': tag}
+        self.node_index.insert(city, *self.node_box(x, y))
+
+    def node_box(self, x, y):
+        return x - NODE_HALF_WIDTH, y - NODE_HALF_HEIGHT, x + NODE_HALF_WIDTH, y + NODE_HALF_HEIGHT
+
+    def city_at(self, x, y):
+        return self.node_index.find(x, y)
 
     def select_node(self, event):
-        for city, objs in self.node_objects.items():
-            rect = objs['rect']
-            if self.canvas.bbox(rect)[0] <= event.x <= self.canvas.bbox(rect)[2] and self.canvas.bbox(rect)[1] <= event.y <= self.canvas.bbox(rect)[3]:
-                self.selected_node = city
-                self.node_offset_x = event.x - self.coordinates[city][0]
-                self.node_offset_y = event.y - self.coordinates[city][1]
-                break
+        city = self.city_at(event.x, event.y)
+        if city is not None:
+            self.selected_node = city
+            self.node_offset_x = event.x - self.coordinates[city][0]
+            self.node_offset_y = event.y - self.coordinates[city][1]
 
     def move_node(self, event):
         if self.selected_node:
+            city = self.selected_node
             x = event.x - self.node_offset_x
             y = event.y - self.node_offset_y
-            self.coordinates[self.selected_node] = (x, y)
-            self.canvas.coords(self.node_objects[self.selected_node]['rect'], x-48, y-28, x+48, y+28)
-            self.canvas.coords(self.node_objects[self.selected_node]['text'], x, y-10)
-            self.canvas.coords(self.node_objects[self.selected_node]['dropdown'], x, y + 12)
-            self.update_connected_lines(self.selected_node)
+            old_x, old_y = self.coordinates[city]
+            self.coordinates[city] = (x, y)
+            self.node_index.move(city, *self.node_box(x, y))
+            self.canvas.move(self.node_objects[city]['tag'], x - old_x, y - old_y)
+            self.update_connected_lines(city)
 
     def update_connected_lines(self, city):
-        if city in self.graph:
-            for connected_city, line in self.line_objects.items():
-                if city == connected_city[0]:
-                    x1, y1 = self.coordinates[city]
-                    x2, y2 = self.coordinates[connected_city[1]]
-                    self.canvas.coords(line, x1, y1, x2, y2)
-                    self.update_distance_label(city, connected_city[1])
-                elif city == connected_city[1]:
-                    x1, y1 = self.coordinates[connected_city[0]]
-                    x2, y2 = self.coordinates[city]
-                    self.canvas.coords(line, x1, y1, x2, y2)
-                    self.update_distance_label(connected_city[0], city)
+        x1, y1 = self.coordinates[city]
+        for neighbor, (line, label) in self.edge_index.edges_of(city).items():
+            x2, y2 = self.coordinates[neighbor]
+            self.canvas.coords(line, x1, y1, x2, y2)
+            self.canvas.coords(label, (x1 + x2) / 2, (y1 + y2) / 2 - 10)
+            self.canvas.lift(label)
+
+    def draw_road(self, city1, city2, distance):
+        # Replaces any road already drawn between the two cities
+        self.delete_road(city1, city2)
+        x1, y1 = self.coordinates[city1]
+        x2, y2 = self.coordinates[city2]
+        line = self.canvas.create_line(x1, y1, x2, y2, fill="blue")
+        self.line_objects[(city1, city2)] = line
+        self.line_objects[(city2, city1)] = line
+        mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
+        label = self.canvas.create_text(mid_x, mid_y - 10, text=str(distance), fill="black")
+        self.distance_labels[(city1, city2)] = label
+        self.edge_index.add(city1, city2, line, label)
+        self.canvas.lift(label)
+        return line
+
+    def delete_road(self, city1, city2):
+        items = self.edge_index.remove(city1, city2)
+        if items is not None:
+            self.canvas.delete(*items)
+            self.line_objects.pop((city1, city2), None)
+            self.line_objects.pop((city2, city1), None)
+            self.distance_labels.pop((city1, city2), None)
+            self.distance_labels.pop((city2, city1), None)
 
     def draw_connected_lines(self):
         for city1, connections in self.graph.items():
             for city2, distance in connections.items():
-                x1, y1 = self.coordinates[city1]
-                x2, y2 = self.coordinates[city2]
-                line = self.canvas.create_line(x1, y1, x2, y2, fill="blue")
-                self.line_objects[(city1, city2)] = line
-                self.line_objects[(city2, city1)] = line
-                mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
-                bbox = self.canvas.create_text(mid_x, mid_y - 10, text=str(distance), fill="black")
-                x0, y0, x1, y1 = self.canvas.bbox(bbox)
-                self.distance_labels[(city1, city2)] = bbox
-                self.canvas.lift(bbox)
-
-    def update_distance_label(self, city1, city2):
-        if (city1, city2) in self.distance_labels:
-            bbox = self.distance_labels[(city1, city2)]
-            x1, y1 = self.coordinates[city1]
-            x2, y2 = self.coordinates[city2]
-            mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
-            self.canvas.coords(bbox, mid_x, mid_y - 10)
-            self.canvas.lift(bbox)
+                # The graph stores every road in both directions; draw it once
+                if self.edge_index.get(city1, city2) is None:
+                    self.canvas.tag_lower(self.draw_road(city1, city2, distance))
 
     def deselect_node(self, event):
         self.selected_node = None
 
     def connect_cities(self, event):
-        clicked_city = None
-        for city, objs in self.node_objects.items():
-            rect = objs['rect']
-            if self.canvas.bbox(rect)[0] <= event.x <= self.canvas.bbox(rect)[2] and self.canvas.bbox(rect)[1] <= event.y <= self.canvas.bbox(rect)[3]:
-                clicked_city = city
-                break
-        
+        clicked_city = self.city_at(event.x, event.y)
+
         if clicked_city:
             connect_to_city = simpledialog.askstring("Connect Cities", f"Enter city to connect {clicked_city} to:")
             if connect_to_city and connect_to_city in self.coordinates and connect_to_city != clicked_city:
@@ -226,69 +229,199 @@ class App:
                     if connect_to_city not in self.graph:
                         self.graph[connect_to_city] = {}
                     self.graph[connect_to_city][clicked_city] = distance
-                    x1, y1 = self.coordinates[clicked_city]
-                    x2, y2 = self.coordinates[connect_to_city]
-                    line = self.canvas.create_line(x1, y1, x2, y2, fill="blue")
-                    self.line_objects[(clicked_city, connect_to_city)] = line
-                    self.line_objects[(connect_to_city, clicked_city)] = line
-                    mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
-                    bbox = self.canvas.create_text(mid_x, mid_y - 10, text=str(distance), fill="black")
-                    x0, y0, x1, y1 = self.canvas.bbox(bbox)
-                    self.distance_labels[(clicked_city, connect_to_city)] = bbox
-                    self.canvas.lift(bbox)
+                    line = self.draw_road(clicked_city, connect_to_city, distance)
                     self.canvas.tag_lower(line)
+                    if self.planner is not None:
+                        try:
+                            self.planner.set_edge(clicked_city, connect_to_city, distance)
+                            self.planner.set_edge(connect_to_city, clicked_city, distance)
+                        except ValueError:
+                            # Only positive distances can be planned incrementally;
+                            # the next incremental search says so
+                            self.planner = None
+                    self.mark_graph_changed()
 
     def remove_city(self, event):
-        clicked_city = None
-        for city, objs in self.node_objects.items():
-            rect = objs['rect']
-            if self.canvas.bbox(rect)[0] <= event.x <= self.canvas.bbox(rect)[2] and self.canvas.bbox(rect)[1] <= event.y <= self.canvas.bbox(rect)[3]:
-                clicked_city = city
-                break
-        
+        clicked_city = self.city_at(event.x, event.y)
+
         if clicked_city:
-            self.canvas.delete(self.node_objects[clicked_city]['rect'])
-            self.canvas.delete(self.node_objects[clicked_city]['text'])
-            self.canvas.delete(self.node_objects[clicked_city]['dropdown'])
+            # A running search or a replay of an older one may still refer to this city
+            self.cancel_search()
+            self.canvas.delete(self.node_objects[clicked_city]['tag'])
             del self.node_objects[clicked_city]
-            if clicked_city in self.graph:
-                del self.graph[clicked_city]
-            for city, connections in self.graph.items():
-                if clicked_city in connections:
-                    del self.graph[city][clicked_city]
+            self.node_index.remove(clicked_city)
+            del self.dropdown_vars[clicked_city]
+            # Roads are stored both ways, so the city's own entry lists every neighbour
+            for neighbor in self.graph.pop(clicked_city, {}):
+                self.graph[neighbor].pop(clicked_city, None)
             del self.coordinates[clicked_city]
 
-            lines_to_remove = []
-            for (city1, city2), line in self.line_objects.items():
-                if city1 == clicked_city or city2 == clicked_city:
-                    lines_to_remove.append((city1, city2))
-                    self.canvas.delete(line)
-                    if (city1, city2) in self.distance_labels:
-                        self.canvas.delete(self.distance_labels[(city1, city2)])
-                        del self.distance_labels[(city1, city2)]
-            for line in lines_to_remove:
-                del self.line_objects[line]
+            for neighbor in list(self.edge_index.edges_of(clicked_city)):
+                self.delete_road(clicked_city, neighbor)
+            if self.planner is not None:
+                if self.planner.name_of(self.planner.goal) == clicked_city:
+                    self.planner = None
+                else:
+                    self.planner.remove_node(clicked_city)
+            self.mark_graph_changed()
+
+    def mark_graph_changed(self):
+        # The graph was edited, so the engine graph is rebuilt before the next search
+        self.graph_changed = True
+
+    def save_map(self):
+        path = filedialog.asksaveasfilename(defaultextension=".csrg", filetypes=[("Graph files", "*.csrg")])
+        if path:
+            save_graph(CSRGraph.from_dict(self.graph, self.coordinates), path)
+
+    def open_map(self):
+        path = filedialog.askopenfilename(filetypes=[("Graph files", "*.csrg"), ("All files", "*")])
+        if not path:
+            return
+        loaded = load_graph(path)
+        positions = list(zip(loaded.xs, loaded.ys)) if loaded.xs is not None else None
+        self.show_graph(loaded, positions)
+
+    def show_graph(self, loaded, positions=None):
+        self.clear_map()
+        for node, city in enumerate(loaded.names):
+            if positions is not None:
+                x, y = positions[node]
+            else:
+                # No positions saved: lay the cities out on a grid
+                x, y = 100 + 150 * (node % 6), 80 + 100 * (node // 6)
+            self.coordinates[city] = (x, y)
+            self.draw_city(city, x, y)
+        self.graph = loaded.to_dict()
+        self.draw_connected_lines()
+        self.mark_graph_changed()
+
+    def import_map(self):
+        path = filedialog.askopenfilename(filetypes=[("Road networks", "*.gr *.csv"), ("All files", "*")])
+        if path:
+            # Parsed on a worker thread; the dialog shows how far it got
+            ImportDialog(self.root, path, self.show_imported, self.show_import_error)
+
+    def show_imported(self, loaded, seconds):
+        summary = (f"Imported {loaded.num_nodes} cities and {loaded.num_edges} roads "
+                   f"in {seconds:.2f} seconds.\n")
+        if loaded.num_nodes > EDITOR_MAX_CITIES:
+            self.result_text_widget.delete(1.0, tk.END)
+            self.result_text_widget.insert(tk.END, summary + "Too many cities to edit here; choose where to "
+                                                             "save it as a graph file instead.\n")
+            path = filedialog.asksaveasfilename(defaultextension=".csrg", filetypes=[("Graph files", "*.csrg")])
+            if path:
+                save_graph(loaded, path)
+            return
+        positions = None
+        if loaded.xs is not None:
+            positions = self.fit_positions(loaded.xs, loaded.ys)
+        self.show_graph(loaded, positions)
+        self.result_text_widget.delete(1.0, tk.END)
+        self.result_text_widget.insert(tk.END, summary)
+
+    def show_import_error(self, error):
+        self.result_text_widget.delete(1.0, tk.END)
+        self.result_text_widget.insert(tk.END, f"Import failed: {error}\n")
+
+    def fit_positions(self, xs, ys, margin=60):
+        # Imported coordinates (longitude/latitude in DIMACS files) scaled
+        # onto the canvas with north up
+        width = max(self.canvas.winfo_width(), 800) - 2 * margin
+        height = max(self.canvas.winfo_height(), 500) - 2 * margin
+        x0, x1 = min(xs), max(xs)
+        y0, y1 = min(ys), max(ys)
+        scale = min(width / max(x1 - x0, 1e-9), height / max(y1 - y0, 1e-9))
+        return [(margin + (x - x0) * scale, margin + (y1 - y) * scale) for x, y in zip(xs, ys)]
+
+    def cancel_search(self):
+        # Stop the running search and its replay so neither paints over what comes next
+        if self.search_token is not None:
+            self.search_token.cancel()
+        self.replayer.stop()
+        self.updates.clear()
+
+    def clear_map(self):
+        self.cancel_search()
+        for objs in self.node_objects.values():
+            # The dropdown widget outlives its canvas window unless destroyed
+            self.root.nametowidget(self.canvas.itemcget(objs['dropdown'], "window")).destroy()
+        self.canvas.delete("all")
+        self.coordinates = {}
+        self.node_objects = {}
+        self.dropdown_vars = {}
+        self.graph = {}
+        self.line_objects = {}
+        self.distance_labels = {}
+        self.node_index.clear()
+        self.edge_index.clear()
+        self.selected_node = None
+        self.final_paths = []
+        self.planner = None
+
+    def current_engine_graph(self):
+        # Rebuilt only after the map has been edited
+        if self.graph_changed:
+            self.engine_graph = CSRGraph.from_dict(self.graph, self.coordinates)
+            self.graph_changed = False
+        return self.engine_graph
 
     def run_algorithm(self):
         start_city = None
-        end_city = None
+        end_cities = []
 
         for city, var in self.dropdown_vars.items():
             if var.get() == "Start":
                 start_city = city
             elif var.get() == "End":
-                end_city = city
-
-        if start_city is not None and end_city is not None:
-            start_time = time.time()
-            tracemalloc.start()
+                end_cities.append(city)
+
+        if len(end_cities) > 1 and start_city is not None:
+            self.run_multi_target(start_city, end_cities)
+        elif start_city is not None and end_cities:
+            end_city = end_cities[0]
+            self.cancel_search()
+            token = self.search_token = CancellationToken(deadline=MAX_SEARCH_SECONDS)
+            bidirectional = self.bidirectional_var.get()
+            incremental = self.incremental_var.get() and not bidirectional
+            if incremental and (self.planner is None or self.planner.name_of(self.planner.goal) != end_city):
+                try:
+                    self.planner = IncrementalSearch(self.graph, end_city)
+                except ValueError as error:
+                    self.result_text_widget.delete(1.0, tk.END)
+                    self.result_text_widget.insert(tk.END, f"Incremental search unavailable: {error}\n")
+                    return
+            planner = self.planner
+            engine_graph = self.current_engine_graph()
 
             def run_algorithm_thread():
-                ucs = UniformCostSearch(self.graph, self.canvas, self.coordinates)
-                visited_order, total_cost, path, nodes_expanded, max_frontier_size, visit_count = ucs.search(start_city, end_city)
-                end_time = time.time()
-                current, peak = tracemalloc.get_traced_memory()
-                tracemalloc.stop()
+                # Times only the search itself; memory is sampled every expansion
+                metrics = SearchMetrics(memory_sample_every=1)
+                if bidirectional:
+                    result = bidirectional_search(engine_graph, engine_graph.id_of(start_city),
+                                                  engine_graph.id_of(end_city), SearchTrace(), metrics=metrics,
+                                                  cancel=token)
+                elif incremental:
+                    planner.add_node(start_city)
+                    result = planner.search(planner.id_of(start_city), SearchTrace(), metrics=metrics, cancel=token)
+                else:
+                    # Uncached, so the replay shows every node the search expanded
+                    result = uniform_cost_search(engine_graph, engine_graph.id_of(start_city),
+                                                 engine_graph.id_of(end_city), SearchTrace(), metrics=metrics,
+                                                 cancel=token)
+                if result.stopped == CANCELLED:
+                    return
+                visited_order = result.traversed_names
+                total_cost = result.total_cost
+                path = result.path_names
+                nodes_expanded = result.nodes_expanded
+                if result.expanded_per_direction:
+                    forward, backward = result.expanded_per_direction
+                    nodes_expanded = f"{nodes_expanded} (forward {forward}, backward {backward})"
+                if incremental:
+                    nodes_expanded = f"{nodes_expanded} (repaired since the last search)"
+                max_frontier_size = result.max_frontier_size
+                visit_count = result.visit_count_names
 
                 path_str = " -> ".join(path)
                 visited_str = " -> ".join(visited_order)
@@ -297,25 +430,98 @@ class App:
                     f"Final Path: {path_str}\n\n"
                     f"Path Traversed: {visited_str}\n\n"
                     f"Total Cost: {total_cost}\n\n"
-                    f"Time: {end_time - start_time} seconds\n\n"
+                    f"Time: {metrics.elapsed_seconds:.6f} seconds\n\n"
                     f"Nodes Expanded: {nodes_expanded}\n\n"
                     f"Max Frontier Size: {max_frontier_size}\n\n"
-                    f"Memory Usage: Current={current / 1024}KB, Peak={peak / 1024}KB\n\n"
+                    f"Frontier Operations: {metrics.pushes} pushes, {metrics.pops} pops "
+                    f"({metrics.stale_pops} stale), {metrics.relaxations} relaxations\n\n"
+                    f"Memory Usage: Peak={metrics.peak_memory_bytes / 1024:.1f}KB (sampled)\n\n"
                     f"Visit Count: {visit_count}"
                 )
+                if result.stopped:
+                    result_text = (
+                        f"Search stopped ({result.stopped}) after {nodes_expanded} nodes expanded; no path yet.\n\n"
+                        f"Time: {metrics.elapsed_seconds:.6f} seconds\n\n"
+                        f"Frontier Operations: {metrics.pushes} pushes, {metrics.pops} pops "
+                        f"({metrics.stale_pops} stale), {metrics.relaxations} relaxations\n"
+                    )
 
-                self.result_text_widget.delete(1.0, tk.END)
-                self.result_text_widget.insert(tk.END, result_text)
-
-                for (city1, city2), line in self.line_objects.items():
-                    if (city1, city2) in zip(path, path[1:]) or (city2, city1) in zip(path, path[1:]):
-                        self.canvas.itemconfig(line, fill="red", width=3)
-                    else:
-                        self.canvas.itemconfig(line, fill="blue", width=1)
+                # Widgets are only touched from the Tk thread
+                self.updates.call(self.show_result, result_text, [path], result.trace, result.graph, token)
 
             threading.Thread(target=run_algorithm_thread).start()
 
+    def run_multi_target(self, start_city, end_cities):
+        # One search reaches every End city, or just the nearest one
+        self.cancel_search()
+        token = self.search_token = CancellationToken(deadline=MAX_SEARCH_SECONDS)
+        k = 1 if self.nearest_var.get() else None
+        engine_graph = self.current_engine_graph()
+
+        def run_algorithm_thread():
+            metrics = SearchMetrics(memory_sample_every=1)
+            result = multi_target_search(engine_graph, engine_graph.id_of(start_city),
+                                         [engine_graph.id_of(city) for city in end_cities], k=k, trace=SearchTrace(),
+                                         metrics=metrics, cancel=token)
+            if result.stopped == CANCELLED:
+                return
+            paths = result.paths_names
+            lines = [f"{city}: {result.costs[engine_graph.id_of(city)]} via {' -> '.join(paths[city])}"
+                     for city in result.reached_names]
+            unreached = [city for city in end_cities if city not in paths]
+            if unreached and k is None:
+                lines.append(f"Not reachable: {', '.join(unreached)}")
+
+            result_text = (
+                f"{'Nearest End' if k else 'Paths to each End'} (one shared search):\n" + "\n".join(lines) + "\n\n"
+                f"Path Traversed: {' -> '.join(result.traversed_names)}\n\n"
+                f"Time: {metrics.elapsed_seconds:.6f} seconds\n\n"
+                f"Nodes Expanded: {result.nodes_expanded}\n\n"
+                f"Max Frontier Size: {result.max_frontier_size}\n\n"
+                f"Frontier Operations: {metrics.pushes} pushes, {metrics.pops} pops "
+                f"({metrics.stale_pops} stale), {metrics.relaxations} relaxations\n\n"
+                f"Memory Usage: Peak={metrics.peak_memory_bytes / 1024:.1f}KB (sampled)\n\n"
+                f"Visit Count: {result.visit_count_names}"
+            )
+            if result.stopped:
+                result_text = (f"Search stopped ({result.stopped}) after {result.nodes_expanded} nodes expanded.\n\n"
+                               + "\n".join(lines))
+
+            # Widgets are only touched from the Tk thread
+            self.updates.call(self.show_result, result_text, list(paths.values()), result.trace, engine_graph, token)
+
+        threading.Thread(target=run_algorithm_thread).start()
+
+    def show_result(self, result_text, paths, trace, trace_graph, token):
+        # A newer search has started since this one finished
+        if token is not self.search_token:
+            return
+        self.result_text_widget.delete(1.0, tk.END)
+        self.result_text_widget.insert(tk.END, result_text)
+
+        self.final_paths = paths
+        self.trace_graph = trace_graph
+        self.replayer.start(trace)
+
+    def visualize_step(self, kind, node, neighbor):
+        names = self.trace_graph.names
+        if kind == EXPAND:
+            self.updates.configure(self.node_objects[names[node]]['rect'], fill="lightgreen")
+        elif kind == RELAX:
+            self.updates.configure(self.line_objects[(names[node], names[neighbor])], fill="yellow")
+        elif kind == PATH:
+            self.updates.configure(self.line_objects[(names[node], names[neighbor])], fill="red", width=3)
+
+    def highlight_final_path(self):
+        steps = {step for path in self.final_paths for step in zip(path, path[1:])}
+        for (city1, city2), line in self.line_objects.items():
+            if (city1, city2) in steps or (city2, city1) in steps:
+                self.updates.configure(line, fill="red", width=3)
+            else:
+                self.updates.configure(line, fill="blue", width=1)
+
     def reset(self):
+        self.cancel_search()
         for (city1, city2), line in self.line_objects.items():
             self.canvas.itemconfig(line, fill="blue", width=1)
         for city, objs in self.node_objects.items():
@@ -360,6 +566,15 @@ if __name__ == "__main__":
     frame = tk.Frame(root)
     frame.pack(pady=10)
 
+    bidirectional_check = tk.Checkbutton(frame, text="Bidirectional", variable=app.bidirectional_var)
+    bidirectional_check.pack(side=tk.LEFT, padx=10)
+
+    incremental_check = tk.Checkbutton(frame, text="Incremental", variable=app.incremental_var)
+    incremental_check.pack(side=tk.LEFT, padx=10)
+
+    nearest_check = tk.Checkbutton(frame, text="Nearest End Only", variable=app.nearest_var)
+    nearest_check.pack(side=tk.LEFT, padx=10)
+
     find_button = tk.Button(frame, text="Find Path", command=app.run_algorithm)
     find_button.pack(side=tk.LEFT, padx=10)
 